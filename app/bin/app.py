@@ -1,23 +1,41 @@
 import os
+import sys
 import re
 
-import boto3
 import json
 import logging
+import logging.handlers
 import watchtower
 import datetime
 import time
+import random
+import base64
+import hashlib
 import argparse
+import urllib.parse
+import threading
+import multiprocessing
+import concurrent.futures
 from deepdiff import DeepDiff
 
 from botocore.exceptions import ClientError
 from ucop_util.stack_info import stack_info
+import ddl_lexer
+from catalog_cache import CatalogCache
+from change_report import ChangeReport
+from template_cache import TemplateCache, get_object_content
+from ddl_bundle import read_bundle
+from bucket_resolver import BucketResolver
+from aws_clients import get_client, setup_default_session
+from table_spec import TableSpec, parse_columns, is_tracked_tblproperty
+from hive_types import normalize_type
 
 """
 This Python program will deploy the following AWS resources for a given project and environment.
     1. Creates a database based on the information provided in the application configuration JSON file.
     2. Creates the required folders under each S3 bucket based on the information provided in the application
-       configuration JSON file.
+       configuration JSON file. Only the folders that do not exist are created (in parallel), which are determined
+       by listing the existing folders of each bucket once per parent folder.
     3. Creates Athena objects (tables/view) based on the information provided in the application configuration 
        JSON file. The program drops and recreates any existing Athena table that has undergone changes. It detects 
        changes by parsing and comparing the various segments of the CREATE EXTERNAL TABLE statement in the DDL 
@@ -33,17 +51,27 @@ This Python program will deploy the following AWS resources for a given project
        g) Location changes
        h) Table properties changes
 
-       The program automatically recreates a table upon detecting the first change and does not check 
-       for any other changes. It also reloads all partitions as part of recreating a table, if the table
-       is partitioned.
-
-       Note 1: The program recreates all existing views each time, because the cost of detecting changes to 
-       a view is higher than simply recreating the view each time.
-
-       Note 2: For the program to detect changes correctly, all values in the DDL, such as comments, row format  
-       values in the ROW FORMAT clause, file format values in STORED AS clause, etc. MUST be enclosed in single  
-       quotes as opposed to double quotes. The reason is that the program parses and segments text using single 
-       quotes as markers strictly.
+       Before checking the individual segments, the program compares the content hash of a canonical spec of the
+       DDL against that of the table's metadata (see table_spec.py) and skips the table when the hashes match.
+       Otherwise, the differing segments are logged. When only the columns list, table comment, TBLPROPERTIES
+       and/or location (of a table that is not partitioned) differ and the column changes can be made in place
+       (i.e., changed column comments and, in tables that are not partitioned, new columns appended to the end of
+       the list or data types widened in a way that the table's storage format accepts), the
+       table's metadata is patched without recreating the table. Otherwise, the program
+       automatically recreates the table upon detecting the first change and does not check for any other
+       changes, unless a change report is requested (see note #7 below). It also reloads all partitions as
+       part of recreating a table, if the table is partitioned.
+
+       Note 1: The program reads the DDL of each view to find the tables and views (listed in the application 
+       configuration JSON file) that the view references, and creates the tables/views in dependency order
+       (see note #5 below). An existing view is recreated only when one of the tables/views it references has
+       been created or recreated during the same execution, or when the query in its DDL differs from the
+       original query of the view that Athena stores in the ViewOriginalText of the view's metadata.
+
+       Note 2: The program tokenizes the DDL (see ddl_lexer.py) before detecting changes. Values in the DDL, such as
+       comments, row format values in the ROW FORMAT clause, file format values in STORED AS clause, etc. may be
+       enclosed in single or double quotes; double-quoted values are treated as if they were enclosed in single
+       quotes.
 
        Note 3: Using the command below, you can obtain metadata info on a given table. The JSON structure that the
        command returns is similar to the response from get_tables Glue boto3 API call that is mentioned in item #3 
@@ -58,16 +86,51 @@ This Python program will deploy the following AWS resources for a given project
         Note 4: The program expects the DDL to be syntactically correct and as such would produce 
         unpredictable results if DDL's syntax is incorrect.
 
+        Note 5: Tables/views are processed in dependency "waves". The first wave includes all tables and the
+        views that do not reference any other table/view in the configuration file. Each subsequent wave includes
+        the views whose referenced tables/views have all been processed in the prior waves. As a result, the
+        order of the tables/views in the configuration file does not matter. By default, tables/views are
+        processed one at a time. When the --max_concurrent_queries command line option is set to a value greater
+        than 1, the DROP/CREATE/MSCK REPAIR statements of different tables/views within the same wave are
+        submitted to Athena concurrently (up to the specified number of queries at a time), while the statements
+        of each individual table still run in their original order.
+
+        Note 6: Partitions of a partitioned table are loaded by listing the Hive-style (key=value) folders under
+        the table's location and registering the missing partitions in the Glue Data Catalog using the
+        batch_create_partition Glue boto3 API, as opposed to MSCK REPAIR TABLE, which scans the entire S3 location.
+        Registered partitions whose folders no longer exist under the table's location are deleted. When an
+        existing partitioned table is recreated, its partitions are obtained from the Glue Data Catalog before the
+        table is dropped and registered again once the table is recreated, rather than listing the table's location.
+
+        Note 7: When the --change_report command line option is specified, all segments of each changed table are
+        checked in one pass and every detected difference (table/view, segment, old and new value and the action
+        taken, i.e., create, patch, recreate or none) is written out to the specified local JSON file (see
+        change_report.py). The --plan command line option, which requires --change_report, produces the same
+        report without creating or altering any folders, database or tables/views, nor the DDL copies in
+        sql_folder2.
+
+        Note 8: Changes to the existing tables are detected before any table is processed. Parsing and comparing
+        the DDL of many wide tables is CPU-bound, so for larger configurations the changes are detected in a pool of
+        worker processes (see --detection_workers command line option) that receive the DDL text and metadata of
+        each table and return the action to take (i.e., none, patch or recreate). Athena queries and Glue API calls
+        are still made by the main process.
+
+        Note 9: The name of each bucket is resolved by its label (e.g., app, output) once per execution (see
+        bucket_resolver.py). All labels in the application configuration JSON file are resolved up front, and the
+        --bucket_cache_dir command line option keeps the resolved bucket names across executions.
+
 Known Issues: 
-    1. Existence of any escaped character, other than an escaped single quote (\'), in any column or 
-       table comment in the DDL causes the metadata and DDL not to match! To include a single quote
-       in a comment without any issues, you can escape it using a backslash (\').
+    1. Existence of any escaped character, other than an escaped single quote (\'), in the table comment in the
+       DDL causes the metadata and DDL not to match! To include a single quote in a comment without any issues,
+       you can escape it using a backslash (\').
     2. The program is unable to detect changes to any TBLPROPERTIES other than the following default properties:
       'classification', 'has_encrypted_data', 'orc.compress', 'parquet.compress', 'write.compression', 
       'projection.*', 'skip.header.line.count', 'storage.location.template'
     3. Because comparison of DDL columns list with metadata columns list is done after converting both sets to
        lowercase, differences between upper- and lower-case letters in columns names, data types or comments are 
        not identified as changes.
+    4. Data types are compared in their canonical form (see hive_types.py), so spelling a data type differently
+       (e.g., integer instead of int or decimal(10, 2) instead of decimal(10,2)) is not identified as a change.
 
 """
 PGM_NAME = 'app.py'
@@ -77,10 +140,20 @@ current_date = datetime.datetime.now()
 logging.basicConfig(format=MSG_FORMAT, datefmt=DATETIME_FORMAT)
 logger = logging.getLogger(PGM_NAME + '_' + current_date.strftime('%Y-%m-%d-%H-%M-%S'))
 
-s3 = boto3.client('s3')
-s3_resource = boto3.resource('s3')
-athena_client = boto3.client('athena')
-glue_client = boto3.client('glue')
+s3 = get_client('s3')
+athena_client = get_client('athena')
+glue_client = get_client('glue')
+# The persistent catalog cache is only used when the --catalog_cache_dir command line option is specified.
+catalog_cache = None
+# Outcome of the database existence checks keyed by lowercase database name.
+database_existence_dict = dict()
+database_existence_lock = threading.Lock()
+# The template cache is only used when the --template_cache_dir command line option is specified.
+template_cache = None
+# Files of the DDL bundle keyed by their keys in the app bucket, when the --bundle command line option is specified.
+ddl_bundle = None
+# The change report is only collected when the --change_report or --plan command line option is specified.
+change_report = None
 
 # Each CREATE EXTERNAL TABLE statement defined in a DDL text file can be segmented based
 # on a set of standard clauses as declared in the list below.
@@ -109,6 +182,84 @@ TEXTFILE_STORAGE_FORMAT = 'org.apache.hadoop.mapred.TextInputFormat'
 ROW_FORMAT_WITH_SERDEPROPERTIES = 'with serdeproperties'
 ROW_FORMAT_SERDE = 'serde'
 ROW_FORMAT_DELIMITED = 'delimited'
+# Athena allows up to 20 concurrently running DDL queries per account by default. The value of
+# --max_concurrent_queries command line option may not exceed this quota, so that the queries submitted by this
+# program do not get rejected with TooManyRequestsException.
+ATHENA_DDL_QUERY_CONCURRENCY_QUOTA = 20
+# The status of outstanding Athena queries is checked using batch_get_query_execution, which accepts up to 50 query
+# execution IDs per call. Each query is checked after a delay that is proportional to how long the query has been
+# running (i.e., exponential backoff), bounded by the minimum and maximum delays below and randomized (jitter) to
+# avoid synchronized API calls across concurrent deployments.
+QUERY_STATUS_BATCH_SIZE = 50
+QUERY_POLL_MIN_DELAY_SECONDS = 0.25
+QUERY_POLL_MAX_DELAY_SECONDS = 10
+DEFAULT_QUERY_TIMEOUT_SECONDS = 1800
+# A thread waits for its query up to the query timeout plus this margin, within which the poller cancels the query.
+QUERY_WAIT_MARGIN_SECONDS = 120
+# Partitions of partitioned tables are registered in the Glue Data Catalog directly, rather than by using MSCK REPAIR
+# TABLE. The S3 prefixes of the partitions are listed in parallel, one partition key level at a time, and the
+# partitions are created/deleted using the Glue batch APIs, which accept up to 100 partitions per
+# batch_create_partition call and up to 25 partitions per batch_delete_partition call.
+GLUE_BATCH_CREATE_PARTITION_SIZE = 100
+GLUE_BATCH_DELETE_PARTITION_SIZE = 25
+# Note that get_partitions Glue boto3 API allows up to 10 segments.
+PARTITION_SYNC_MAX_WORKERS = 10
+# The metadata of the configured tables/views is obtained from the Glue Data Catalog using one of the following
+# strategies (see construct_catalog_index()):
+#   scan:   page through get_tables for the entire database.
+#   filter: page through get_tables with an Expression that only matches the configured tables/views, and call
+#           get_table for each configured table/view that the Expression did not match.
+#   point:  call get_table for each configured table/view in parallel.
+#   auto:   obtain the first page of get_tables and choose one of the above based on the number of configured
+#           tables/views relative to the size of the database.
+CATALOG_FETCH_STRATEGIES = ['auto', 'scan', 'filter', 'point']
+CATALOG_PROBE_PAGE_SIZE = 100
+CATALOG_POINT_LOOKUP_MAX_TABLES = 25
+CATALOG_FETCH_MAX_WORKERS = 10
+GLUE_EXPRESSION_MAX_LENGTH = 2048
+DEFAULT_CATALOG_CACHE_TTL_SECONDS = 900
+DEFAULT_BUCKET_CACHE_TTL_SECONDS = 3600
+# The DDL scripts of the configured tables/views are downloaded from sql_folder1 and uploaded to sql_folder2 by a
+# pool of threads that share the S3 client, so that the transfers overlap with obtaining the catalog metadata and
+# processing the tables/views.
+DDL_SCRIPT_TRANSFER_MAX_WORKERS = 10
+# Folder markers that do not exist are created in parallel (see create_folders()).
+FOLDER_CREATION_MAX_WORKERS = 10
+# Changes to the existing tables are detected in a pool of worker processes (see evaluate_tables_changes()). A
+# worker process is only started for every DETECTION_MIN_TABLES_PER_WORKER tables, because starting a worker
+# process costs more than detecting the changes to a few tables.
+DEFAULT_DETECTION_WORKERS = min(4, os.cpu_count() or 1)
+DETECTION_MIN_TABLES_PER_WORKER = 25
+# Reserved table parameter in which the fingerprint of the DDL that created the table is stored (see
+# compute_ddl_fingerprint()). The parameter is not one of the tracked TBLPROPERTIES and is therefore ignored when
+# detecting changes to the table properties.
+DDL_FINGERPRINT_PARAMETER = 'data_pipeline.ddl_fingerprint'
+# Column changes that can be applied to an existing table without recreating it (see classify_column_changes()).
+IN_PLACE_COLUMN_CHANGES = ('add', 'comment', 'type')
+# Segments of a table's spec (see table_spec.py) whose changes can be applied to an existing table without
+# recreating it (see patch_table_metadata()).
+METADATA_PATCH_SEGMENTS = ('columns', 'table_comment', 'tblproperties', 'location')
+# Data types (in their canonical form, see hive_types.py) that each data type can be widened to in place.
+WIDENING_TYPE_CHANGES = {
+    'tinyint': ('smallint', 'int', 'bigint'),
+    'smallint': ('int', 'bigint'),
+    'int': ('bigint',),
+    'float': ('double',)
+}
+# Storage formats (i.e., serde libraries) whose readers accept widened data types (see is_widening_type_change()).
+# Text formats parse each value with the column's current data type, so they accept all widening changes, whereas
+# Parquet files retain their physical types, so only the numeric widening changes above are accepted. The data
+# types of tables in any other format (e.g., ORC or Avro) are not changed in place.
+TEXT_SERDE_LIBRARIES = ('org.apache.hadoop.hive.serde2.lazy.LazySimpleSerDe',
+                        'org.apache.hadoop.hive.serde2.OpenCSVSerde', 'org.apache.hadoop.hive.serde2.RegexSerDe',
+                        'org.openx.data.jsonserde.JsonSerDe', 'org.apache.hive.hcatalog.data.JsonSerDe')
+NUMERIC_WIDENING_SERDE_LIBRARIES = ('org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe',)
+# Athena stores the definition of a view in its ViewOriginalText as a base64-encoded JSON payload.
+PRESTO_VIEW_PATTERN = re.compile(r'/\*\s*Presto View:\s*(?P<payload>\S+)\s*\*/')
+# Elements of the get_table Glue boto3 API response that are accepted by the TableInput of update_table.
+TABLE_INPUT_KEYS = ('Name', 'Description', 'Owner', 'LastAccessTime', 'LastAnalyzedTime', 'Retention',
+                    'StorageDescriptor', 'PartitionKeys', 'ViewOriginalText', 'ViewExpandedText', 'TableType',
+                    'Parameters', 'TargetTable')
 
 
 def create_folders(config_dict, stack_info_obj, product_name, environment_name):
@@ -135,12 +286,64 @@ def create_folders(config_dict, stack_info_obj, product_name, environment_name):
     """
     # Create subfolders for various buckets
     logger.info('Creating non-existing bucket folders...')
+    bucket_names_dict = dict()
+    folder_keys_dict = dict()
     for config in config_dict['folders']:
-        folder_name = config['folder_name']
         bucket_label = config['label']
-        bucket_name = stack_info_obj.get_bucket_name_by_label(product_name, environment_name, bucket_label)
-        logger.debug('Creating folder: {}'.format(bucket_name + '/' + folder_name))
-        s3.put_object(Bucket=bucket_name, Key=(folder_name + '/'))
+        if bucket_label not in bucket_names_dict:
+            bucket_names_dict[bucket_label] = stack_info_obj.get_bucket_name_by_label(product_name, environment_name,
+                                                                                      bucket_label)
+        folder_keys_dict.setdefault(bucket_names_dict[bucket_label], set()).add(config['folder_name'] + '/')
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=FOLDER_CREATION_MAX_WORKERS) as executor:
+        missing_folders_list = list()
+        for bucket_name, existing_folder_keys_set in zip(folder_keys_dict.keys(),
+                                                         executor.map(list_existing_folders, folder_keys_dict.keys(),
+                                                                      folder_keys_dict.values())):
+            for folder_key in sorted(folder_keys_dict[bucket_name]):
+                if folder_key in existing_folder_keys_set:
+                    logger.debug('Folder: {} already exists'.format(bucket_name + '/' + folder_key))
+                else:
+                    logger.debug('Creating folder: {}'.format(bucket_name + '/' + folder_key))
+                    missing_folders_list.append((bucket_name, folder_key))
+
+        # Raise the first failure, if any.
+        for future in [executor.submit(s3.put_object, Bucket=bucket_name, Key=folder_key)
+                       for bucket_name, folder_key in missing_folders_list]:
+            future.result()
+
+    logger.info('Created {} of the {} configured folders'.format(len(missing_folders_list),
+                                                                 sum(len(folder_keys_set) for folder_keys_set
+                                                                     in folder_keys_dict.values())))
+
+
+def list_existing_folders(bucket_name, folder_keys_set):
+    """
+    Determine which of the folders exist in a bucket. Folders are listed one level at a time, so a single
+    list_objects_v2 listing is needed for all folders that share the same parent folder (e.g., one listing for
+    incoming/a/ and incoming/b/). A folder exists when its marker object (i.e., the folder key ending in a forward
+    slash) or any object under it exists.
+
+    Parameters
+    ----------
+        bucket_name: str
+            Name of the bucket.
+        folder_keys_set: set
+            Keys of the folders, each ending in a forward slash.
+    Returns
+    -------
+        existing_folder_keys_set: set
+            Keys of the folders that exist.
+    Exceptions
+    ----------
+        None
+    """
+    parent_prefixes_set = set(folder_key[:folder_key.rstrip('/').rfind('/') + 1] for folder_key in folder_keys_set)
+    existing_folder_keys_set = set()
+    for parent_prefix in parent_prefixes_set:
+        existing_folder_keys_set.update(list_child_prefixes(bucket_name, parent_prefix))
+
+    return existing_folder_keys_set & folder_keys_set
 
 
 def create_database(product_name, db_name, db_location, output_bucket_name):
@@ -163,10 +366,11 @@ def create_database(product_name, db_name, db_location, output_bucket_name):
     ----------
         None
     """
-    db_list = list_existing_databases()
-
-    if db_name in db_list:
+    if database_exists(db_name) is True:
         logger.info("Database: {} already exists -- skipping database creation".format(db_name))
+    elif is_plan_only() is True:
+        logger.info('Database: {} does not exist and would be created'.format(db_name))
+        record_change(db_name, 'database', None, db_name, 'create')
     else:
         logger.info('Creating database: {}'.format(db_name))
         if db_location is None:
@@ -175,43 +379,48 @@ def create_database(product_name, db_name, db_location, output_bucket_name):
             query_string = 'CREATE DATABASE IF NOT EXISTS {} {}'.format(db_name, db_location)
 
         execute_query(product_name, query_string, 's3://' + output_bucket_name + '/_temporary/tables/')
+        with database_existence_lock:
+            database_existence_dict[db_name.lower()] = True
 
 
-def list_existing_databases():
+def database_exists(db_name):
     """
-    Construct a list of existing Athena databases. The list is then used to determine if a database already
-    exists and does not need to be created.
+    Determine if an Athena database already exists and does not need to be created. The database is looked up
+    in the Glue Data Catalog by name and the outcome is kept for the remainder of the execution, so configurations
+    that reference the same database more than once do not repeat the lookup.
 
     Parameters
     ----------
-        N/A
+        db_name: str
+            The name of Athena database.
     Returns
     -------
-        db_list: list
-            A list of existing database names.
+        Boolean True if the database exists or False otherwise.
     Exceptions
     ----------
         None
     """
-    starting_token = None
-    paginator = athena_client.get_paginator('list_databases')
-    response_iterator = paginator.paginate(
-        CatalogName='AwsDataCatalog',
-        PaginationConfig={
-            'StartingToken': starting_token
-        }
-    )
+    with database_existence_lock:
+        if db_name.lower() in database_existence_dict:
+            return database_existence_dict[db_name.lower()]
 
-    db_list = list()
-    for page in response_iterator:
-        for table_name in page['DatabaseList']:
-            db_list.append(table_name['Name'])
+    try:
+        glue_client.get_database(Name=db_name)
+        exists = True
+    except ClientError as ce:
+        if ce.response['Error']['Code'] == 'EntityNotFoundException':
+            exists = False
+        else:
+            raise
 
-    return db_list
+    with database_existence_lock:
+        database_existence_dict[db_name.lower()] = exists
+    return exists
 
 
 def process_athena_tables(config_dict, output_bucket_name, app_bucket_name, db_name,
-                          stack_info_obj, product_name, environment_name):
+                          stack_info_obj, product_name, environment_name, max_concurrent_queries=1,
+                          catalog_fetch_strategy='auto', detection_workers=DEFAULT_DETECTION_WORKERS):
     """
     Create tables/views based on the information provided in the application configuration JSON file.
 
@@ -231,179 +440,233 @@ def process_athena_tables(config_dict, output_bucket_name, app_bucket_name, db_n
             Name of the application for which to create the folders.
         environment_name: str
             Name of the environment for which to create the folders.
+        max_concurrent_queries: int
+            Maximum number of tables whose Athena queries may run at the same time. A value of 1
+            processes the tables one at a time.
+        catalog_fetch_strategy: str
+            Strategy for obtaining the metadata of the existing tables/views (see CATALOG_FETCH_STRATEGIES).
+        detection_workers: int
+            Maximum number of worker processes in which changes to the existing tables are detected.
     Returns
     -------
         None
     Exceptions
     ----------
-        None
+        Raised if the names of two tables/views in the application configuration JSON file differ only by case.
     """
     logger.info('Processing Athena tables/views...')
 
-    tables_metadata_list = construct_tables_metadata_list(db_name)
-
+    # Athena table/view names are not case-sensitive, so the tables/views are tracked by their lowercase names.
+    table_names_dict = dict()
     for table_config in config_dict['athena_tables']:
-        # Use list comprehension to find the corresponding metadata for the table in the above list.
-        table_metadata = [element for element in tables_metadata_list if element['Name'] == table_config['table_name']]
-        ddl_text = str(prep_ddl_script(table_config, output_bucket_name, app_bucket_name, db_name,
-                                       stack_info_obj, product_name, environment_name))
-
-        if len(table_metadata) == 0:
-            logger.debug('Table: {} does not exist'.format(table_config['table_name']))
-            logger.debug('table_metadata={}'.format(table_metadata))
-            create_table(table_config, ddl_text, db_name, stack_info_obj, product_name, environment_name)
+        table_name = table_config['table_name']
+        if table_name.lower() in table_names_dict:
+            raise Exception('Tables/views: {} and {} in the application configuration JSON file have the same name -- '
+                            'Athena table/view names are not case-sensitive!'.
+                            format(table_names_dict[table_name.lower()], table_name))
+        table_names_dict[table_name.lower()] = table_name
+
+    # Download the DDL scripts of all tables/views in the background while the catalog metadata is obtained. The
+    # DDL scripts with substituted parameters are uploaded in the background as well.
+    ddl_script_executor = concurrent.futures.ThreadPoolExecutor(max_workers=DDL_SCRIPT_TRANSFER_MAX_WORKERS)
+    try:
+        ddl_template_futures = [ddl_script_executor.submit(get_ddl_template, table_config, app_bucket_name)
+                                for table_config in config_dict['athena_tables']]
+        # DDL scripts that are the same as the scripts written out by the previous execution are not uploaded again.
+        if is_plan_only() is False:
+            published_etags_future = ddl_script_executor.submit(
+                list_published_ddl_scripts, output_bucket_name,
+                set(table_config['sql_folder2'] for table_config in config_dict['athena_tables']))
+
+        if is_plan_only() is True and database_exists(db_name) is False:
+            # None of the tables/views exist in a database that has yet to be created.
+            catalog_index = CatalogIndex()
         else:
-            # Due to complexities detecting changes in the views, we replace all views each time regardless.
-            # Note that for a view to be recreated properly, the DDL for the view must include a
-            # "CREATE OR REPLACE VIEW" clause.
-            if table_metadata[0]['TableType'] == 'VIRTUAL_VIEW':
-                logger.debug('Creating or replacing view: {}'.format(table_config['table_name']))
-                create_table(table_config, ddl_text, db_name, stack_info_obj, product_name, environment_name)
-            else:
-                logger.debug('Table: {} already exists'.format(table_config['table_name']))
-                logger.debug('table_metadata={}'.format(table_metadata))
-                detect_table_changes(table_metadata[0], table_config, ddl_text, db_name,
-                                     stack_info_obj, product_name, environment_name)
-
-
-def construct_tables_metadata_list(db_name):
+            catalog_index = construct_catalog_index(db_name, [table_config['table_name']
+                                                              for table_config in config_dict['athena_tables']],
+                                                    catalog_fetch_strategy)
+
+        table_tasks_dict = dict()
+        ddl_upload_futures = dict()
+        for table_config, ddl_template_future in zip(config_dict['athena_tables'], ddl_template_futures):
+            table_metadata = catalog_index.get(table_config['table_name'])
+            ddl_text = prep_ddl_script(table_config, ddl_template_future.result(), db_name,
+                                       stack_info_obj, product_name, environment_name)
+            if is_plan_only() is False:
+                ddl_script_key = table_config['sql_folder2'] + '/' + table_config['script_name']
+                if published_etags_future.result().get(ddl_script_key) == \
+                        hashlib.md5(ddl_text.encode('utf-8')).hexdigest():
+                    logger.debug('DDL script: {} has not changed -- skipping upload'.format(ddl_script_key))
+                else:
+                    ddl_upload_futures[table_config['table_name']] = ddl_script_executor.submit(
+                        put_ddl_script, table_config, ddl_text, output_bucket_name)
+            table_tasks_dict[table_config['table_name'].lower()] = {
+                'table_config': table_config,
+                'table_metadata': table_metadata,
+                'ddl_text': ddl_text,
+                'dependencies': list()
+            }
+
+        # Only views can reference other tables/views.
+        for table_name, table_task in table_tasks_dict.items():
+            if is_view(table_task['table_metadata'], table_task['ddl_text']):
+                table_task['dependencies'] = find_view_dependencies(table_task['ddl_text'], table_name, db_name,
+                                                                    table_tasks_dict.keys())
+                logger.debug('View: {} depends on: {}'.format(table_name, table_task['dependencies']))
+
+        evaluate_tables_changes([table_task for table_task in table_tasks_dict.values()
+                                 if table_task['table_metadata'] is not None and
+                                 table_task['table_metadata']['TableType'] != 'VIRTUAL_VIEW'], detection_workers)
+
+        recreated_tables_set = set()
+        for wave_number, wave in enumerate(schedule_table_waves(table_tasks_dict), start=1):
+            logger.info('Processing wave {} of tables/views: {}'.format(wave_number, ', '.join(wave)))
+            recreated_tables_set.update(run_table_tasks([table_tasks_dict[table_name] for table_name in wave],
+                                                        recreated_tables_set, max_concurrent_queries, db_name,
+                                                        stack_info_obj, product_name, environment_name))
+
+        failed_uploads_list = list()
+        for table_name, ddl_upload_future in ddl_upload_futures.items():
+            try:
+                ddl_upload_future.result()
+            except Exception as e:
+                logger.error('Unable to write out the DDL script of table: {} -- {}'.format(table_name, e))
+                failed_uploads_list.append(table_name)
+        if len(failed_uploads_list) > 0:
+            raise Exception('Unable to write out the DDL scripts of the following tables/views: {}'.
+                            format(', '.join(failed_uploads_list)))
+    finally:
+        ddl_script_executor.shutdown(wait=True)
+
+
+def is_view(table_metadata, ddl_text):
     """
-    Construct a list of metadata dictionaries for all existing tables/views in the target database.
-    The list is then used to determine if the specified table/view already exists and can be skipped,
-    as opposed to creating the table/view. For existing tables, the metadata is also used to detect schema changes.
+    Determine if the Athena object described by the table's metadata and DDL is a view.
 
     Parameters
     ----------
-        db_name: str
-            Name of the database in which the table's existence should be checked.
+        table_metadata: Dictionary
+            The metadata of the existing table/view or None when the table/view does not exist.
+        ddl_text: str
+            Full text contained in the DDL script that is read from S3.
     Returns
     -------
-        tables_metadata_list: list
-            A list of tables metadata dictionaries for existing table/views in the target database.
+        Boolean True when the object is a view or False otherwise.
     Exceptions
     ----------
         None
     """
-    starting_token = None
-    # paginator = athena_client.get_paginator('list_table_metadata')
-    paginator = glue_client.get_paginator('get_tables')
-    response_iterator = paginator.paginate(
-        DatabaseName=db_name,
-        PaginationConfig={
-            'StartingToken': starting_token
-        }
-    )
+    if table_metadata is not None:
+        return table_metadata['TableType'] == 'VIRTUAL_VIEW'
 
-    tables_metadata_list = list()
-    for page in response_iterator:
-        for element in page['TableList']:
-            tables_metadata_list.append(element)
+    return re.search(r'create\s+(or\s+replace\s+)?view\s', ddl_text, flags=re.IGNORECASE) is not None
 
-    return tables_metadata_list
 
-
-def prep_ddl_script(table_config, output_bucket_name, app_bucket_name, db_name,
-                    stack_info_obj, product_name, environment_name):
+def find_view_dependencies(ddl_text, view_name, db_name, table_names):
     """
-    Obtain the DDL script for each Athena table from S3, substitute DDL parameters (signified by enclosing
-    %% characters) with actual values and write out the revised DDL to S3.
+    Find the tables/views in the application configuration JSON file that are referenced in the DDL of a view.
+    A table/view is considered referenced when its name appears in the DDL either unqualified or qualified with
+    the name of the target database (e.g., table_name, db_name.table_name or "db_name"."table_name").
+
+    Note: Because the DDL is not fully parsed, a column or alias that has the same name as one of the
+    tables/views is also treated as a reference. This only results in the view being processed in a later
+    wave than strictly necessary.
 
     Parameters
     ----------
-        table_config: dictionary
-            The dictionary reflecting the table configuration from application JSON file.
-        output_bucket_name: str
-            Name of the bucket where query execution output should be stored.
-        app_bucket_name: str
-            Name of the bucket where table create DDL templates are stored.
+        ddl_text: str
+            Full text of the CREATE OR REPLACE VIEW statement.
+        view_name: str
+            Lowercase name of the view, which is excluded from its own dependencies.
         db_name: str
-            Name of the database in which the table's existence should be checked.
-        stack_info_obj: object
-            Reference to the stack_info object.
-        product_name: str
-            Name of the application for which to create the folders.
-        environment_name: str
-            Name of the environment for which to create the folders.
+            Name of the database in which the tables/views are created.
+        table_names: iterable
+            Lowercase names of all tables/views in the application configuration JSON file.
     Returns
     -------
-        The original DDL text with parameters (signified by enclosing %% characters) substituted with actual values.
+        dependencies_list: list
+            Sorted list of the lowercase names of the referenced tables/views.
     Exceptions
     ----------
         None
     """
-    logger.info('Processing table={}'.format(table_config['table_name']))
-    logger.debug('DDL Script_name: {}'.format(table_config['script_name']))
-    logger.debug('Table folder: {}'.format(table_config['table_folder']))
-    logger.debug('DDL output location before parameter substitution: {}'.format('s3://' + app_bucket_name + '/' +
-                                                                                table_config['sql_folder1']))
-    logger.debug('DDL output location after parameter substitution: {}'.format('s3://' +
-                                                                               stack_info_obj.get_bucket_name_by_label(
-                                                                                   product_name, environment_name,
-                                                                                   'output') + '/' +
-                                                                               table_config['sql_folder2']))
-
-    location_clause = 's3://' + stack_info_obj.get_bucket_name_by_label(
-        product_name, environment_name,
-        table_config['label']) + table_config['location_dir'] + '/' + table_config['table_name']
+    # Remove the text of single-quoted literals (e.g., WHERE code = 'student_reg') and the identifier quotes,
+    # so that only the names of the referenced objects remain in the text.
+    sql_text = re.sub(r"'(?:[^'\\]|\\.)*'", "''", strip_comments(ddl_text))
+    sql_text = sql_text.replace('"', '').replace('`', '').lower()
 
-    # Obtain DDL script with embedded parameters from sql_folder1
-    obj = s3_resource.Object(app_bucket_name,
-                             table_config['sql_folder1'] + '/' + table_config['script_name'])
-    body = obj.get()['Body'].read().decode('utf-8')
-
-    # Replace %%LOCATION%% (not applicable to views) and %%DATABASE%% parameters in DDL script with actual values,
-    # strip any comments (signified by --) and put the output file in the target S3 bucket.
-    body = body.replace('%%LOCATION%%', location_clause).replace('%%DATABASE%%', db_name)
-    body = strip_comments(body)
+    dependencies_set = set()
+    # regex explanation:
+    # (?<![\w.])          the name must not be preceded by a word character or a dot (i.e., alias.column)
+    # (?:(\w+)\s*\.\s*)?  optional database qualifier followed by a dot
+    # (\w+)               name of the table/view
+    # (?![\w])            the name must not be followed by a word character
+    for qualifier, name in re.findall(r'(?<![\w.])(?:(\w+)\s*\.\s*)?(\w+)(?![\w])', sql_text):
+        if name != view_name and name in table_names and (qualifier == '' or qualifier == db_name.lower()):
+            dependencies_set.add(name)
 
-    s3_resource.Object(output_bucket_name, table_config['sql_folder2'] + '/' +
-                       table_config['script_name']).put(Body=body)
-    return str(body)
+    return sorted(dependencies_set)
 
 
-def strip_comments(adhoc_text):
+def schedule_table_waves(table_tasks_dict):
     """
-    A general function that accepts ASCII source text and returns a copy of the text that is stripped
-    of all SQL comments starting with "--".
+    Arrange the tables/views in topological "waves" based on their dependencies. A table/view is assigned to
+    the first wave after all of the tables/views it depends on; the tables/views in the same wave do not depend
+    on each other and may therefore be processed at the same time. Within each wave, the tables/views retain
+    their order in the application configuration JSON file.
 
     Parameters
     ----------
-        adhoc_text: str
-            Any text from which comments (signified by --) need to be removed, in this case the DDL text.
+        table_tasks_dict: dictionary
+            Dictionary of table tasks keyed by lowercase table/view name. Each task includes a 'dependencies'
+            list of lowercase table/view names.
     Returns
     -------
-        The original text with all comments removed.
+        waves_list: list
+            A list of waves, each of which is a list of lowercase table/view names.
     Exceptions
     ----------
-        None
+        Raised if the views reference each other in a cycle.
     """
-    # regex explanation:
-    # \s    any whitespace character
-    # *     zero or more consecutive spaces
-    # --    matches two dashes that signify an SQL comment
-    # .     matches any character (except for line terminators)
-    # \n    matches a line-feed (newline) character (ASCII 10)
-    # ?     matches the previous token between zero and one times, as many times as possible,
-    #       giving back as needed (greedy)
-    return re.sub('\s*--.*\n?', '', adhoc_text, flags=re.MULTILINE)
+    remaining_dependencies_dict = dict((table_name, set(table_task['dependencies']))
+                                       for table_name, table_task in table_tasks_dict.items())
 
+    waves_list = list()
+    while len(remaining_dependencies_dict) > 0:
+        wave = [table_name for table_name, dependencies in remaining_dependencies_dict.items()
+                if len(dependencies) == 0]
+        if len(wave) == 0:
+            raise Exception('Unable to determine the order in which to create the following views, because they '
+                            'reference each other in a cycle: {}'.
+                            format(', '.join(sorted(remaining_dependencies_dict.keys()))))
 
-def detect_table_changes(table_metadata, table_config, ddl_text, db_name,
-                         stack_info_obj, product_name, environment_name):
+        for table_name in wave:
+            del remaining_dependencies_dict[table_name]
+        for dependencies in remaining_dependencies_dict.values():
+            dependencies.difference_update(wave)
+        waves_list.append(wave)
+
+    return waves_list
+
+
+def run_table_tasks(table_tasks, recreated_tables_set, max_concurrent_queries, db_name,
+                    stack_info_obj, product_name, environment_name):
     """
-    Compare the CREATE EXTERNAL TABLE statement in the DDL against the table's metadata to determine
-    if table structure and/or any table properties have changed, requiring the table to be recreated.
+    Process a list of tables/views either one at a time or concurrently. When processed concurrently, each table
+    is handled by its own worker thread, so that the DROP, CREATE and MSCK REPAIR statements of a given table still
+    run in order, while the statements of different tables run at the same time.
 
     Parameters
     ----------
-        table_metadata: list
-            Dictionaries of metadata for existing tables/views.
-        table_config: dictionary
-            The dictionary reflecting the table configuration from application JSON file.
-        ddl_text: str
-            Full text contained in the DDL script that is read from S3.
+        table_tasks: list
+            A list of table task dictionaries for the tables/views to be processed. The tables/views in the list
+            must not depend on each other.
+        recreated_tables_set: set
+            Lowercase names of the tables/views that have been created or recreated by the prior waves.
+        max_concurrent_queries: int
+            Maximum number of tables/views to be processed at the same time.
         db_name: str
-            Name of the database in which the table/view changes should be detected.
+            Name of the database in which the tables/views should be processed.
         stack_info_obj: object
             Reference to the stack_info object.
         product_name: str
@@ -412,324 +675,1411 @@ def detect_table_changes(table_metadata, table_config, ddl_text, db_name,
             Name of the environment for which to create the folders.
     Returns
     -------
-        None
+        recreated_tables_list: list
+            Lowercase names of the tables/views that were created or recreated.
     Exceptions
     ----------
-        None
+        Raised if processing of one or more tables/views fails. Once a failure occurs, tables/views that have not
+        yet started are not processed.
     """
-    logger.debug("Now attempting to detect changes to the existing table: {}".format(table_config['table_name']))
-
-    # To facilitate DDL text parsing, remove line-feeds, carriage-returns, back tics, semi colons
-    # and any single space before closing parentheses. Also, replace tabs with a single space.
-    normalized_ddl_text = ddl_text.replace('\n', ' ').replace('\r', '').replace('`', '').replace(';', ''). \
-        replace('\t', ' ').replace(' )', ')').lower()
-
-    # Replace multiple spaces in the DDL text with a single space to facilitate DDL text parsing.
-    while '  ' in normalized_ddl_text:
-        normalized_ddl_text = normalized_ddl_text.replace('  ', ' ').replace(' ,', ',')
-
-    # DDL can be coded using single quotes, double quotes or both. To facilitate parsing the DDL, convert
-    # all enclosing double quotes to single quotes, but preserve the non-enclosing (embedded) double quotes.
-    # For example, we want to convert:
-    # fields terminated by "\"" escaped by "\""
-    # to:
-    # fields terminated by '\"' escaped by '\"'
-    # However, due to complexities with properly converting only surrounding double quotes to single
-    # quotes this feature has not been implemented. The current version of the program expects values
-    # to be surrounded in single quotes only.
-    # Tried using regex to convert enclosing double quotes to single quotes, but could not formulate
-    # the correct regex, neither could devise a Python function. The following regex pattern does not
-    # preserve the escaped double quotes, as shown in the above example.
-    # normalized_ddl_text = re.sub('"([^\"]*(?:\\.[^\\\"]*)*)"', r"'\1'", normalized_ddl_text)
-    #
-    #  For some unknown reason the embedded double quotes become single quotes using the replaces below.
-    #  Example: fields terminated by "\"" escaped by "\"" --becomes--> fields terminated by '\'' escaped by '\''
-    # normalized_ddl_text = normalized_ddl_text.replace('"', "'").replace("'''", "'\\\"'").replace("\\\'", "'")
-
-    '''
-    # Attempted the following loop to convert the enclosing double quotes to single quotes, but
-    # the logic does not convert the closing (right most) double quotes.
-    ddl_reformatted_text = ''
-    for i in range(len(normalized_ddl_text)):
-        logger.debug("normalized_ddl_text[{}]={}".format(i, normalized_ddl_text[i]))
-        if normalized_ddl_text[i] == '"':
-            if normalized_ddl_text[i-1] != '\\' and normalized_ddl_text[i-1] != "'":
-                ddl_reformatted_text += "'"
-            else:
-                ddl_reformatted_text += normalized_ddl_text[i]
-        else:
-            ddl_reformatted_text += normalized_ddl_text[i]
+    recreated_tables_list = list()
+    if max_concurrent_queries <= 1 or len(table_tasks) <= 1:
+        for table_task in table_tasks:
+            if process_athena_table(table_task, recreated_tables_set, db_name,
+                                    stack_info_obj, product_name, environment_name) is True:
+                recreated_tables_list.append(table_task['table_config']['table_name'].lower())
+        return recreated_tables_list
+
+    logger.info('Processing {} tables/views with up to {} concurrent queries'.
+                format(len(table_tasks), max_concurrent_queries))
+
+    failed_tables_list = list()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrent_queries) as executor:
+        future_to_table_name = {
+            executor.submit(process_athena_table, table_task, recreated_tables_set, db_name,
+                            stack_info_obj, product_name, environment_name):
+                table_task['table_config']['table_name'].lower()
+            for table_task in table_tasks
+        }
 
-    logger.debug('ddl_reformatted_text={}'.format(ddl_reformatted_text))
-    '''
+        for future in concurrent.futures.as_completed(future_to_table_name):
+            table_name = future_to_table_name[future]
+            try:
+                if future.result() is True:
+                    recreated_tables_list.append(table_name)
+            except concurrent.futures.CancelledError:
+                logger.debug('Processing of table: {} was cancelled'.format(table_name))
+            except Exception as e:
+                logger.error('Unable to process table: {} -- {}'.format(table_name, e))
+                failed_tables_list.append(table_name)
+                # Do not start any more tables once a failure occurs; tables that are already being
+                # processed are allowed to complete.
+                for pending_future in future_to_table_name:
+                    pending_future.cancel()
 
-    if has_table_structure_changed(normalized_ddl_text, table_metadata) is True:
-        logger.info("Structure of the existing table={} has changed. Recreating the table.".
-                    format(table_config['table_name']))
+    if len(failed_tables_list) > 0:
+        raise Exception('Unable to process the following tables/views: {}'.format(', '.join(failed_tables_list)))
 
-        drop_table(db_name, table_config['table_name'], table_metadata['TableType'], table_config['temp_folder'],
-                   stack_info_obj, product_name, environment_name)
-        create_table(table_config, ddl_text, db_name, stack_info_obj, product_name, environment_name)
-    else:
-        logger.info("Structure of the existing table={} has not changed. Not recreating the table.".
-                    format(table_config['table_name']))
+    return recreated_tables_list
 
 
-def has_table_structure_changed(ddl_text, table_metadata):
+def process_athena_table(table_task, recreated_tables_set, db_name, stack_info_obj, product_name, environment_name):
     """
-    Determine if the Athena table's structure has changed.
+    Create a table/view that does not exist, recreate an existing view whose DDL or dependencies have changed or
+    detect changes to an existing table and recreate it, if necessary.
 
     Parameters
     ----------
-        ddl_text: str
-            Text of the CREATE EXTERNAL TABLE statement in the table's DDL.
-        table_metadata: Dictionary
-            Athena table's metadata in the form of JSON that is obtained by calling get_tables Glue boto3 API.
-
+        table_task: dictionary
+            The table task dictionary that includes the table configuration from application JSON file
+            (table_config), the metadata of the existing table/view or None (table_metadata), the DDL text (ddl_text),
+            the dependencies of a view and the changes to an existing table that were detected in advance (verdict).
+        recreated_tables_set: set
+            Lowercase names of the tables/views that have been created or recreated by the prior waves.
+        db_name: str
+            Name of the database in which the table/view should be processed.
+        stack_info_obj: object
+            Reference to the stack_info object.
+        product_name: str
+            Name of the application for which to create the folders.
+        environment_name: str
+            Name of the environment for which to create the folders.
     Returns
     -------
-        Boolean True when changes are detected or False when no changes are detected.
+        Boolean True when the table/view was created or recreated or False otherwise.
     Exceptions
     ----------
         None
     """
-    # To facilitate parsing of the DDL, split the columns list segment of the DDL
-    # from the other segments.
-    ddl_columns_segment, ddl_other_segments = split_ddl_columns_segment(ddl_text)
-    ddl_other_segments = ddl_other_segments.strip()
-    logger.debug("ddl_columns_segment=<{}>".format(ddl_columns_segment))
-    logger.debug("ddl_other_segments=<{}>".format(ddl_other_segments))
-
-    ddl_clause_list_sorted = index_ddl_clauses(ddl_other_segments, ddl_clauses_list)
-    logger.debug("ddl_clause_list_sorted={}".format(ddl_clause_list_sorted))
-
-    if have_columns_changed(table_metadata, ddl_columns_segment) is True:
-        return True
-
-    # Create a list of DDL segments other than the columns list based on clauses in the DDL text.
-    ddl_segments = segmentize_ddl_by_clause(ddl_other_segments, ddl_clause_list_sorted)
-    logger.debug("ddl_segments={}".format(ddl_segments))
-
-    if has_table_comment_changed(table_metadata, ddl_segments) is True:
-        return True
-
-    if has_partitioning_changed(table_metadata, ddl_segments) is True:
-        return True
-
-    if has_clustering_changed(table_metadata, ddl_segments) is True:
-        return True
-
-    if has_row_format_changed(table_metadata, ddl_segments) is True:
-        return True
-
-    if has_file_format_changed(table_metadata, ddl_segments) is True:
-        return True
-
-    if has_table_location_changed(table_metadata, ddl_segments) is True:
-        return True
-
-    if have_tblproperties_changed(table_metadata, ddl_segments) is True:
+    table_config = table_task['table_config']
+    table_metadata = table_task['table_metadata']
+    ddl_text = table_task['ddl_text']
+
+    if table_metadata is None:
+        logger.debug('Table: {} does not exist'.format(table_config['table_name']))
+        record_change(table_config['table_name'], None, None, None, 'create')
+        if is_plan_only() is False:
+            create_table(table_config, ddl_text, db_name, stack_info_obj, product_name, environment_name)
         return True
+    else:
+        # Note that for a view to be recreated properly, the DDL for the view must include a
+        # "CREATE OR REPLACE VIEW" clause.
+        if table_metadata['TableType'] == 'VIRTUAL_VIEW':
+            recreated_dependencies_list = [table_name for table_name in table_task['dependencies']
+                                           if table_name in recreated_tables_set]
+            if len(recreated_dependencies_list) > 0:
+                logger.info('Recreating view: {} because the following tables/views it references were recreated: '
+                            '{}'.format(table_config['table_name'], ', '.join(recreated_dependencies_list)))
+                record_change(table_config['table_name'], 'dependencies', None, recreated_dependencies_list,
+                              'recreate')
+            elif has_view_ddl_changed(table_metadata, ddl_text) is True:
+                logger.info('Recreating view: {} because its DDL has changed'.format(table_config['table_name']))
+                record_change(table_config['table_name'], 'view_ddl', None, None, 'recreate')
+            else:
+                logger.info('DDL of the existing view={} and the tables/views it references have not changed. '
+                            'Not recreating the view.'.format(table_config['table_name']))
+                return False
 
-    return False
+            if is_plan_only() is False:
+                create_table(table_config, ddl_text, db_name, stack_info_obj, product_name, environment_name)
+            return True
+        else:
+            logger.debug('Table: {} already exists'.format(table_config['table_name']))
+            logger.debug('table_metadata={}'.format(table_metadata))
+            return detect_table_changes(table_metadata, table_config, ddl_text, db_name,
+                                        stack_info_obj, product_name, environment_name, table_task.get('verdict'))
 
 
-def split_ddl_columns_segment(ddl_text):
+def has_view_ddl_changed(view_metadata, ddl_text):
     """
-    To facilitate parsing of the DDL, split the columns list segment of the DDL from the other segments.
+    Determine if the view's DDL has changed since the view was last created, by comparing the query in the
+    CREATE OR REPLACE VIEW statement against the original query of the view, which Athena stores in the
+    ViewOriginalText of the view's metadata (see decode_view_original_query()). No Athena query is needed.
 
     Parameters
     ----------
+        view_metadata: Dictionary
+            Athena view's metadata in the form of JSON that is obtained by calling get_tables Glue boto3 API.
         ddl_text: str
-            Text of the CREATE EXTERNAL TABLE statement in the table's DDL.
+            Full text of the CREATE OR REPLACE VIEW statement.
     Returns
     -------
-        ddl_columns_segment: str
-            Segment of the DDL that includes the columns list exclusively.
-        DDL segments other than the columns list: str
+        Boolean True when changes are detected or False when no changes are detected.
     Exceptions
     ----------
-        Raised if the parenthesis that surround the columns list and the nested parenthesis contained
-        in the list are not balanced.
+        None
     """
-    # Obtain the list of columns in the DDL based on the outermost opening and closing parenthesis that surround
-    # the list of columns, their data types and optional comments. Note that there may be nested parenthesis in
-    # the columns list for some data types such as decimal(precision, scale).
-    stack = []  # A python stack of indices signifying the position of the opening parenthesis
-    index_dict = {}  # A dictionary of indexes of open/close parenthesis pairs
-
-    start_pos = 0
-    end_pos = 0
-    p_count = 0
-    for i, c in enumerate(ddl_text):
-        if c == '(':
-            stack.append(i)
-            if start_pos == 0:
-                start_pos = i
-            p_count += 1
-        elif c == ')':
-            try:
-                index_dict[stack.pop()] = i
-                p_count -= 1
-                if p_count == 0:
-                    end_pos = i
-                    break
-            except IndexError:
-                logger.error('Encountered unbalanced parentheses while parsing the columns list in DDL -- '
-                             'Check the DDL for syntax errors!')
-                raise IndexError
-
-    if stack:  # check if stack is empty afterwards; typically signifies mismatched opening & closing parenthesis.
-        raise Exception('Encountered unbalanced parentheses while parsing the columns list in DDL -- '
-                        'Check the DDL for syntax errors!')
-
-    # Obtain the position of parenthesis that surround the columns list in DDL.
-    columns_list_start_end = list(index_dict.items())[-1]
-
-    # Obtain the columns list based on the position of the surrounding parenthesis. See example DDL below.
-    # CREATE EXTERNAL TABLE IF NOT EXISTS db_name.table_name ( columns_list )
-    #                                                        ^              ^
-    ddl_columns_segment = ddl_text[columns_list_start_end[0] + 1: columns_list_start_end[1]].strip()
+    original_query = decode_view_original_query(view_metadata.get('ViewOriginalText'))
+    if original_query is None:
+        logger.debug('The original query of view: {} is not available -- a change is assumed'.
+                     format(view_metadata['Name']))
+        return True
+
+    ddl_query_tokens = extract_view_query_tokens(ddl_lexer.tokenize(ddl_text))
+    if ddl_query_tokens is None:
+        logger.debug('Unable to locate the query in the DDL of view: {} -- a change is assumed'.
+                     format(view_metadata['Name']))
+        return True
 
-    return ddl_columns_segment, ddl_text[columns_list_start_end[1] + 1:]
+    ddl_query = normalize_view_query(ddl_query_tokens)
+    meta_query = normalize_view_query(ddl_lexer.tokenize(original_query))
+    logger.debug('ddl_query=<{}>'.format(' '.join(ddl_query)))
+    logger.debug('meta_query=<{}>'.format(' '.join(meta_query)))
+    return ddl_query != meta_query
 
 
-def index_ddl_clauses(ddl_segment_text, clauses_list):
+def decode_view_original_query(view_original_text):
     """
-    Capture the starting position (i.e., index) of each clause that was found in the CREATE EXTERNAL TABLE
-    statement in the DDL.
+    Obtain the original query of a view from the ViewOriginalText of the view's metadata, which Athena writes out
+    as a comment that encloses a base64-encoded JSON payload (i.e., /* Presto View: <payload> */). The query is
+    stored in the originalSql element of the payload.
 
     Parameters
     ----------
-        ddl_segment_text: str
-            Text of the CREATE EXTERNAL TABLE statement in the table's DDL.
-        clauses_list: List
-            A list of clauses that were found in the DDL.
+        view_original_text: str
+            ViewOriginalText of the view's metadata or None.
     Returns
     -------
-        ddl_clause_list_sorted:
-            A list of clauses found in the DDL that are sorted based on their starting position.
+        The original query of the view or None if the ViewOriginalText cannot be decoded.
     Exceptions
     ----------
         None
     """
-    ddl_clause_dict = dict()
-    ddl_clause_list = list()
+    if view_original_text is None:
+        return None
 
-    # Based on the DDL clauses list (refer to ddl_clauses_list and ddl_row_format_subclauses_list),
-    # build a dictionary of the standard DDL segments that are present in the ddl_segment_text and
-    # their starting position (i.e., Index). Clauses not present in the DDL get an index of
-    # NOT_FOUND (i.e., -1).
-    for clause in clauses_list:
-        ddl_clause_dict['Clause'] = clause.strip()
-        clause_index = ddl_segment_text.find(ddl_clause_dict['Clause'])
-        # Must differentiate between the optional table COMMENT segment and any column comment in the
-        # PARTITIONED BY segment. In a syntactically correct DDL, if a table COMMENT segment
-        # exists it must appear immediately after the columns list (i.e., clause index of table
-        # COMMENT if exists will always be zero). The if statement below avoids column comments
-        # in the PARTITIONED BY segment being treated as table COMMENT.
-        if ddl_clause_dict['Clause'] == "comment '":
-            logger.debug("ddl_clause_dict['Clause']={}".format(ddl_clause_dict['Clause']))
-            logger.debug("clause_index={}".format(clause_index))
-            if clause_index == 0:
-                ddl_clause_dict['Index'] = clause_index
-            else:
-                ddl_clause_dict['Index'] = NOT_FOUND
-        else:
-            if clause_index >= 0:
-                ddl_clause_dict['Index'] = clause_index
-            else:
-                ddl_clause_dict['Index'] = NOT_FOUND
-        dictionary_copy = ddl_clause_dict.copy()
-        ddl_clause_list.append(dictionary_copy)
+    match = PRESTO_VIEW_PATTERN.search(view_original_text)
+    if match is None:
+        return None
 
-    # Sort the DDL clauses in the list based on their starting position (i.e., Index).
-    ddl_clause_list_sorted = sorted(ddl_clause_list, key=lambda x: x['Index'])
+    try:
+        payload = json.loads(base64.b64decode(match.group('payload')).decode('utf-8'))
+    except ValueError as ve:
+        logger.warning('Unable to decode the ViewOriginalText of a view -- {}'.format(ve))
+        return None
 
-    return ddl_clause_list_sorted
+    return payload.get('originalSql') if isinstance(payload, dict) else None
 
 
-def segmentize_ddl_by_clause(ddl_text, clauses_list_sorted):
+def extract_view_query_tokens(ddl_tokens):
     """
-    Break the DDL text, excluding the columns list, into segments based on the standard
-    clauses that were found in the CREATE EXTERNAL TABLE statement in the DDL (refer to:
-    https://docs.aws.amazon.com/athena/latest/ug/create-table.html).
+    Obtain the tokens of the query that follows the AS keyword in a CREATE [OR REPLACE] VIEW statement.
 
     Parameters
     ----------
-        ddl_text: str
-            Text of the CREATE EXTERNAL TABLE statement, excluding the columns list, in the table's DDL.
-        clauses_list_sorted: List
-            A list of clauses, other than the columns list, found in the DDL that are sorted based on their
-            starting position.
+        ddl_tokens: list
+            Tokens of the CREATE [OR REPLACE] VIEW statement (see ddl_lexer.tokenize()).
     Returns
     -------
-        ddl_segments: list
-            A list of segments into which the DDL statement has been divided.
+        The tokens of the query or None if the statement is not a CREATE [OR REPLACE] VIEW statement.
     Exceptions
     ----------
         None
     """
-    logger.debug("ddl_text={}".format(ddl_text))
-    logger.debug("clauses_list_sorted={}".format(clauses_list_sorted))
-
-    # Break the DDL text into segments based on entries in the sorted clauses list.
-    ddl_segments = []
-    for i in range(0, len(clauses_list_sorted) - 1):
-        if clauses_list_sorted[i]['Index'] != NOT_FOUND:
-            ddl_segments.append(ddl_text[clauses_list_sorted[i]['Index']:
-                                         clauses_list_sorted[i + 1]['Index']].strip())
-
-    # Include the last DDL segment.
-    if clauses_list_sorted[i + 1]['Index'] != NOT_FOUND:
-        ddl_segments.append(ddl_text[clauses_list_sorted[i + 1]['Index']: len(ddl_text)].strip())
+    for i, token in enumerate(ddl_tokens):
+        if token.type == ddl_lexer.IDENTIFIER and token.value.lower() == 'view':
+            for j in range(i + 1, len(ddl_tokens)):
+                if ddl_tokens[j].type == ddl_lexer.KEYWORD and ddl_tokens[j].value == 'as':
+                    return ddl_tokens[j + 1:]
+            break
 
-    return ddl_segments
+    return None
 
 
-def have_columns_changed(table_metadata, ddl_columns):
+def normalize_view_query(query_tokens):
     """
-    Determine if the Athena table's columns structure has changed by comparing the columns list
-    segment in the DDL against the corresponding metadata JSON segments:
-    "StorageDescriptor": {"Columns": [{"Name": "...", "Type": "...", "Comment": "..."},...]}
+    Normalize the tokens of a view's query for comparison. Whitespace, comments signified by -- and semicolons are
+    ignored and everything except the contents of quoted strings is compared in lowercase. Text in double quotes
+    (i.e., a string literal in a DDL, but a quoted identifier in a query) keeps its case, whereas identifiers,
+    including identifiers enclosed in back tics, are compared in lowercase, because Athena does not distinguish
+    identifiers by case.
 
     Parameters
     ----------
-        table_metadata: Dictionary
-            Athena table's metadata in the form of JSON that is obtained by calling get_tables Glue boto3 API.
-        ddl_columns: List
-            A list of columns and their data types and comments that is extracted from the DDL text.
+        query_tokens: list
+            Tokens of the query (see ddl_lexer.tokenize()).
     Returns
     -------
-        Boolean True when changes are detected or False when no changes are detected.
+        A list of the normalized text of each token.
     Exceptions
     ----------
         None
     """
-    meta_columns = ''
-    for column in table_metadata['StorageDescriptor']['Columns']:
-        try:
-            meta_columns += ' ' + str(column['Name']) + ' ' + str(column['Type']) + " comment '" + \
-                            column['Comment'].replace("'", "\\'") + "'" + ','
-        except KeyError:
-            meta_columns += ' ' + str(column['Name']) + ' ' + str(column['Type']) + ','
-
-    meta_columns = meta_columns[:-1].strip() + ''
-    # Replace multiple spaces in the list of metadata columns with a single space to avoid false
-    # differences when comparing with DDL columns list.
-    while '  ' in meta_columns:
-        meta_columns = meta_columns.replace('  ', ' ').replace(' ,', ',')
-
-    logger.debug("meta_columns={}".format('<' + meta_columns + '>'))
-
-    if ddl_columns == meta_columns.lower():
-        logger.debug("Metadata columns list=\n{}\nis the same as DDL columns list=\n{}".format(meta_columns,
-                                                                                               ddl_columns))
-        return False
-    else:
-        logger.info("Metadata columns list=\n{}\nis different from DDL columns list=\n{}".format(meta_columns,
-                                                                                                 ddl_columns))
-        return True
+    return [token.quote + token.value + token.quote if token.type == ddl_lexer.STRING else token.value.lower()
+            for token in query_tokens if not (token.type == ddl_lexer.PUNCTUATION and token.value == ';')]
+
+
+def construct_catalog_index(db_name, table_names, fetch_strategy='auto'):
+    """
+    Construct an index of the metadata of the configured tables/views that exist in the target database. The index
+    is then used to determine if the specified table/view already exists and can be skipped, as opposed to creating
+    the table/view. For existing tables, the metadata is also used to detect schema changes.
+
+    When the catalog cache is enabled (see --catalog_cache_dir command line option), the metadata of the
+    tables/views whose cache entries have not expired is obtained from the cache and only the remaining
+    tables/views, including the ones that did not exist previously, are obtained from the Glue Data Catalog.
+
+    Parameters
+    ----------
+        db_name: str
+            Name of the database in which the table's existence should be checked.
+        table_names: list
+            Names of the tables/views in the application configuration JSON file.
+        fetch_strategy: str
+            One of the CATALOG_FETCH_STRATEGIES (i.e., auto, scan, filter or point).
+    Returns
+    -------
+        catalog_index: CatalogIndex
+            The index of the metadata of the configured tables/views that exist in the target database.
+    Exceptions
+    ----------
+        None
+    """
+    table_names_set = set(table_name.lower() for table_name in table_names)
+    catalog_index = CatalogIndex()
+
+    if catalog_cache is not None:
+        fresh_entries_dict = catalog_cache.get(db_name, table_names_set)
+        for table_metadata in fresh_entries_dict.values():
+            catalog_index.add(table_metadata)
+        table_names_set.difference_update(fresh_entries_dict.keys())
+        logger.info('Obtained the metadata of {} tables/views from the catalog cache'.format(len(fresh_entries_dict)))
+
+    if len(table_names_set) > 0:
+        tables_metadata_dict = fetch_tables_metadata(db_name, table_names_set, fetch_strategy)
+        for table_name in table_names_set:
+            table_metadata = tables_metadata_dict.get(table_name)
+            if table_metadata is not None:
+                catalog_index.add(table_metadata)
+            if catalog_cache is not None:
+                catalog_cache.put(db_name, table_name, catalog_index.get(table_name))
+
+    logger.debug('Found {} of the {} configured tables/views in database: {}'.
+                 format(len(catalog_index), len(table_names), db_name))
+    return catalog_index
+
+
+def fetch_tables_metadata(db_name, table_names_set, fetch_strategy):
+    """
+    Obtain the metadata of the specified tables/views from the Glue Data Catalog using the specified strategy.
+
+    Parameters
+    ----------
+        db_name: str
+            Name of the database in which the tables/views exist.
+        table_names_set: set
+            Lowercase names of the tables/views.
+        fetch_strategy: str
+            One of the CATALOG_FETCH_STRATEGIES (i.e., auto, scan, filter or point).
+    Returns
+    -------
+        tables_metadata_dict: dictionary
+            Metadata of the specified tables/views that exist in the database keyed by lowercase table/view name.
+    Exceptions
+    ----------
+        None
+    """
+    tables_metadata_dict = dict()
+
+    def add_tables(tables_list):
+        for element in tables_list:
+            if element['Name'].lower() in table_names_set:
+                tables_metadata_dict[element['Name'].lower()] = element
+
+    def look_up_tables(table_names):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=CATALOG_FETCH_MAX_WORKERS) as executor:
+            add_tables(table for table in executor.map(lambda table_name: get_table_metadata(db_name, table_name),
+                                                       sorted(table_names))
+                       if table is not None)
+
+    next_token = None
+    if fetch_strategy == 'auto':
+        # The first page tells whether the database is small enough to be read in one call. Otherwise, the
+        # database has more than CATALOG_PROBE_PAGE_SIZE tables/views and a narrow configuration is better
+        # served by looking up or filtering the configured tables/views.
+        response = glue_client.get_tables(DatabaseName=db_name, MaxResults=CATALOG_PROBE_PAGE_SIZE)
+        add_tables(response['TableList'])
+        next_token = response.get('NextToken')
+        if next_token is None:
+            fetch_strategy = None
+        elif len(table_names_set) <= CATALOG_POINT_LOOKUP_MAX_TABLES:
+            fetch_strategy = 'point'
+        elif len(build_table_names_expression(table_names_set)) <= GLUE_EXPRESSION_MAX_LENGTH:
+            fetch_strategy = 'filter'
+        else:
+            fetch_strategy = 'scan'
+        logger.debug('Catalog fetch strategy for {} tables/views in database: {} is: {}'.
+                     format(len(table_names_set), db_name, fetch_strategy))
+
+    if fetch_strategy == 'point':
+        look_up_tables(table_names_set)
+    elif fetch_strategy == 'filter' or fetch_strategy == 'scan':
+        paginator = glue_client.get_paginator('get_tables')
+        if fetch_strategy == 'filter':
+            # The Expression filter is applied by Glue, which returns only the matching tables/views.
+            response_iterator = paginator.paginate(DatabaseName=db_name,
+                                                   Expression=build_table_names_expression(table_names_set))
+        else:
+            # Resume the scan after the first page when the strategy was chosen automatically.
+            response_iterator = paginator.paginate(DatabaseName=db_name, PaginationConfig={'StartingToken': next_token})
+        for page in response_iterator:
+            add_tables(page['TableList'])
+
+        if fetch_strategy == 'filter':
+            # A table/view that the Expression does not match would be created as if it did not exist, so the
+            # tables/views that the filter did not return are looked up individually.
+            missing_table_names_set = table_names_set.difference(tables_metadata_dict.keys())
+            if len(missing_table_names_set) > 0:
+                logger.debug('Looking up {} tables/views that the filter did not return'.
+                             format(len(missing_table_names_set)))
+                look_up_tables(missing_table_names_set)
+
+    return tables_metadata_dict
+
+
+def build_table_names_expression(table_names):
+    """
+    Build an Expression for get_tables Glue boto3 API that matches the specified tables/views.
+
+    Parameters
+    ----------
+        table_names: iterable
+            Lowercase names of the tables/views.
+    Returns
+    -------
+        The Expression (e.g., ^(table_a|table_b)$).
+    Exceptions
+    ----------
+        None
+    """
+    return '^(' + '|'.join(re.escape(table_name) for table_name in sorted(table_names)) + ')$'
+
+
+def get_table_metadata(db_name, table_name):
+    """
+    Obtain the metadata of a table/view using get_table Glue boto3 API.
+
+    Parameters
+    ----------
+        db_name: str
+            Name of the database in which the table/view exists.
+        table_name: str
+            Name of the table/view.
+    Returns
+    -------
+        The metadata of the table/view or None if the table/view does not exist.
+    Exceptions
+    ----------
+        None
+    """
+    try:
+        return glue_client.get_table(DatabaseName=db_name, Name=table_name)['Table']
+    except ClientError as ce:
+        if ce.response['Error']['Code'] == 'EntityNotFoundException':
+            return None
+        raise
+
+
+class CatalogIndex:
+    """
+    An index of the metadata of existing tables/views keyed by lowercase table/view name. To limit the memory
+    used by large databases, only the metadata elements that the program reads are retained for each table/view
+    (see project_table_metadata()).
+    """
+    def __init__(self):
+        self._tables_dict = dict()
+
+    def __len__(self):
+        return len(self._tables_dict)
+
+    def add(self, table_metadata):
+        """
+        Add the metadata of a table/view to the index.
+
+        Parameters
+        ----------
+            table_metadata: Dictionary
+                Athena table's metadata in the form of JSON that is obtained by calling get_tables Glue boto3 API.
+        """
+        self._tables_dict[table_metadata['Name'].lower()] = project_table_metadata(table_metadata)
+
+    def get(self, table_name):
+        """
+        Obtain the metadata of a table/view.
+
+        Parameters
+        ----------
+            table_name: str
+                Name of the table/view.
+        Returns
+        -------
+            The projected metadata dictionary of the table/view or None if the table/view does not exist.
+        """
+        return self._tables_dict.get(table_name.lower())
+
+
+def project_table_metadata(table_metadata):
+    """
+    Construct a copy of a table's/view's metadata that only includes the metadata elements that the program reads
+    to detect changes, load partitions and recreate views.
+
+    Parameters
+    ----------
+        table_metadata: Dictionary
+            Athena table's metadata in the form of JSON that is obtained by calling get_tables Glue boto3 API.
+    Returns
+    -------
+        projected_metadata: Dictionary
+            The metadata with the same structure as the get_tables response, limited to the elements that are read.
+    Exceptions
+    ----------
+        None
+    """
+    def project_columns(columns_list):
+        return [dict((key, column[key]) for key in ('Name', 'Type', 'Comment') if key in column)
+                for column in columns_list]
+
+    projected_metadata = dict((key, table_metadata[key]) for key in ('Name', 'TableType', 'CreateTime', 'UpdateTime',
+                                                                     'VersionId', 'ViewOriginalText')
+                              if key in table_metadata)
+    # Table parameters may include large entries, such as Spark schemas, that are never compared.
+    projected_metadata['Parameters'] = dict((key, value) for key, value in table_metadata.get('Parameters',
+                                                                                              dict()).items()
+                                            if key.lower() == 'comment' or key == DDL_FINGERPRINT_PARAMETER or
+                                            is_tracked_tblproperty(key))
+    projected_metadata['PartitionKeys'] = project_columns(table_metadata.get('PartitionKeys', list()))
+
+    storage_descriptor = table_metadata.get('StorageDescriptor', dict())
+    projected_metadata['StorageDescriptor'] = dict((key, storage_descriptor[key])
+                                                   for key in ('Location', 'InputFormat', 'OutputFormat',
+                                                               'NumberOfBuckets')
+                                                   if key in storage_descriptor)
+    projected_metadata['StorageDescriptor']['Columns'] = project_columns(storage_descriptor.get('Columns', list()))
+    projected_metadata['StorageDescriptor']['BucketColumns'] = list(storage_descriptor.get('BucketColumns', list()))
+    serde_info = storage_descriptor.get('SerdeInfo', dict())
+    projected_metadata['StorageDescriptor']['SerdeInfo'] = {
+        'SerializationLibrary': serde_info.get('SerializationLibrary', ''),
+        'Parameters': dict(serde_info.get('Parameters', dict()))
+    }
+
+    return projected_metadata
+
+
+def get_ddl_template(table_config, app_bucket_name):
+    """
+    Obtain the DDL script of a table/view with embedded parameters (signified by enclosing %% characters) from
+    sql_folder1. The S3 client is thread-safe, so the scripts of all tables/views can be downloaded at the same time.
+    When the template cache is enabled (see --template_cache_dir command line option), a script that has not
+    changed since it was cached is not downloaded again.
+
+    Parameters
+    ----------
+        table_config: dictionary
+            The dictionary reflecting the table configuration from application JSON file.
+        app_bucket_name: str
+            Name of the bucket where table create DDL templates are stored.
+    Returns
+    -------
+        The text of the DDL script.
+    Exceptions
+    ----------
+        None
+    """
+    logger.debug('Obtaining DDL script: {}'.format('s3://' + app_bucket_name + '/' + table_config['sql_folder1'] +
+                                                   '/' + table_config['script_name']))
+    return get_app_object(app_bucket_name, table_config['sql_folder1'] + '/' + table_config['script_name']).\
+        decode('utf-8')
+
+
+def get_app_object(app_bucket_name, object_key):
+    """
+    Obtain the content of a file in the app bucket (i.e., the application configuration JSON file or a DDL script)
+    from the DDL bundle, if one was specified (see --bundle command line option), or from S3 otherwise.
+
+    Parameters
+    ----------
+        app_bucket_name: str
+            Name of the bucket where the application configuration JSON file and DDL scripts are stored.
+        object_key: str
+            Key of the file in the app bucket.
+    Returns
+    -------
+        The content of the file as bytes.
+    Exceptions
+    ----------
+        Raised if the file is not included in the DDL bundle.
+    """
+    if ddl_bundle is not None:
+        if object_key not in ddl_bundle:
+            raise Exception('The DDL bundle does not include: {} -- Rebuild the bundle using build_bundle.py!'.
+                            format(object_key))
+        return ddl_bundle[object_key]
+
+    return get_object_content(s3, app_bucket_name, object_key, template_cache)
+
+
+def prep_ddl_script(table_config, ddl_template, db_name, stack_info_obj, product_name, environment_name):
+    """
+    Substitute DDL parameters (signified by enclosing %% characters) in the DDL script of an Athena table/view with
+    actual values.
+
+    Parameters
+    ----------
+        table_config: dictionary
+            The dictionary reflecting the table configuration from application JSON file.
+        ddl_template: str
+            The DDL script with embedded parameters, as obtained from sql_folder1 (see get_ddl_template()).
+        db_name: str
+            Name of the database in which the table's existence should be checked.
+        stack_info_obj: object
+            Reference to the stack_info object.
+        product_name: str
+            Name of the application for which to create the folders.
+        environment_name: str
+            Name of the environment for which to create the folders.
+    Returns
+    -------
+        The original DDL text with parameters (signified by enclosing %% characters) substituted with actual values.
+    Exceptions
+    ----------
+        None
+    """
+    logger.info('Processing table={}'.format(table_config['table_name']))
+    logger.debug('DDL Script_name: {}'.format(table_config['script_name']))
+    logger.debug('Table folder: {}'.format(table_config['table_folder']))
+
+    location_clause = 's3://' + stack_info_obj.get_bucket_name_by_label(
+        product_name, environment_name,
+        table_config['label']) + table_config['location_dir'] + '/' + table_config['table_name']
+
+    # Replace %%LOCATION%% (not applicable to views) and %%DATABASE%% parameters in DDL script with actual values
+    # and strip any comments (signified by --).
+    body = ddl_template.replace('%%LOCATION%%', location_clause).replace('%%DATABASE%%', db_name)
+    body = strip_comments(body)
+    return str(body)
+
+
+def list_published_ddl_scripts(output_bucket_name, sql_folders):
+    """
+    List the DDL scripts that were written out to sql_folder2 by the previous executions, using a single listing
+    per folder as opposed to a HEAD request per script.
+
+    Note: The ETag of an object that is uploaded with a single put_object call and is not encrypted with SSE-KMS is
+    the MD5 digest of its content. Otherwise, the ETag never matches the MD5 digest of a script, so the script is
+    uploaded as if it had changed. Likewise, when the folders cannot be listed (e.g., s3:ListBucket is not granted
+    on the output bucket), no scripts are returned, so that all scripts are uploaded.
+
+    Parameters
+    ----------
+        output_bucket_name: str
+            Name of the bucket where query execution output should be stored.
+        sql_folders: set
+            The sql_folder2 folders of the configured tables/views.
+    Returns
+    -------
+        etags_dict: dictionary
+            The ETags of the scripts, without the enclosing double quotes, keyed by object key.
+    Exceptions
+    ----------
+        None
+    """
+    etags_dict = dict()
+    paginator = s3.get_paginator('list_objects_v2')
+    try:
+        for sql_folder in sql_folders:
+            for page in paginator.paginate(Bucket=output_bucket_name, Prefix=sql_folder + '/'):
+                for obj in page.get('Contents', list()):
+                    etags_dict[obj['Key']] = obj['ETag'].strip('"')
+    except ClientError as ce:
+        logger.warning('Unable to list the DDL scripts in bucket: {} -- all DDL scripts are uploaded. {}'.
+                       format(output_bucket_name, ce))
+        return dict()
+
+    logger.debug('Found {} DDL scripts in: {}'.format(len(etags_dict), ', '.join(sorted(sql_folders))))
+    return etags_dict
+
+
+def put_ddl_script(table_config, ddl_text, output_bucket_name):
+    """
+    Write out the DDL script of a table/view with substituted parameters to sql_folder2.
+
+    Parameters
+    ----------
+        table_config: dictionary
+            The dictionary reflecting the table configuration from application JSON file.
+        ddl_text: str
+            The DDL text with parameters substituted with actual values (see prep_ddl_script()).
+        output_bucket_name: str
+            Name of the bucket where query execution output should be stored.
+    Returns
+    -------
+        None
+    Exceptions
+    ----------
+        None
+    """
+    logger.debug('DDL output location after parameter substitution: {}'.format('s3://' + output_bucket_name + '/' +
+                                                                               table_config['sql_folder2']))
+    s3.put_object(Bucket=output_bucket_name, Key=table_config['sql_folder2'] + '/' + table_config['script_name'],
+                  Body=ddl_text.encode('utf-8'))
+
+
+def strip_comments(adhoc_text):
+    """
+    A general function that accepts ASCII source text and returns a copy of the text that is stripped
+    of all SQL comments starting with "--".
+
+    Parameters
+    ----------
+        adhoc_text: str
+            Any text from which comments (signified by --) need to be removed, in this case the DDL text.
+    Returns
+    -------
+        The original text with all comments removed.
+    Exceptions
+    ----------
+        None
+    """
+    # regex explanation:
+    # \s    any whitespace character
+    # *     zero or more consecutive spaces
+    # --    matches two dashes that signify an SQL comment
+    # .     matches any character (except for line terminators)
+    # \n    matches a line-feed (newline) character (ASCII 10)
+    # ?     matches the previous token between zero and one times, as many times as possible,
+    #       giving back as needed (greedy)
+    return re.sub('\s*--.*\n?', '', adhoc_text, flags=re.MULTILINE)
+
+
+def detect_table_changes(table_metadata, table_config, ddl_text, db_name,
+                         stack_info_obj, product_name, environment_name, verdict=None):
+    """
+    Compare the CREATE EXTERNAL TABLE statement in the DDL against the table's metadata to determine
+    if table structure and/or any table properties have changed, requiring the table to be recreated, and
+    alter or recreate the table accordingly.
+
+    Parameters
+    ----------
+        table_metadata: list
+            Dictionaries of metadata for existing tables/views.
+        table_config: dictionary
+            The dictionary reflecting the table configuration from application JSON file.
+        ddl_text: str
+            Full text contained in the DDL script that is read from S3.
+        db_name: str
+            Name of the database in which the table/view changes should be detected.
+        stack_info_obj: object
+            Reference to the stack_info object.
+        product_name: str
+            Name of the application for which to create the folders.
+        environment_name: str
+            Name of the environment for which to create the folders.
+        verdict: dictionary
+            The outcome of evaluate_table_changes() when the changes were detected in advance (see
+            evaluate_tables_changes()) or None to detect the changes now.
+    Returns
+    -------
+        Boolean True when the table was (or, in plan mode, would be) recreated or altered or False otherwise.
+    Exceptions
+    ----------
+        None
+    """
+    table_name = table_config['table_name']
+    if verdict is None:
+        logger.debug("Now attempting to detect changes to the existing table: {}".format(table_name))
+        verdict = evaluate_table_changes(table_metadata, ddl_text, change_report is not None)
+
+    if verdict['reason'] == 'fingerprint':
+        logger.info("DDL fingerprint of the existing table={} matches the DDL. Not recreating the table.".
+                    format(table_name))
+        return False
+    elif verdict['reason'] == 'spec':
+        logger.info("Spec of the existing table={} is the same as the DDL's spec. Not recreating the table.".
+                    format(table_name))
+        return False
+
+    differences_list = verdict['differences']
+    for difference in differences_list:
+        logger.info("Metadata {}={} of the existing table={} is different from the DDL's {}={}".
+                    format(difference['segment'], difference['old'], table_name, difference['segment'],
+                           difference['new']))
+
+    if verdict['action'] == 'patch':
+        record_changes(table_name, differences_list, 'patch')
+        if is_plan_only() is False:
+            ddl_tokens = ddl_lexer.tokenize(ddl_text)
+            patch_table_metadata(db_name, table_name, ddl_tokens, TableSpec.from_ddl(ddl_tokens), differences_list)
+        return True
+    elif verdict['action'] == 'recreate':
+        logger.info("Structure of the existing table={} has changed. Recreating the table.".format(table_name))
+        record_changes(table_name, differences_list, 'recreate')
+        # Segments whose differences are only detected by the segment checks (i.e., not by TableSpec.diff()).
+        for segment in verdict['changed_segments']:
+            if segment not in [difference['segment'] for difference in differences_list]:
+                record_change(table_name, segment, None, None, 'recreate')
+        if is_plan_only() is True:
+            return True
+
+        # Partitions are lost when the table is dropped. Take a snapshot of the registered partitions, so that they
+        # can be registered again once the table is recreated without having to list the table's S3 location.
+        if len(table_metadata['PartitionKeys']) > 0:
+            partition_snapshot = take_partition_snapshot(db_name, table_metadata)
+        else:
+            partition_snapshot = None
+
+        drop_table(db_name, table_name, table_metadata['TableType'], table_config['temp_folder'],
+                   stack_info_obj, product_name, environment_name)
+        create_table(table_config, ddl_text, db_name, stack_info_obj, product_name, environment_name,
+                     partition_snapshot)
+        return True
+    else:
+        logger.info("Structure of the existing table={} has not changed. Not recreating the table.".
+                    format(table_name))
+        record_changes(table_name, differences_list, 'none')
+        return False
+
+
+def evaluate_table_changes(table_metadata, ddl_text, check_all_segments=False):
+    """
+    Determine the action that the changes between the CREATE EXTERNAL TABLE statement in the DDL and the table's
+    metadata call for, without making any AWS API calls, so that the changes to many tables can be detected in
+    worker processes (see evaluate_tables_changes()).
+
+    The checks are made in the following order:
+        1. When the table was created by this program from the same DDL and has not been altered since, the
+           fingerprint stamped in the table's parameters still matches (see compute_ddl_fingerprint()).
+        2. When the content hashes of the canonical specs of the DDL and the table match, the table has not
+           changed (see table_spec.py).
+        3. Changes that are limited to the columns list, table comment, TBLPROPERTIES and location may not require
+           the table to be recreated (see can_patch_table_metadata()).
+        4. Otherwise, the segments of the DDL are compared to the metadata one at a time (see
+           has_table_structure_changed()).
+
+    Parameters
+    ----------
+        table_metadata: Dictionary
+            Athena table's metadata in the form of JSON that is obtained by calling get_tables Glue boto3 API.
+        ddl_text: str
+            Full text contained in the DDL script that is read from S3.
+        check_all_segments: bool
+            True to check all segments (e.g., for the change report) as opposed to stopping at the first change.
+    Returns
+    -------
+        verdict: dictionary
+            A dictionary with the action (i.e., none, patch or recreate), the reason for no action (fingerprint,
+            spec or segments), the differences between the specs (see TableSpec.diff()) and the names of the
+            segments that are found to have changed by the segment checks.
+    Exceptions
+    ----------
+        None
+    """
+    verdict = {'action': 'none', 'reason': None, 'differences': list(), 'changed_segments': list()}
+
+    # To facilitate DDL text parsing, break the DDL into tokens. Tokenizing drops line-feeds, carriage-returns,
+    # tabs, back tics and semi colons, and collapses whitespace outside of quoted strings (see ddl_lexer.py).
+    ddl_tokens = ddl_lexer.tokenize(ddl_text)
+
+    ddl_fingerprint = table_metadata['Parameters'].get(DDL_FINGERPRINT_PARAMETER)
+    if ddl_fingerprint is not None and ddl_fingerprint == compute_ddl_fingerprint(ddl_tokens, table_metadata):
+        verdict['reason'] = 'fingerprint'
+        return verdict
+
+    ddl_spec = TableSpec.from_ddl(ddl_tokens)
+    meta_spec = TableSpec.from_glue(table_metadata)
+    if ddl_spec.content_hash() == meta_spec.content_hash():
+        verdict['reason'] = 'spec'
+        return verdict
+
+    verdict['differences'] = meta_spec.diff(ddl_spec)
+    if can_patch_table_metadata(table_metadata['Name'], table_metadata, ddl_spec, verdict['differences']) is True:
+        verdict['action'] = 'patch'
+        return verdict
+
+    changed_segments_list = list() if check_all_segments is True else None
+    if has_table_structure_changed(ddl_tokens, table_metadata, changed_segments_list) is True:
+        verdict['action'] = 'recreate'
+        verdict['changed_segments'] = changed_segments_list or list()
+    else:
+        verdict['reason'] = 'segments'
+    return verdict
+
+
+def evaluate_tables_changes(table_tasks, detection_workers=DEFAULT_DETECTION_WORKERS):
+    """
+    Detect the changes to the existing tables in advance (see evaluate_table_changes()) and store the outcome in
+    the 'verdict' of each table task. Parsing and comparing the DDL of wide tables is CPU-bound, so the changes are
+    detected in a pool of worker processes when there are enough tables. The worker processes are started with the
+    spawn method and only receive the DDL text and projected metadata of each table, while any Athena queries and
+    Glue API calls are made by the main process when the tables are processed. The worker processes do not share
+    the logging configuration of the main process, so the messages that each worker process logs are returned along
+    with the verdict and logged by the main process.
+
+    Parameters
+    ----------
+        table_tasks: list
+            Table task dictionaries of the existing tables (i.e., not views).
+        detection_workers: int
+            Maximum number of worker processes. A value of 1 detects the changes in the main process.
+    Returns
+    -------
+        None
+    Exceptions
+    ----------
+        None
+    """
+    check_all_segments = change_report is not None
+    workers = min(detection_workers, len(table_tasks) // DETECTION_MIN_TABLES_PER_WORKER)
+    if workers <= 1:
+        for table_task in table_tasks:
+            table_task['verdict'] = None
+        return
+
+    logger.info('Detecting changes to {} tables using {} worker processes'.format(len(table_tasks), workers))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers,
+                                                mp_context=multiprocessing.get_context('spawn')) as executor:
+        future_to_table_task = dict((executor.submit(evaluate_table_changes_in_worker, table_task['table_metadata'],
+                                                     table_task['ddl_text'], check_all_segments,
+                                                     logger.getEffectiveLevel()), table_task)
+                                    for table_task in table_tasks)
+        for future in concurrent.futures.as_completed(future_to_table_task):
+            table_task = future_to_table_task[future]
+            try:
+                verdict, log_records_list = future.result()
+                for level, message in log_records_list:
+                    logger.log(level, message)
+                table_task['verdict'] = verdict
+            except Exception as e:
+                # The changes are detected again when the table is processed, so that the failure is reported
+                # along with the table.
+                logger.debug('Unable to detect changes to table: {} in a worker process -- {}'.
+                             format(table_task['table_config']['table_name'], e))
+                table_task['verdict'] = None
+
+
+def evaluate_table_changes_in_worker(table_metadata, ddl_text, check_all_segments, logger_level):
+    """
+    Detect the changes to a table in a worker process (see evaluate_table_changes()), capturing the messages that
+    are logged in the meantime instead of writing them out.
+
+    Parameters
+    ----------
+        table_metadata: Dictionary
+            Athena table's metadata in the form of JSON that is obtained by calling get_tables Glue boto3 API.
+        ddl_text: str
+            Full text contained in the DDL script that is read from S3.
+        check_all_segments: bool
+            True to check all segments as opposed to stopping at the first change.
+        logger_level: int
+            Level of the logger in the main process.
+    Returns
+    -------
+        verdict: dictionary
+            The verdict of evaluate_table_changes().
+        log_records_list: list
+            A (level, message) tuple for each message that was logged.
+    Exceptions
+    ----------
+        None
+    """
+    logger.setLevel(logger_level)
+    logger.propagate = False
+    log_buffer = logging.handlers.BufferingHandler(capacity=sys.maxsize)
+    logger.addHandler(log_buffer)
+    try:
+        verdict = evaluate_table_changes(table_metadata, ddl_text, check_all_segments)
+    finally:
+        logger.removeHandler(log_buffer)
+
+    return verdict, [(record.levelno, record.getMessage()) for record in log_buffer.buffer]
+
+
+def can_patch_table_metadata(table_name, table_metadata, ddl_spec, differences_list):
+    """
+    Determine if all differences between the DDL and an existing table can be applied to the table's metadata
+    in place (see patch_table_metadata()), as opposed to dropping and recreating the table. The differences that
+    can be applied in place are:
+        1. Changes to the columns list that are classified as add, comment or type (see classify_column_changes()).
+           Columns are only added or widened in place in tables that are not partitioned, because the existing
+           partitions retain the columns list they were registered with and Athena fails to query partitions
+           whose column types do not match the table's (HIVE_PARTITION_SCHEMA_MISMATCH).
+        2. Changes to the table comment.
+        3. Changes to the tracked TBLPROPERTIES (see table_spec.is_tracked_tblproperty()).
+        4. Changes to the location of a table that is not partitioned. The partitions of a partitioned table
+           reference the old location, so the table is recreated instead and its partitions are loaded from the
+           folders under the new location (see sync_partitions()). No data is moved to the new location.
+
+    Parameters
+    ----------
+        table_name: str
+            Name of the table.
+        table_metadata: Dictionary
+            Athena table's metadata in the form of JSON that is obtained by calling get_tables Glue boto3 API.
+        ddl_spec: TableSpec
+            Spec of the table in the DDL.
+        differences_list: list
+            Segments of the table's spec that differ from the DDL's spec (see TableSpec.diff()).
+    Returns
+    -------
+        Boolean True when the differences can be applied in place or False when the table must be recreated.
+    Exceptions
+    ----------
+        None
+    """
+    segments_set = set(difference['segment'] for difference in differences_list)
+    if len(segments_set) == 0 or not segments_set.issubset(METADATA_PATCH_SEGMENTS):
+        logger.debug('Changes to segments: {} of table={} cannot be applied in place'.
+                     format(', '.join(sorted(segments_set)), table_name))
+        return False
+
+    if 'location' in segments_set and len(table_metadata['PartitionKeys']) > 0:
+        logger.info('Location of the partitioned table={} has changed -- the table is recreated instead of being '
+                    'altered in place'.format(table_name))
+        return False
+
+    if 'columns' in segments_set:
+        storage_descriptor = table_metadata['StorageDescriptor']
+        column_changes_list = classify_column_changes(build_meta_columns_list(storage_descriptor['Columns']),
+                                                      ddl_spec.columns,
+                                                      storage_descriptor['SerdeInfo'].get('SerializationLibrary'))
+        for column_change in column_changes_list:
+            logger.info('Column change of table={}: {}'.format(table_name, column_change))
+
+        if len(column_changes_list) == 0 or \
+                any(column_change['change'] not in IN_PLACE_COLUMN_CHANGES for column_change in column_changes_list):
+            logger.info('Columns of the existing table={} cannot be altered in place'.format(table_name))
+            return False
+
+        if len(table_metadata['PartitionKeys']) > 0 and \
+                any(column_change['change'] in ('add', 'type') for column_change in column_changes_list):
+            logger.info('Columns of the partitioned table={} were added or widened -- the table is recreated instead '
+                        'of being altered in place'.format(table_name))
+            return False
+
+    return True
+
+
+def patch_table_metadata(db_name, table_name, ddl_tokens, ddl_spec, differences_list):
+    """
+    Apply the differences between the DDL and an existing table to the table's metadata using a single
+    update_table Glue boto3 API call, as opposed to dropping and recreating the table. The partitions of the table
+    are retained. The caller must first determine that the differences can be applied in place (see
+    can_patch_table_metadata()).
+
+    Parameters
+    ----------
+        db_name: str
+            Name of the database in which the table exists.
+        table_name: str
+            Name of the table.
+        ddl_tokens: list
+            Tokens of the CREATE EXTERNAL TABLE statement in the table's DDL (see ddl_lexer.tokenize()).
+        ddl_spec: TableSpec
+            Spec of the table in the DDL.
+        differences_list: list
+            Segments of the table's spec that differ from the DDL's spec (see TableSpec.diff()).
+    Returns
+    -------
+        None
+    Exceptions
+    ----------
+        None
+    """
+    segments_set = set(difference['segment'] for difference in differences_list)
+
+    # The complete metadata of the table is needed, because update_table replaces the entire table definition.
+    table_metadata = get_table_metadata(db_name, table_name)
+    table_input = build_table_input(table_metadata)
+    table_input['StorageDescriptor'] = dict(table_metadata['StorageDescriptor'])
+
+    if 'columns' in segments_set:
+        meta_columns_dict = dict((column['Name'].lower(), column)
+                                 for column in table_metadata['StorageDescriptor']['Columns'])
+        columns_list = list()
+        for name, data_type, comment in ddl_spec.columns:
+            column = dict(meta_columns_dict.get(name, dict()))
+            column['Name'] = name
+            # Glue stores data types without any whitespace (e.g., decimal(10,2)).
+            column['Type'] = normalize_type(data_type)
+            if comment is None:
+                column.pop('Comment', None)
+            else:
+                column['Comment'] = comment
+            columns_list.append(column)
+        table_input['StorageDescriptor']['Columns'] = columns_list
+
+    if 'table_comment' in segments_set:
+        if ddl_spec.table_comment is None:
+            table_input['Parameters'].pop('comment', None)
+        else:
+            table_input['Parameters']['comment'] = ddl_spec.table_comment
+
+    if 'tblproperties' in segments_set:
+        for key in [key for key in table_input['Parameters'] if is_tracked_tblproperty(key)]:
+            del table_input['Parameters'][key]
+        table_input['Parameters'].update(ddl_spec.tblproperties)
+
+    if 'location' in segments_set:
+        table_input['StorageDescriptor']['Location'] = ddl_spec.location
+
+    table_input['Parameters'][DDL_FINGERPRINT_PARAMETER] = compute_ddl_fingerprint(ddl_tokens, table_input)
+
+    logger.info('Applying changes to segments: {} of table: {}.{} in place'.
+                format(', '.join(sorted(segments_set)), db_name, table_name))
+    invalidate_cached_table_metadata(db_name, table_name)
+    glue_client.update_table(DatabaseName=db_name, TableInput=table_input)
+
+
+def classify_column_changes(meta_columns_list, ddl_columns_list, serde_library):
+    """
+    Classify the differences between the columns list of an existing table and the columns list in the DDL.
+    Each change is one of:
+        add: The column is appended to the end of the columns list.
+        comment: Only the comment of the column has changed.
+        type: The data type of the column is widened (e.g., int to bigint) in a way that the table's storage format
+              accepts (see is_widening_type_change()), optionally along with its comment.
+        incompatible_type: The data type of the column has changed otherwise.
+        drop: The column is removed from the columns list.
+        reorder: The order of the existing columns has changed or a column is inserted before the last existing
+                 column.
+    Only the add, comment and type changes can be made in place (see IN_PLACE_COLUMN_CHANGES).
+
+    Parameters
+    ----------
+        meta_columns_list: list
+            A list of (name, type, comment) tuples of the columns in the table's metadata (see
+            build_meta_columns_list()).
+        ddl_columns_list: list
+            A list of (name, type, comment) tuples of the columns in the DDL (see table_spec.parse_columns()).
+        serde_library: str
+            Serde library of the table in the table's metadata (i.e., SerdeInfo.SerializationLibrary).
+    Returns
+    -------
+        column_changes_list: list
+            A dictionary for each change with the column name ('column'), the kind of change ('change') and the
+            (type, comment) of the column in the metadata ('old') and in the DDL ('new').
+    Exceptions
+    ----------
+        None
+    """
+    # Names, data types and comments are compared regardless of case, as are the rest of the DDL segments.
+    meta_columns_dict = dict((name, (data_type, comment)) for name, data_type, comment in meta_columns_list)
+    ddl_columns_dict = dict((name.lower(), (normalize_type(data_type), comment if comment is None else comment.lower()))
+                            for name, data_type, comment in ddl_columns_list)
+    meta_names_list = [name for name, data_type, comment in meta_columns_list]
+    ddl_names_list = [name.lower() for name, data_type, comment in ddl_columns_list]
+
+    column_changes_list = list()
+    for name in meta_names_list:
+        if name not in ddl_columns_dict:
+            column_changes_list.append({'column': name, 'change': 'drop', 'old': meta_columns_dict[name],
+                                        'new': None})
+            continue
+        (meta_type, meta_comment), (ddl_type, ddl_comment) = meta_columns_dict[name], ddl_columns_dict[name]
+        if meta_type != ddl_type:
+            change = 'type' if is_widening_type_change(meta_type, ddl_type, serde_library) else 'incompatible_type'
+        elif meta_comment != ddl_comment:
+            change = 'comment'
+        else:
+            continue
+        column_changes_list.append({'column': name, 'change': change, 'old': meta_columns_dict[name],
+                                    'new': ddl_columns_dict[name]})
+
+    for name in ddl_names_list:
+        if name not in meta_columns_dict:
+            column_changes_list.append({'column': name, 'change': 'add', 'old': None, 'new': ddl_columns_dict[name]})
+
+    # Existing columns must keep their positions, so that new columns can only be appended to the end of the list.
+    if ddl_names_list[:len(meta_names_list)] != meta_names_list and \
+            not any(column_change['change'] == 'drop' for column_change in column_changes_list):
+        column_changes_list.append({'column': None, 'change': 'reorder', 'old': meta_names_list,
+                                    'new': ddl_names_list})
+
+    return column_changes_list
+
+
+def is_widening_type_change(old_type, new_type, serde_library):
+    """
+    Determine if a column's data type change widens the type, so that existing data can be read with the new type.
+    Tables in a text format accept all widening changes, tables in Parquet only the numeric widening changes in
+    WIDENING_TYPE_CHANGES and tables in any other format none (see TEXT_SERDE_LIBRARIES).
+
+    Parameters
+    ----------
+        old_type: str
+            Data type of the column in the table's metadata.
+        new_type: str
+            Data type of the column in the DDL.
+        serde_library: str
+            Serde library of the table (i.e., SerdeInfo.SerializationLibrary).
+    Returns
+    -------
+        Boolean True when the new data type is wider than the old data type or False otherwise.
+    Exceptions
+    ----------
+        None
+    """
+    if serde_library not in TEXT_SERDE_LIBRARIES + NUMERIC_WIDENING_SERDE_LIBRARIES:
+        return False
+    old_type = normalize_type(old_type)
+    new_type = normalize_type(new_type)
+    if new_type in WIDENING_TYPE_CHANGES.get(old_type, ()):
+        return True
+    if serde_library not in TEXT_SERDE_LIBRARIES:
+        return False
+
+    old_match = re.fullmatch(r'(decimal|varchar|char)\((\d+)(?:,(\d+))?\)', old_type)
+    if old_match is None:
+        return False
+    if old_match.group(1) in ('varchar', 'char') and new_type == 'string':
+        return True
+
+    new_match = re.fullmatch(r'(decimal|varchar|char)\((\d+)(?:,(\d+))?\)', new_type)
+    if new_match is None or new_match.group(1) != old_match.group(1):
+        return False
+    old_precision, old_scale = int(old_match.group(2)), int(old_match.group(3) or 0)
+    new_precision, new_scale = int(new_match.group(2)), int(new_match.group(3) or 0)
+    # A decimal is widened when neither its integral digits nor its scale are reduced.
+    return new_scale >= old_scale and new_precision - new_scale >= old_precision - old_scale
+
+
+def has_table_structure_changed(ddl_tokens, table_metadata, changed_segments_list=None):
+    """
+    Determine if the Athena table's structure has changed.
+
+    Parameters
+    ----------
+        ddl_tokens: list
+            Tokens of the CREATE EXTERNAL TABLE statement in the table's DDL (see ddl_lexer.tokenize()).
+        table_metadata: Dictionary
+            Athena table's metadata in the form of JSON that is obtained by calling get_tables Glue boto3 API.
+        changed_segments_list: list
+            When provided, all segments are checked, as opposed to stopping at the first change, and the names of
+            the changed segments (see table_spec.SEGMENTS) are appended to the list.
+
+    Returns
+    -------
+        Boolean True when changes are detected or False when no changes are detected.
+    Exceptions
+    ----------
+        None
+    """
+    # To facilitate parsing of the DDL, split the columns list segment of the DDL
+    # from the other segments.
+    ddl_columns_tokens, ddl_other_tokens = split_ddl_columns_segment(ddl_tokens)
+    ddl_columns_list = parse_columns(ddl_columns_tokens)
+    # The clauses other than the columns list are parsed from the normalized text of the DDL.
+    ddl_other_segments = ddl_lexer.render(ddl_other_tokens)
+    logger.debug("ddl_columns_list={}".format(ddl_columns_list))
+    logger.debug("ddl_other_segments=<{}>".format(ddl_other_segments))
+
+    ddl_clause_list_sorted = index_ddl_clauses(ddl_other_segments, ddl_clauses_list)
+    logger.debug("ddl_clause_list_sorted={}".format(ddl_clause_list_sorted))
+
+    if have_columns_changed(table_metadata, ddl_columns_list) is True:
+        if changed_segments_list is None:
+            return True
+        changed_segments_list.append('columns')
+
+    # Create a list of DDL segments other than the columns list based on clauses in the DDL text.
+    ddl_segments = segmentize_ddl_by_clause(ddl_other_segments, ddl_clause_list_sorted)
+    logger.debug("ddl_segments={}".format(ddl_segments))
+
+    for segment, has_segment_changed in (('table_comment', has_table_comment_changed),
+                                         ('partition_keys', has_partitioning_changed),
+                                         ('bucketing', has_clustering_changed),
+                                         ('serde', has_row_format_changed),
+                                         ('file_format', has_file_format_changed),
+                                         ('location', has_table_location_changed),
+                                         ('tblproperties', have_tblproperties_changed)):
+        if has_segment_changed(table_metadata, ddl_segments) is True:
+            if changed_segments_list is None:
+                return True
+            changed_segments_list.append(segment)
+
+    return changed_segments_list is not None and len(changed_segments_list) > 0
+
+
+def split_ddl_columns_segment(ddl_tokens):
+    """
+    To facilitate parsing of the DDL, split the columns list segment of the DDL from the other segments.
+
+    Parameters
+    ----------
+        ddl_tokens: list
+            Tokens of the CREATE EXTERNAL TABLE statement in the table's DDL.
+    Returns
+    -------
+        ddl_columns_tokens: list
+            Tokens of the segment of the DDL that includes the columns list exclusively.
+        Tokens of the DDL segments other than the columns list: list
+    Exceptions
+    ----------
+        Raised if the parenthesis that surround the columns list and the nested parenthesis contained
+        in the list are not balanced.
+    """
+    # Obtain the list of columns in the DDL based on the outermost opening and closing parenthesis that surround
+    # the list of columns, their data types and optional comments. Note that there may be nested parenthesis in
+    # the columns list for some data types such as decimal(precision, scale). Parenthesis within quoted strings
+    # (e.g., column comments) are part of string tokens and are therefore ignored.
+    # CREATE EXTERNAL TABLE IF NOT EXISTS db_name.table_name ( columns_list )
+    #                                                        ^              ^
+    start_pos = next((i for i, token in enumerate(ddl_tokens)
+                      if token.type == ddl_lexer.PUNCTUATION and token.value == '('), None)
+    if start_pos is None:
+        raise Exception('Did not find the columns list in DDL -- Check the DDL for syntax errors!')
+    end_pos = ddl_lexer.find_closing_parenthesis(ddl_tokens, start_pos)
+
+    return ddl_tokens[start_pos + 1: end_pos], ddl_tokens[end_pos + 1:]
+
+
+def index_ddl_clauses(ddl_segment_text, clauses_list):
+    """
+    Capture the starting position (i.e., index) of each clause that was found in the CREATE EXTERNAL TABLE
+    statement in the DDL.
+
+    Parameters
+    ----------
+        ddl_segment_text: str
+            Text of the CREATE EXTERNAL TABLE statement in the table's DDL.
+        clauses_list: List
+            A list of clauses that were found in the DDL.
+    Returns
+    -------
+        ddl_clause_list_sorted:
+            A list of clauses found in the DDL that are sorted based on their starting position.
+    Exceptions
+    ----------
+        None
+    """
+    ddl_clause_dict = dict()
+    ddl_clause_list = list()
+
+    # Based on the DDL clauses list (refer to ddl_clauses_list and ddl_row_format_subclauses_list),
+    # build a dictionary of the standard DDL segments that are present in the ddl_segment_text and
+    # their starting position (i.e., Index). Clauses not present in the DDL get an index of
+    # NOT_FOUND (i.e., -1).
+    for clause in clauses_list:
+        ddl_clause_dict['Clause'] = clause.strip()
+        clause_index = ddl_segment_text.find(ddl_clause_dict['Clause'])
+        # Must differentiate between the optional table COMMENT segment and any column comment in the
+        # PARTITIONED BY segment. In a syntactically correct DDL, if a table COMMENT segment
+        # exists it must appear immediately after the columns list (i.e., clause index of table
+        # COMMENT if exists will always be zero). The if statement below avoids column comments
+        # in the PARTITIONED BY segment being treated as table COMMENT.
+        if ddl_clause_dict['Clause'] == "comment '":
+            logger.debug("ddl_clause_dict['Clause']={}".format(ddl_clause_dict['Clause']))
+            logger.debug("clause_index={}".format(clause_index))
+            if clause_index == 0:
+                ddl_clause_dict['Index'] = clause_index
+            else:
+                ddl_clause_dict['Index'] = NOT_FOUND
+        else:
+            if clause_index >= 0:
+                ddl_clause_dict['Index'] = clause_index
+            else:
+                ddl_clause_dict['Index'] = NOT_FOUND
+        dictionary_copy = ddl_clause_dict.copy()
+        ddl_clause_list.append(dictionary_copy)
+
+    # Sort the DDL clauses in the list based on their starting position (i.e., Index).
+    ddl_clause_list_sorted = sorted(ddl_clause_list, key=lambda x: x['Index'])
+
+    return ddl_clause_list_sorted
+
+
+def segmentize_ddl_by_clause(ddl_text, clauses_list_sorted):
+    """
+    Break the DDL text, excluding the columns list, into segments based on the standard
+    clauses that were found in the CREATE EXTERNAL TABLE statement in the DDL (refer to:
+    https://docs.aws.amazon.com/athena/latest/ug/create-table.html).
+
+    Parameters
+    ----------
+        ddl_text: str
+            Text of the CREATE EXTERNAL TABLE statement, excluding the columns list, in the table's DDL.
+        clauses_list_sorted: List
+            A list of clauses, other than the columns list, found in the DDL that are sorted based on their
+            starting position.
+    Returns
+    -------
+        ddl_segments: list
+            A list of segments into which the DDL statement has been divided.
+    Exceptions
+    ----------
+        None
+    """
+    logger.debug("ddl_text={}".format(ddl_text))
+    logger.debug("clauses_list_sorted={}".format(clauses_list_sorted))
+
+    # Break the DDL text into segments based on entries in the sorted clauses list.
+    ddl_segments = []
+    for i in range(0, len(clauses_list_sorted) - 1):
+        if clauses_list_sorted[i]['Index'] != NOT_FOUND:
+            ddl_segments.append(ddl_text[clauses_list_sorted[i]['Index']:
+                                         clauses_list_sorted[i + 1]['Index']].strip())
+
+    # Include the last DDL segment.
+    if clauses_list_sorted[i + 1]['Index'] != NOT_FOUND:
+        ddl_segments.append(ddl_text[clauses_list_sorted[i + 1]['Index']: len(ddl_text)].strip())
+
+    return ddl_segments
+
+
+def have_columns_changed(table_metadata, ddl_columns_list):
+    """
+    Determine if the Athena table's columns structure has changed by comparing the columns list
+    segment in the DDL against the corresponding metadata JSON segments:
+    "StorageDescriptor": {"Columns": [{"Name": "...", "Type": "...", "Comment": "..."},...]}
+
+    Parameters
+    ----------
+        table_metadata: Dictionary
+            Athena table's metadata in the form of JSON that is obtained by calling get_tables Glue boto3 API.
+        ddl_columns_list: List
+            A list of (name, type, comment) tuples of the columns that is parsed from the DDL
+            (see table_spec.parse_columns()).
+    Returns
+    -------
+        Boolean True when changes are detected or False when no changes are detected.
+    Exceptions
+    ----------
+        None
+    """
+    meta_columns_list = build_meta_columns_list(table_metadata['StorageDescriptor']['Columns'])
+    # Column comments are compared regardless of case, as are the rest of the DDL segments. Data types are compared
+    # in their canonical form (e.g., decimal(10, 2) is the same as decimal(10,2)).
+    ddl_columns_list = [(name, normalize_type(data_type), comment if comment is None else comment.lower())
+                        for name, data_type, comment in ddl_columns_list]
+
+    if ddl_columns_list == meta_columns_list:
+        logger.debug("Metadata columns list=\n{}\nis the same as DDL columns list=\n{}".format(meta_columns_list,
+                                                                                               ddl_columns_list))
+        return False
+    else:
+        logger.info("Metadata columns list=\n{}\nis different from DDL columns list=\n{}".format(meta_columns_list,
+                                                                                                 ddl_columns_list))
+        return True
+
+
+def build_meta_columns_list(columns_list):
+    """
+    Construct a list of (name, type, comment) tuples from the columns in a table's metadata, which is comparable
+    to the columns list that is parsed from the DDL.
+
+    Parameters
+    ----------
+        columns_list: list
+            Columns in the form of JSON that is obtained by calling get_tables Glue boto3 API.
+    Returns
+    -------
+        A list of (name, type, comment) tuples, where name and comment are lowercase, type is in its canonical
+        form (see hive_types.normalize_type()) and comment is None when the column does not have a comment.
+    Exceptions
+    ----------
+        None
+    """
+    return [(str(column['Name']).lower(), normalize_type(str(column['Type'])),
+             column['Comment'].lower() if 'Comment' in column else None) for column in columns_list]
 
 
 def has_table_comment_changed(table_metadata, ddl_segments):
@@ -808,7 +2158,6 @@ def has_partitioning_changed(table_metadata, ddl_segments):
     """
     ddl_partitioning_segment = next((segment for segment in ddl_segments if segment.startswith('partitioned by')), None)
 
-    metadata_partition = ''
     if len(table_metadata['PartitionKeys']) == 0:
         if ddl_partitioning_segment is None:
             logger.debug("Metadata and DDL don't have partitioning")
@@ -822,34 +2171,20 @@ def has_partitioning_changed(table_metadata, ddl_segments):
             return True
         else:
             ddl_segment_key, ddl_segment_value = ddl_partitioning_segment.split('(', 1)
-            # Remove the closing parentheses in the PARTITIONED BY clause & remove spaces at
-            # the beginning and at the end of the string.
-            ddl_segment_value = ddl_segment_value[:-1]
-            ddl_segment_value = ddl_segment_value.strip()
-
-            for i, element in enumerate(table_metadata['PartitionKeys']):
-                try:
-                    if i == 0:
-                        metadata_partition = element['Name'].lower() + ' ' + element['Type'].lower() + \
-                                             " comment '" + element['Comment'].replace("'", "\\'").lower() + "'"
-                    else:
-                        metadata_partition += ', ' + element['Name'].lower() + ' ' + element['Type'].lower() + \
-                                              " comment '" + element['Comment'].replace("'", "\\'").lower() + "'"
-                except KeyError:
-                    # The metadata may include optional comments for the partitioned by columns under PartitionKeys
-                    # JSON element. Because the comments are optional, we need to handle them using KeyError.
-                    if i == 0:
-                        metadata_partition = element['Name'].lower() + ' ' + element['Type'].lower()
-                    else:
-                        metadata_partition += ', ' + element['Name'].lower() + ' ' + element['Type'].lower()
-
-            if metadata_partition == ddl_segment_value:
+            # Remove the closing parentheses in the PARTITIONED BY clause and parse the partition keys. Data types
+            # are compared in their canonical form (e.g., decimal(10, 2) is the same as decimal(10,2)).
+            ddl_partition_keys_list = [(name, normalize_type(data_type), comment)
+                                       for name, data_type, comment in
+                                       parse_columns(ddl_lexer.tokenize(ddl_segment_value[:-1]))]
+            meta_partition_keys_list = build_meta_columns_list(table_metadata['PartitionKeys'])
+
+            if meta_partition_keys_list == ddl_partition_keys_list:
                 logger.debug("Metadata partitioning={} is the same as DDL partitioning={}".format(
-                    metadata_partition, ddl_segment_value))
+                    meta_partition_keys_list, ddl_partition_keys_list))
                 return False
             else:
                 logger.info("Metadata partitioning={} is different from DDL partitioning={}".format(
-                    metadata_partition, ddl_segment_value))
+                    meta_partition_keys_list, ddl_partition_keys_list))
                 return True
 
 
@@ -1644,11 +2979,7 @@ def have_tblproperties_changed(table_metadata, ddl_segments):
     # segment as the rest of TBLPROPERTIES is also excluded. Because there's a prior check for table comments,
     # any comment differences would have been caught in that logic already and would not make it to this point.
     metadata_tblproperties = dict((key.lower(), value.lower()) for key, value in default_metadata_tblproperties.items()
-                                  if key.lower() == 'classification' or key.lower() == 'has_encrypted_data'
-                                  or key.lower() == 'orc.compress' or key.lower() == 'parquet.compress'
-                                  or key.lower() == 'write.compression' or key.lower().startswith('projection.')
-                                  or key.lower() == 'skip.header.line.count'
-                                  or key.lower() == 'storage.location.template')
+                                  if is_tracked_tblproperty(key))
     logger.debug("metadata_tblproperties={}".format(metadata_tblproperties))
 
     if ddl_tblproperties_segment is not None:
@@ -1657,12 +2988,7 @@ def have_tblproperties_changed(table_metadata, ddl_segments):
         ddl_tblproperties = '{' + ddl_tblproperties.replace('=', ': ').replace("'", '"').strip() + '}'
         logger.debug("ddl_tblproperties={}".format(ddl_tblproperties))
         ddl_tblproperties = json.loads(ddl_tblproperties)
-        ddl_tblproperties = {key: value for key, value in ddl_tblproperties.items()
-                             if key == 'classification' or key.lower() == 'has_encrypted_data'
-                             or key == 'orc.compress' or key.lower() == 'parquet.compress'
-                             or key == 'write.compression' or key.startswith('projection.')
-                             or key == 'skip.header.line.count'
-                             or key.lower() == 'storage.location.template'}
+        ddl_tblproperties = {key: value for key, value in ddl_tblproperties.items() if is_tracked_tblproperty(key)}
         if len(ddl_tblproperties) == 0:
             if len(metadata_tblproperties) == 0:
                 logger.debug("DDL and metdata don't include any TBLPROPERTIES")
@@ -1716,27 +3042,116 @@ def has_table_location_changed(table_metadata, ddl_segments):
         Boolean True when changes are detected or False when no changes are detected.
     Exceptions
     ----------
-        Raised if the mandatory LOCATION clause is missing in the DDL.
+        Raised if the mandatory LOCATION clause is missing in the DDL.
+    """
+    ddl_location_segment = next((segment for segment in ddl_segments if segment.startswith("location")), None)
+    logger.debug("ddl_location_segment={}".format(ddl_location_segment))
+
+    metadata_location = table_metadata['StorageDescriptor']['Location'].lower()
+    logger.debug("metadata_location={}".format(metadata_location))
+
+    if ddl_location_segment is not None:
+        ddl_segment_key, ddl_segment_value = ddl_location_segment.split(' ', 1)
+        ddl_segment_value = ddl_segment_value.strip("'")
+        if metadata_location == ddl_segment_value:
+            logger.debug("Metadata location clause={} is the same as the DDL location clause={}".format(
+                metadata_location, ddl_segment_value))
+            return False
+        else:
+            logger.info("Metadata location clause={} is different from the DDL location clause={}".format(
+                metadata_location, ddl_segment_value))
+            return True
+    else:
+        raise Exception('The mandatory LOCATION clause is missing in the DDL - please correct the DDL first!')
+
+
+def invalidate_cached_table_metadata(db_name, table_name):
+    """
+    Remove the metadata of a table/view that is about to be modified from the catalog cache, if the cache is enabled.
+
+    Parameters
+    ----------
+        db_name: str
+            Name of the database in which the table/view exists.
+        table_name: str
+            Name of the table/view.
+    Returns
+    -------
+        None
+    Exceptions
+    ----------
+        None
+    """
+    if catalog_cache is not None:
+        catalog_cache.invalidate(db_name, table_name)
+
+
+def is_plan_only():
+    """
+    Determine if the program only plans the changes to the tables/views without applying them (see --plan command
+    line option).
+
+    Parameters
+    ----------
+        None
+    Returns
+    -------
+        Boolean True in plan mode or False otherwise.
+    Exceptions
+    ----------
+        None
+    """
+    return change_report is not None and change_report.plan_only
+
+
+def record_change(table_name, segment, old, new, action):
+    """
+    Add a change to the change report, if the report is enabled (see change_report.ChangeReport.add()).
+
+    Parameters
+    ----------
+        table_name: str
+            Name of the table/view.
+        segment: str
+            Name of the segment that differs or None when the change applies to the entire table/view.
+        old: object
+            Value of the segment in the Glue Data Catalog or None.
+        new: object
+            Value of the segment in the DDL or None.
+        action: str
+            One of create, patch, recreate or none.
+    Returns
+    -------
+        None
+    Exceptions
+    ----------
+        None
+    """
+    if change_report is not None:
+        change_report.add(table_name, segment, old, new, action)
+
+
+def record_changes(table_name, differences_list, action):
+    """
+    Add the differences between the spec of a table and its DDL to the change report, if the report is enabled.
+
+    Parameters
+    ----------
+        table_name: str
+            Name of the table.
+        differences_list: list
+            Segments of the table's spec that differ from the DDL's spec (see TableSpec.diff()).
+        action: str
+            One of patch, recreate or none.
+    Returns
+    -------
+        None
+    Exceptions
+    ----------
+        None
     """
-    ddl_location_segment = next((segment for segment in ddl_segments if segment.startswith("location")), None)
-    logger.debug("ddl_location_segment={}".format(ddl_location_segment))
-
-    metadata_location = table_metadata['StorageDescriptor']['Location'].lower()
-    logger.debug("metadata_location={}".format(metadata_location))
-
-    if ddl_location_segment is not None:
-        ddl_segment_key, ddl_segment_value = ddl_location_segment.split(' ', 1)
-        ddl_segment_value = ddl_segment_value.strip("'")
-        if metadata_location == ddl_segment_value:
-            logger.debug("Metadata location clause={} is the same as the DDL location clause={}".format(
-                metadata_location, ddl_segment_value))
-            return False
-        else:
-            logger.info("Metadata location clause={} is different from the DDL location clause={}".format(
-                metadata_location, ddl_segment_value))
-            return True
-    else:
-        raise Exception('The mandatory LOCATION clause is missing in the DDL - please correct the DDL first!')
+    for difference in differences_list:
+        record_change(table_name, difference['segment'], difference['old'], difference['new'], action)
 
 
 def drop_table(db_name, table_name, table_type, temp_folder, stack_info_obj, product_name, environment_name):
@@ -1767,6 +3182,7 @@ def drop_table(db_name, table_name, table_type, temp_folder, stack_info_obj, pro
         None
     """
     logger.info('Dropping: {}.{}'.format(db_name, table_name))
+    invalidate_cached_table_metadata(db_name, table_name)
 
     output_location = 's3://' + stack_info_obj.get_bucket_name_by_label(
         product_name, environment_name, 'output') + '/' + temp_folder
@@ -1779,7 +3195,8 @@ def drop_table(db_name, table_name, table_type, temp_folder, stack_info_obj, pro
     execute_query(product_name, query_string, output_location)
 
 
-def create_table(table_config, ddl_text, db_name, stack_info_obj, product_name, environment_name):
+def create_table(table_config, ddl_text, db_name, stack_info_obj, product_name, environment_name,
+                 partition_snapshot=None):
     """
     Create a table or view based on the information provided in the application configuration JSON file.
 
@@ -1797,6 +3214,10 @@ def create_table(table_config, ddl_text, db_name, stack_info_obj, product_name,
             Name of the application for which to create the folders.
         environment_name: str
             Name of the environment for which to create the folders.
+        partition_snapshot: dictionary
+            The partitions of the table before it was dropped, as returned by take_partition_snapshot(), or None.
+            When provided, the partitions are registered again instead of being loaded from the table's S3 location,
+            unless the table's location or the number of its partition keys has changed.
     Returns
     -------
         None
@@ -1805,6 +3226,7 @@ def create_table(table_config, ddl_text, db_name, stack_info_obj, product_name,
         None
     """
     logger.info('Creating table or view: {}.{}'.format(db_name, table_config['table_name']))
+    invalidate_cached_table_metadata(db_name, table_config['table_name'])
 
     # Prepare Athena query output location
     output_location = 's3://' + stack_info_obj.get_bucket_name_by_label(
@@ -1814,8 +3236,455 @@ def create_table(table_config, ddl_text, db_name, stack_info_obj, product_name,
 
     if ddl_text.lower().find("partitioned by") >= 0:
         logger.info('Loading partitions for table: {}.{}'.format(db_name, table_config['table_name']))
-        query_string = "MSCK REPAIR TABLE {}.{}".format(db_name, table_config['table_name'])
-        execute_query(product_name, query_string, output_location)
+        if partition_snapshot is None or replay_partition_snapshot(db_name, table_config['table_name'],
+                                                                   partition_snapshot) is False:
+            sync_partitions(db_name, table_config['table_name'])
+
+    if is_view(None, ddl_text) is False:
+        stamp_ddl_fingerprint(db_name, table_config['table_name'], ddl_lexer.tokenize(ddl_text))
+
+
+def compute_ddl_fingerprint(ddl_tokens, table_metadata):
+    """
+    Compute the fingerprint of a table that is created by the DDL. The fingerprint consists of the hash of the
+    normalized DDL text and the content hash of the spec of the table's metadata (see table_spec.py), separated
+    by a colon. The latter changes when the table is altered by other means after it is created by this program.
+
+    Parameters
+    ----------
+        ddl_tokens: list
+            Tokens of the CREATE EXTERNAL TABLE statement in the table's DDL (see ddl_lexer.tokenize()).
+        table_metadata: Dictionary
+            Athena table's metadata in the form of JSON that is obtained by calling get_tables Glue boto3 API.
+    Returns
+    -------
+        The fingerprint string.
+    Exceptions
+    ----------
+        None
+    """
+    ddl_hash = hashlib.sha256(ddl_lexer.render(ddl_tokens).encode('utf-8')).hexdigest()
+    return '{}:{}'.format(ddl_hash, TableSpec.from_glue(table_metadata).content_hash())
+
+
+def stamp_ddl_fingerprint(db_name, table_name, ddl_tokens):
+    """
+    Store the fingerprint of the DDL that created the table in the table's parameters, so that subsequent
+    executions can skip detecting changes to the table while the DDL stays the same. The fingerprint is only an
+    optimization, so a failure to store it (e.g., without the glue:UpdateTable permission) is logged as a warning
+    and the changes to the table are detected in the next execution instead.
+
+    Parameters
+    ----------
+        db_name: str
+            Name of the database in which the table exists.
+        table_name: str
+            Name of the table.
+        ddl_tokens: list
+            Tokens of the CREATE EXTERNAL TABLE statement in the table's DDL (see ddl_lexer.tokenize()).
+    Returns
+    -------
+        None
+    Exceptions
+    ----------
+        None
+    """
+    try:
+        table_metadata = get_table_metadata(db_name, table_name)
+        if table_metadata is None:
+            logger.warning('Table: {}.{} does not exist -- Unable to store the DDL fingerprint'.
+                           format(db_name, table_name))
+            return
+
+        table_input = build_table_input(table_metadata)
+        table_input['Parameters'][DDL_FINGERPRINT_PARAMETER] = compute_ddl_fingerprint(ddl_tokens, table_metadata)
+        logger.debug('Storing DDL fingerprint: {} of table: {}.{}'.
+                     format(table_input['Parameters'][DDL_FINGERPRINT_PARAMETER], db_name, table_name))
+        # Skip archiving the prior version of the table, as only the fingerprint changes.
+        glue_client.update_table(DatabaseName=db_name, TableInput=table_input, SkipArchive=True)
+    except ClientError as ce:
+        logger.warning('Unable to store the DDL fingerprint of table: {}.{} -- {}'.format(db_name, table_name, ce))
+
+
+def build_table_input(table_metadata):
+    """
+    Construct the TableInput of the update_table Glue boto3 API from a table's metadata.
+
+    Parameters
+    ----------
+        table_metadata: Dictionary
+            The table's metadata in the form of JSON that is obtained by calling get_table Glue boto3 API.
+    Returns
+    -------
+        table_input: Dictionary
+            The elements of the metadata that are accepted by TableInput, with a copy of the table's parameters.
+    Exceptions
+    ----------
+        None
+    """
+    table_input = dict((key, table_metadata[key]) for key in TABLE_INPUT_KEYS if key in table_metadata)
+    table_input['Parameters'] = dict(table_metadata.get('Parameters', dict()))
+    return table_input
+
+
+def take_partition_snapshot(db_name, table_metadata):
+    """
+    Take a snapshot of the partitions (i.e., values and storage descriptors) of an existing table that is about to
+    be dropped and recreated.
+
+    Parameters
+    ----------
+        db_name: str
+            Name of the database in which the table exists.
+        table_metadata: Dictionary
+            Athena table's metadata in the form of JSON that is obtained by calling get_tables Glue boto3 API.
+    Returns
+    -------
+        partition_snapshot: dictionary
+            A dictionary with the table's partition key names ('PartitionKeys'), location ('Location') and
+            partitions ('Partitions').
+    Exceptions
+    ----------
+        None
+    """
+    partitions_list = get_partitions(db_name, table_metadata['Name'])
+    logger.info('Took a snapshot of {} partitions of table: {}.{}'.
+                format(len(partitions_list), db_name, table_metadata['Name']))
+
+    return {
+        'PartitionKeys': [partition_key['Name'].lower() for partition_key in table_metadata['PartitionKeys']],
+        'Location': table_metadata['StorageDescriptor']['Location'].rstrip('/') + '/',
+        'Partitions': [{'Values': partition['Values'],
+                        'StorageDescriptor': partition['StorageDescriptor'],
+                        'Parameters': partition.get('Parameters', dict())}
+                       for partition in partitions_list]
+    }
+
+
+def replay_partition_snapshot(db_name, table_name, partition_snapshot):
+    """
+    Register the partitions of a recreated table based on the snapshot taken before the table was dropped.
+    The storage descriptor of each partition is rewritten based on the recreated table's storage descriptor
+    (e.g., columns, file format, SerDe), while the partition's location is retained. The snapshot is not used if the
+    table's location has changed, because no data is moved to the new location: the partitions of the recreated
+    table must be loaded from the folders under its new location instead (see sync_partitions()).
+
+    The partition values are rewritten based on the recreated table's partition keys as follows:
+        1. Partition keys that have only been reordered: the values are reordered accordingly.
+        2. Same number of partition keys, some of which have been renamed: the values are retained in order.
+        3. Otherwise (i.e., partition keys added or removed), the snapshot cannot be used.
+
+    Parameters
+    ----------
+        db_name: str
+            Name of the database in which the table exists.
+        table_name: str
+            Name of the recreated table.
+        partition_snapshot: dictionary
+            The partitions of the table before it was dropped, as returned by take_partition_snapshot().
+    Returns
+    -------
+        Boolean True when the partitions were registered or False if the snapshot cannot be used for the recreated
+        table (i.e., its location or the number of its partition keys has changed).
+    Exceptions
+    ----------
+        Raised if Glue is unable to create any of the partitions.
+    """
+    table = glue_client.get_table(DatabaseName=db_name, Name=table_name)['Table']
+    old_table_location = partition_snapshot['Location']
+    new_table_location = table['StorageDescriptor']['Location'].rstrip('/') + '/'
+    if old_table_location != new_table_location:
+        logger.info('Location of table: {}.{} has changed from {} to {} -- the partitions taken before the table was '
+                    'dropped cannot be reused'.format(db_name, table_name, old_table_location, new_table_location))
+        return False
+
+    new_partition_keys_list = [partition_key['Name'].lower() for partition_key in table.get('PartitionKeys', list())]
+    old_partition_keys_list = partition_snapshot['PartitionKeys']
+
+    if sorted(new_partition_keys_list) == sorted(old_partition_keys_list):
+        values_order_list = [old_partition_keys_list.index(partition_key) for partition_key in new_partition_keys_list]
+    elif len(new_partition_keys_list) == len(old_partition_keys_list):
+        values_order_list = list(range(len(new_partition_keys_list)))
+    else:
+        logger.info('Partition keys of table: {}.{} have changed from {} to {} -- the partitions taken before the '
+                    'table was dropped cannot be reused'.
+                    format(db_name, table_name, old_partition_keys_list, new_partition_keys_list))
+        return False
+
+    partition_input_list = list()
+    for partition in partition_snapshot['Partitions']:
+        storage_descriptor = dict(table['StorageDescriptor'])
+        storage_descriptor['Location'] = partition['StorageDescriptor']['Location']
+        partition_input_list.append({'Values': [partition['Values'][i] for i in values_order_list],
+                                     'StorageDescriptor': storage_descriptor,
+                                     'Parameters': partition['Parameters']})
+
+    start_time = time.monotonic()
+    batch_create_partitions(db_name, table_name, partition_input_list)
+    logger.info('Registered {} partitions of table: {}.{} from the snapshot in {:.1f} seconds'.
+                format(len(partition_input_list), db_name, table_name, time.monotonic() - start_time))
+    return True
+
+
+def sync_partitions(db_name, table_name):
+    """
+    Register the partitions of a table in the Glue Data Catalog based on the Hive-style (i.e., key=value) folders
+    that exist under the table's S3 location. This is the equivalent of MSCK REPAIR TABLE, except that the S3
+    location is listed in parallel one partition key level at a time, only the missing partitions are created,
+    and the partitions whose folders no longer exist are deleted.
+
+    Note: Partitions located outside of the table's location (e.g., added by ALTER TABLE ADD PARTITION ... LOCATION)
+    are never deleted. Tables that use partition projection are skipped, because their partitions are not stored
+    in the Glue Data Catalog.
+
+    Parameters
+    ----------
+        db_name: str
+            Name of the database in which the table exists.
+        table_name: str
+            Name of the partitioned table.
+    Returns
+    -------
+        None
+    Exceptions
+    ----------
+        Raised if Glue is unable to create or delete any of the partitions.
+    """
+    table = glue_client.get_table(DatabaseName=db_name, Name=table_name)['Table']
+    partition_keys_list = [partition_key['Name'] for partition_key in table.get('PartitionKeys', list())]
+    if len(partition_keys_list) == 0:
+        logger.debug('Table: {}.{} is not partitioned'.format(db_name, table_name))
+        return
+    if table.get('Parameters', dict()).get('projection.enabled', '').lower() == 'true':
+        logger.info('Table: {}.{} uses partition projection -- skipping partition loading'.format(db_name, table_name))
+        return
+
+    table_location = table['StorageDescriptor']['Location'].rstrip('/') + '/'
+    bucket_name, table_prefix = split_s3_location(table_location)
+
+    start_time = time.monotonic()
+    listed_partitions_dict = list_partition_locations(bucket_name, table_prefix, partition_keys_list)
+    registered_partitions_dict = dict((tuple(partition['Values']), partition['StorageDescriptor']['Location'])
+                                      for partition in get_partitions(db_name, table_name))
+    logger.debug('Found {} partition folders under {} and {} registered partitions in {:.1f} seconds'.
+                 format(len(listed_partitions_dict), table_location, len(registered_partitions_dict),
+                        time.monotonic() - start_time))
+
+    partition_input_list = list()
+    for partition_values, partition_location in listed_partitions_dict.items():
+        if partition_values not in registered_partitions_dict:
+            storage_descriptor = dict(table['StorageDescriptor'])
+            storage_descriptor['Location'] = partition_location
+            partition_input_list.append({'Values': list(partition_values), 'StorageDescriptor': storage_descriptor})
+
+    stale_partition_values_list = [list(partition_values)
+                                   for partition_values, partition_location in registered_partitions_dict.items()
+                                   if partition_values not in listed_partitions_dict
+                                   and partition_location.rstrip('/').startswith(table_location)]
+
+    logger.info('Table: {}.{} -- registering {} new partitions and deleting {} partitions whose folders no longer '
+                'exist'.format(db_name, table_name, len(partition_input_list), len(stale_partition_values_list)))
+    batch_create_partitions(db_name, table_name, partition_input_list)
+    batch_delete_partitions(db_name, table_name, stale_partition_values_list)
+
+
+def split_s3_location(s3_location):
+    """
+    Split an S3 location (e.g., s3://bucket-name/folder/) into its bucket name and key prefix.
+
+    Parameters
+    ----------
+        s3_location: str
+            The S3 location.
+    Returns
+    -------
+        bucket_name: str
+            The name of the bucket.
+        prefix: str
+            The key prefix (e.g., folder/).
+    Exceptions
+    ----------
+        None
+    """
+    bucket_name, prefix = s3_location.replace('s3://', '', 1).split('/', 1)
+    return bucket_name, prefix
+
+
+def list_partition_locations(bucket_name, table_prefix, partition_keys_list):
+    """
+    List the Hive-style partition folders (e.g., year=2023/term=fall/) under the table's S3 location. The folders
+    of each partition key level are listed in parallel.
+
+    Parameters
+    ----------
+        bucket_name: str
+            Name of the bucket in which the table's data is stored.
+        table_prefix: str
+            Key prefix of the table's location, ending in a forward slash.
+        partition_keys_list: list
+            Names of the table's partition keys in order.
+    Returns
+    -------
+        partitions_dict: dictionary
+            A dictionary keyed by tuples of partition values whose values are the S3 locations of the partitions.
+    Exceptions
+    ----------
+        None
+    """
+    partitions_dict = {tuple(): table_prefix}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=PARTITION_SYNC_MAX_WORKERS) as executor:
+        for partition_key in partition_keys_list:
+            child_partitions_dict = dict()
+            future_to_values = dict((executor.submit(list_child_prefixes, bucket_name, prefix), partition_values)
+                                    for partition_values, prefix in partitions_dict.items())
+            for future in concurrent.futures.as_completed(future_to_values):
+                partition_values = future_to_values[future]
+                for child_prefix in future.result():
+                    # Folder names are in the form of key=value, where the value is escaped (e.g., %3A for :).
+                    folder_name = child_prefix.rstrip('/').rsplit('/', 1)[-1]
+                    key, separator, value = folder_name.partition('=')
+                    if separator == '=' and key.lower() == partition_key.lower():
+                        child_partitions_dict[partition_values + (urllib.parse.unquote(value),)] = child_prefix
+            partitions_dict = child_partitions_dict
+
+    return dict((partition_values, 's3://' + bucket_name + '/' + prefix)
+                for partition_values, prefix in partitions_dict.items())
+
+
+def list_child_prefixes(bucket_name, prefix):
+    """
+    List the folders (i.e., common prefixes) immediately under an S3 prefix.
+
+    Parameters
+    ----------
+        bucket_name: str
+            Name of the bucket.
+        prefix: str
+            Key prefix ending in a forward slash.
+    Returns
+    -------
+        child_prefixes_list: list
+            The keys of the folders, each ending in a forward slash.
+    Exceptions
+    ----------
+        None
+    """
+    child_prefixes_list = list()
+    paginator = s3.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix, Delimiter='/'):
+        for common_prefix in page.get('CommonPrefixes', list()):
+            child_prefixes_list.append(common_prefix['Prefix'])
+
+    return child_prefixes_list
+
+
+def get_partitions(db_name, table_name):
+    """
+    Obtain the partitions of a table that are registered in the Glue Data Catalog.
+
+    Parameters
+    ----------
+        db_name: str
+            Name of the database in which the table exists.
+        table_name: str
+            Name of the partitioned table.
+    Returns
+    -------
+        partitions_list: list
+            A list of partition dictionaries as returned by get_partitions Glue boto3 API.
+    Exceptions
+    ----------
+        None
+    """
+    def get_segment_partitions(segment_number):
+        segment_partitions_list = list()
+        paginator = glue_client.get_paginator('get_partitions')
+        for page in paginator.paginate(DatabaseName=db_name, TableName=table_name,
+                                       Segment={'SegmentNumber': segment_number,
+                                                'TotalSegments': PARTITION_SYNC_MAX_WORKERS}):
+            segment_partitions_list.extend(page['Partitions'])
+        return segment_partitions_list
+
+    # The partitions are obtained in parallel by dividing them into non-overlapping segments.
+    partitions_list = list()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=PARTITION_SYNC_MAX_WORKERS) as executor:
+        for segment_partitions_list in executor.map(get_segment_partitions, range(PARTITION_SYNC_MAX_WORKERS)):
+            partitions_list.extend(segment_partitions_list)
+
+    return partitions_list
+
+
+def batch_create_partitions(db_name, table_name, partition_input_list):
+    """
+    Create partitions in the Glue Data Catalog in parallel batches of up to 100 partitions.
+
+    Parameters
+    ----------
+        db_name: str
+            Name of the database in which the table exists.
+        table_name: str
+            Name of the partitioned table.
+        partition_input_list: list
+            A list of PartitionInput dictionaries (i.e., Values and StorageDescriptor).
+    Returns
+    -------
+        None
+    Exceptions
+    ----------
+        Raised if Glue is unable to create any of the partitions for a reason other than the partition already
+        existing.
+    """
+    batches_list = [partition_input_list[i:i + GLUE_BATCH_CREATE_PARTITION_SIZE]
+                    for i in range(0, len(partition_input_list), GLUE_BATCH_CREATE_PARTITION_SIZE)]
+    if len(batches_list) == 0:
+        return
+
+    def create_batch(batch):
+        return glue_client.batch_create_partition(DatabaseName=db_name, TableName=table_name,
+                                                  PartitionInputList=batch).get('Errors', list())
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(PARTITION_SYNC_MAX_WORKERS,
+                                                               len(batches_list))) as executor:
+        errors_list = [error for batch_errors in executor.map(create_batch, batches_list) for error in batch_errors
+                       if error['ErrorDetail']['ErrorCode'] != 'AlreadyExistsException']
+
+    if len(errors_list) > 0:
+        raise Exception('Unable to create {} partitions of table: {}.{} -- first error: {}'.
+                        format(len(errors_list), db_name, table_name, errors_list[0]))
+
+
+def batch_delete_partitions(db_name, table_name, partition_values_list):
+    """
+    Delete partitions from the Glue Data Catalog in batches of up to 25 partitions.
+
+    Parameters
+    ----------
+        db_name: str
+            Name of the database in which the table exists.
+        table_name: str
+            Name of the partitioned table.
+        partition_values_list: list
+            A list of partition values lists.
+    Returns
+    -------
+        None
+    Exceptions
+    ----------
+        Raised if Glue is unable to delete any of the partitions for a reason other than the partition not
+        existing.
+    """
+    errors_list = list()
+    for i in range(0, len(partition_values_list), GLUE_BATCH_DELETE_PARTITION_SIZE):
+        response = glue_client.batch_delete_partition(
+            DatabaseName=db_name, TableName=table_name,
+            PartitionsToDelete=[{'Values': partition_values}
+                                for partition_values in partition_values_list[i:i + GLUE_BATCH_DELETE_PARTITION_SIZE]])
+        errors_list.extend(error for error in response.get('Errors', list())
+                           if error['ErrorDetail']['ErrorCode'] != 'EntityNotFoundException')
+
+    if len(errors_list) > 0:
+        raise Exception('Unable to delete {} partitions of table: {}.{} -- first error: {}'.
+                        format(len(errors_list), db_name, table_name, errors_list[0]))
 
 
 def execute_query(product_name, query_string, output_location):
@@ -1868,16 +3737,203 @@ def query_execution_waiter(query_id):
             A dictionary containing the query execution results.
     Exceptions
     ----------
-        None
+        Raised if the query does not complete within the query timeout, in which case the query is cancelled.
     """
-    while True:
-        time.sleep(0.1)
-        # Get query execution status
-        query_execution = athena_client.get_query_execution(QueryExecutionId=query_id)
-        if query_execution['QueryExecution']['Status']['State'] not in ('QUEUED', 'RUNNING'):
-            break
+    return query_execution_poller.wait(query_id)
+
+
+class QueryExecutionPoller:
+    """
+    Track the outstanding Athena queries of all threads and poll their status together. A single background thread
+    checks the status of the queries that are due for a check using batch_get_query_execution (up to 50 query
+    execution IDs per call), and wakes up the threads waiting for the queries that have completed. Each query is
+    checked after a delay that grows with the time the query has been running, and a query that runs longer than
+    the query timeout is cancelled using stop_query_execution.
+    """
+    def __init__(self, client, query_timeout=DEFAULT_QUERY_TIMEOUT_SECONDS):
+        """
+        Parameters
+        ----------
+            client: object
+                Athena boto3 client.
+            query_timeout: int
+                Number of seconds after which a query that has not completed is cancelled.
+        """
+        self.client = client
+        self.query_timeout = query_timeout
+        self._condition = threading.Condition()
+        self._queries_dict = dict()
+        self._poller_thread = None
+
+    def wait(self, query_id):
+        """
+        Wait for the query to complete.
+
+        Parameters
+        ----------
+            query_id: str
+                The ID of query being executed.
+        Returns
+        -------
+            query_execution: Dictionary
+                A dictionary containing the query execution results as returned by get_query_execution.
+        Exceptions
+        ----------
+            Raised if the query does not complete within the query timeout or its status cannot be obtained.
+        """
+        query = {
+            'StartTime': time.monotonic(),
+            'NextCheckTime': time.monotonic() + QUERY_POLL_MIN_DELAY_SECONDS,
+            'Completed': threading.Event(),
+            'QueryExecution': None,
+            'Error': None
+        }
+        with self._condition:
+            self._queries_dict[query_id] = query
+            if self._poller_thread is None:
+                self._poller_thread = threading.Thread(target=self._poll, name='query-execution-poller', daemon=True)
+                self._poller_thread.start()
+            self._condition.notify()
+
+        if query['Completed'].wait(self.query_timeout + QUERY_WAIT_MARGIN_SECONDS) is False:
+            with self._condition:
+                self._queries_dict.pop(query_id, None)
+            raise Exception('The status of query execution id={} could not be obtained within {} seconds'.
+                            format(query_id, self.query_timeout + QUERY_WAIT_MARGIN_SECONDS))
+        if query['Error'] is not None:
+            raise query['Error']
+        return {'QueryExecution': query['QueryExecution']}
+
+    def _poll(self):
+        """
+        Body of the background thread; runs until there are no outstanding queries. Should the thread fail
+        unexpectedly, the outstanding queries are failed, so that no thread waits for them, and a new poller is
+        started for the next query.
+        """
+        try:
+            while True:
+                with self._condition:
+                    if len(self._queries_dict) == 0:
+                        self._poller_thread = None
+                        return
+                    now = time.monotonic()
+                    next_check_time = min(query['NextCheckTime'] for query in self._queries_dict.values())
+                    if next_check_time > now:
+                        # New queries notify the condition, so that they get scheduled right away.
+                        self._condition.wait(next_check_time - now)
+                        continue
+                    # Queries that are due shortly are checked along with the queries that are due now, so that
+                    # fewer batch_get_query_execution calls are made.
+                    due_query_ids = [query_id for query_id, query in self._queries_dict.items()
+                                     if query['NextCheckTime'] <= now + QUERY_POLL_MIN_DELAY_SECONDS]
+
+                for i in range(0, len(due_query_ids), QUERY_STATUS_BATCH_SIZE):
+                    self._check_queries(due_query_ids[i:i + QUERY_STATUS_BATCH_SIZE])
+        except Exception as e:
+            logger.exception(e)
+            with self._condition:
+                query_ids = list(self._queries_dict.keys())
+            for query_id in query_ids:
+                self._complete(query_id, error=e)
+        finally:
+            with self._condition:
+                if self._poller_thread is threading.current_thread():
+                    self._poller_thread = None
+
+    def _check_queries(self, query_ids):
+        """
+        Check the status of a batch of queries, complete the ones that have finished and reschedule or cancel
+        the rest.
+
+        Parameters
+        ----------
+            query_ids: list
+                Up to 50 query execution IDs.
+        """
+        try:
+            response = self.client.batch_get_query_execution(QueryExecutionIds=query_ids)
+        except ClientError as ce:
+            if ce.response['Error']['Code'] in ('ThrottlingException', 'TooManyRequestsException'):
+                logger.warning('Checking the status of {} queries was throttled -- backing off'.format(len(query_ids)))
+                for query_id in query_ids:
+                    self._reschedule(query_id)
+                return
+            for query_id in query_ids:
+                self._complete(query_id, error=ce)
+            return
+        except Exception as e:
+            # E.g., EndpointConnectionError or ReadTimeoutError, which may be transient; the queries are cancelled
+            # if their status cannot be obtained within the query timeout.
+            logger.warning('Unable to check the status of {} queries -- {}'.format(len(query_ids), e))
+            for query_id in query_ids:
+                self._reschedule(query_id)
+            return
+
+        for query_execution in response['QueryExecutions']:
+            query_id = query_execution['QueryExecutionId']
+            if query_execution['Status']['State'] in ('QUEUED', 'RUNNING'):
+                self._reschedule(query_id)
+            else:
+                self._complete(query_id, query_execution=query_execution)
+
+        # A query that was just started may not be visible to batch_get_query_execution yet.
+        for unprocessed_query in response.get('UnprocessedQueryExecutionIds', list()):
+            logger.debug('Unable to obtain the status of query_execution_id={} -- {}'.
+                         format(unprocessed_query['QueryExecutionId'], unprocessed_query.get('ErrorMessage')))
+            self._reschedule(unprocessed_query['QueryExecutionId'])
+
+    def _reschedule(self, query_id):
+        """
+        Schedule the next status check of a query or cancel the query if it has exceeded the query timeout.
+
+        Parameters
+        ----------
+            query_id: str
+                The ID of query being executed.
+        """
+        with self._condition:
+            query = self._queries_dict.get(query_id)
+        # The waiting thread may have given up on the query already.
+        if query is None:
+            return
+        elapsed_time = time.monotonic() - query['StartTime']
+        if elapsed_time > self.query_timeout:
+            logger.error('Cancelling query_execution_id={} after {} seconds'.format(query_id, int(elapsed_time)))
+            try:
+                self.client.stop_query_execution(QueryExecutionId=query_id)
+            except ClientError as ce:
+                logger.warning('Unable to cancel query_execution_id={} -- {}'.format(query_id, ce))
+            self._complete(query_id, error=Exception('Query execution id={} did not complete within {} seconds and '
+                                                     'was cancelled'.format(query_id, self.query_timeout)))
+            return
+
+        delay = min(QUERY_POLL_MAX_DELAY_SECONDS, max(QUERY_POLL_MIN_DELAY_SECONDS, elapsed_time))
+        with self._condition:
+            query['NextCheckTime'] = time.monotonic() + random.uniform(delay / 2, delay)
+
+    def _complete(self, query_id, query_execution=None, error=None):
+        """
+        Remove a query from the outstanding queries and wake up the thread waiting for it.
+
+        Parameters
+        ----------
+            query_id: str
+                The ID of query being executed.
+            query_execution: Dictionary
+                The QueryExecution element of the batch_get_query_execution response.
+            error: Exception
+                The exception to be raised in the waiting thread.
+        """
+        with self._condition:
+            query = self._queries_dict.pop(query_id, None)
+        if query is None:
+            return
+        query['QueryExecution'] = query_execution
+        query['Error'] = error
+        query['Completed'].set()
+
 
-    return query_execution
+query_execution_poller = QueryExecutionPoller(athena_client)
 
 
 def main():
@@ -1905,6 +3961,85 @@ def main():
         help='Desired level of logging.',
         choices=['debug', 'error', 'critical', 'info'],
         default='debug')
+    parser.add_argument(
+        '-q',
+        '--max_concurrent_queries',
+        help='Maximum number of tables whose DROP/CREATE/MSCK REPAIR queries may run in Athena at the same time '
+             '(1 through {}). Default is 1 (i.e., tables are processed one at a time).'.
+             format(ATHENA_DDL_QUERY_CONCURRENCY_QUOTA),
+        type=int,
+        default=1)
+    parser.add_argument(
+        '-t',
+        '--query_timeout',
+        help='Number of seconds after which an Athena query that has not completed is cancelled. '
+             'Default is {}.'.format(DEFAULT_QUERY_TIMEOUT_SECONDS),
+        type=int,
+        default=DEFAULT_QUERY_TIMEOUT_SECONDS)
+    parser.add_argument(
+        '-c',
+        '--catalog_fetch_strategy',
+        help='Strategy for obtaining the metadata of the existing tables/views from the Glue Data Catalog: scan the '
+             'entire database, filter it by the configured table names, look up each configured table, or '
+             'choose automatically based on the number of configured tables relative to the size of the '
+             'database. Default is auto.',
+        choices=CATALOG_FETCH_STRATEGIES,
+        default='auto')
+    parser.add_argument(
+        '--catalog_cache_dir',
+        help='Local directory in which to cache the metadata of the tables/views obtained from the Glue Data '
+             'Catalog across executions. By default, the metadata is not cached.',
+        type=str)
+    parser.add_argument(
+        '--catalog_cache_ttl',
+        help='Number of seconds for which the cached metadata of a table/view is used without obtaining it from '
+             'the Glue Data Catalog. Default is {}.'.format(DEFAULT_CATALOG_CACHE_TTL_SECONDS),
+        type=int,
+        default=DEFAULT_CATALOG_CACHE_TTL_SECONDS)
+    parser.add_argument(
+        '--bucket_cache_dir',
+        help='Local directory in which to cache the names of the buckets resolved by their labels across '
+             'executions. By default, the bucket names are only reused within an execution.',
+        type=str)
+    parser.add_argument(
+        '--bucket_cache_ttl',
+        help='Number of seconds for which a cached bucket name is used without resolving its label again. '
+             'Default is {}.'.format(DEFAULT_BUCKET_CACHE_TTL_SECONDS),
+        type=int,
+        default=DEFAULT_BUCKET_CACHE_TTL_SECONDS)
+    parser.add_argument(
+        '--template_cache_dir',
+        help='Local directory in which to cache the application configuration JSON file and the DDL scripts '
+             'obtained from S3 across executions. Cached files are revalidated with S3 and only downloaded again '
+             'when they have changed. By default, the files are not cached.',
+        type=str)
+    parser.add_argument(
+        '-b',
+        '--bundle',
+        help='Key of a DDL bundle (.zip, .tar.gz, .tgz or .tar) in the app bucket that holds the application '
+             'configuration JSON file and the DDL scripts of its tables/views (see build_bundle.py). The bundle is '
+             'obtained with a single request and unpacked in memory. By default, each file is obtained separately.',
+        type=str)
+    parser.add_argument(
+        '-w',
+        '--detection_workers',
+        help='Maximum number of worker processes in which changes to the existing tables are detected. A worker '
+             'process is started for every {} tables, up to this number. Default is {}; 1 detects the changes in '
+             'the main process.'.format(DETECTION_MIN_TABLES_PER_WORKER, DEFAULT_DETECTION_WORKERS),
+        type=int,
+        default=DEFAULT_DETECTION_WORKERS)
+    parser.add_argument(
+        '--change_report',
+        help='Local path of a JSON file to which the changes detected between the DDL of the tables/views and the '
+             'Glue Data Catalog, along with the action taken for each, are written out. By default, no report is '
+             'written out.',
+        type=str)
+    parser.add_argument(
+        '--plan',
+        help='Only detect the changes to the database and tables/views and report them (--change_report is '
+             'required) without creating folders, the database or tables/views, or altering any existing '
+             'table/view.',
+        action='store_true')
     args = parser.parse_args()
     product_name = args.product_name.lower()
     environment_name = os.getenv('branchEnv')
@@ -1913,12 +4048,30 @@ def main():
             "Unable to determine environment based on os.getenv('branchEnv'). Be sure to 'export branchEnv=<env>' "
             'where <env> is one of dev, qa, uat or prod')
     app_config_file = args.app_config_file
+    max_concurrent_queries = args.max_concurrent_queries
+    if max_concurrent_queries < 1 or max_concurrent_queries > ATHENA_DDL_QUERY_CONCURRENCY_QUOTA:
+        raise Exception(
+            'The value of --max_concurrent_queries={} must be between 1 and {}, the Athena DDL query concurrency '
+            'quota'.format(max_concurrent_queries, ATHENA_DDL_QUERY_CONCURRENCY_QUOTA))
+    query_execution_poller.query_timeout = args.query_timeout
+    if args.detection_workers < 1:
+        raise Exception('The value of --detection_workers={} must be at least 1'.format(args.detection_workers))
+    if args.plan is True and args.change_report is None:
+        raise Exception('The --plan option requires the --change_report option, to which the planned changes are '
+                        'written out')
 
     if args.region is None:
         region = 'us-west-2'
     else:
         region = args.region.lower()
-    boto3.setup_default_session(region_name=region)
+    setup_default_session(region)
+    # The clients that were created on import use the region of the environment, so they are obtained again from
+    # the session of the specified region.
+    global s3, athena_client, glue_client
+    s3 = get_client('s3')
+    athena_client = get_client('athena')
+    glue_client = get_client('glue')
+    query_execution_poller.client = athena_client
 
     if args.logger_level is None:
         logger_level = 'DEBUG'
@@ -1944,10 +4097,40 @@ def main():
     logger.info(
         'Positional arguments set to: product={} and app_config_file={}'.format(product_name, app_config_file))
     logger.info(
-        'Optional/default arguments set to: region={} and logger_level={}'.format(region, logger_level))
+        'Optional/default arguments set to: region={}, logger_level={}, max_concurrent_queries={}, '
+        'query_timeout={}, catalog_fetch_strategy={}, catalog_cache_dir={}, catalog_cache_ttl={}, '
+        'bucket_cache_dir={}, bucket_cache_ttl={}, template_cache_dir={}, bundle={}, detection_workers={}, '
+        'change_report={} and plan={}'.
+        format(region, logger_level, max_concurrent_queries, args.query_timeout, args.catalog_fetch_strategy,
+               args.catalog_cache_dir, args.catalog_cache_ttl, args.bucket_cache_dir, args.bucket_cache_ttl,
+               args.template_cache_dir, args.bundle, args.detection_workers, args.change_report, args.plan))
     logger.info('branchEnv={}'.format(environment_name))
 
-    stack_info_obj = stack_info(logger_level=logger_level)
+    account_id = None
+    if args.catalog_cache_dir is not None or args.bucket_cache_dir is not None:
+        account_id = get_client('sts').get_caller_identity()['Account']
+
+    # The bucket resolver memoizes the bucket names and is passed wherever a stack_info object is expected.
+    stack_info_obj = BucketResolver(stack_info(logger_level=logger_level), logger, args.bucket_cache_dir,
+                                    account_id, region, args.bucket_cache_ttl)
+    if args.bucket_cache_dir is not None:
+        logger.info('Using bucket cache in directory: {} with a TTL of {} seconds'.
+                    format(args.bucket_cache_dir, args.bucket_cache_ttl))
+
+    if args.catalog_cache_dir is not None:
+        global catalog_cache
+        catalog_cache = CatalogCache(args.catalog_cache_dir, account_id, region, args.catalog_cache_ttl, logger)
+        logger.info('Using catalog cache in directory: {} with a TTL of {} seconds'.
+                    format(args.catalog_cache_dir, args.catalog_cache_ttl))
+
+    if args.template_cache_dir is not None:
+        global template_cache
+        template_cache = TemplateCache(args.template_cache_dir, s3, logger)
+        logger.info('Using template cache in directory: {}'.format(args.template_cache_dir))
+
+    if args.change_report is not None:
+        global change_report
+        change_report = ChangeReport(plan_only=args.plan)
 
     app_bucket_name = stack_info_obj.get_bucket_name_by_label(
         product_name, environment_name, 'app')
@@ -1958,16 +4141,25 @@ def main():
     logger.debug('Output bucket name: {}'.format(output_bucket_name))
 
     try:
+        if args.bundle is not None:
+            global ddl_bundle
+            ddl_bundle = read_bundle(get_object_content(s3, app_bucket_name, args.bundle, template_cache),
+                                     args.bundle)
+            logger.info('Obtained {} files from DDL bundle: {}'.format(len(ddl_bundle), args.bundle))
+
         # Obtain database name from config JSON file
-        obj = s3_resource.Object(app_bucket_name, app_config_file)
-        f = obj.get()['Body']
-        config_dict = json.load(f)
+        config_dict = json.loads(get_app_object(app_bucket_name, app_config_file).decode('utf-8'))
         if config_dict['database']['include_env_suffix'].lower() == 'true':
             db_name = config_dict['database']['name'] + '_' + environment_name
         else:
             db_name = config_dict['database']['name']
         logger.debug('db_name={}'.format(db_name))
 
+        bucket_labels_list = [config['label'] for config in config_dict['folders'] + config_dict['athena_tables']]
+        if 'location' in config_dict['database']:
+            bucket_labels_list.append(config_dict['database']['location']['s3_label'])
+        stack_info_obj.resolve_labels(product_name, environment_name, bucket_labels_list)
+
         if 'location' in config_dict['database']:
             db_location = 'location "s3://' + \
                           stack_info_obj.get_bucket_name_by_label(
@@ -1976,11 +4168,22 @@ def main():
         else:
             db_location = None
 
-        create_folders(config_dict, stack_info_obj, product_name, environment_name)
+        if is_plan_only() is False:
+            create_folders(config_dict, stack_info_obj, product_name, environment_name)
         create_database(product_name, db_name, db_location, output_bucket_name)
         process_athena_tables(config_dict, output_bucket_name, app_bucket_name,
-                              db_name, stack_info_obj, product_name, environment_name)
-        logger.info('Application resources were provisioned successfully!')
+                              db_name, stack_info_obj, product_name, environment_name, max_concurrent_queries,
+                              args.catalog_fetch_strategy, args.detection_workers)
+
+        if change_report is not None:
+            logger.info('Detected {} changes to the database and tables/views'.format(len(change_report)))
+            change_report.write(args.change_report)
+            logger.info('Change report was written out to: {}'.format(args.change_report))
+
+        if is_plan_only() is True:
+            logger.info('Application resources were planned successfully -- no changes were applied!')
+        else:
+            logger.info('Application resources were provisioned successfully!')
     except ClientError as ce:
         if ce.response['Error']['Code'] == 'NoSuchKey':
             logger.error('Unable to locate the required file in S3 bucket: {} -- {}'.
@@ -0,0 +1,160 @@
+import os
+import boto3
+import threading
+import importlib.util
+import botocore.config
+import botocore.session
+
+"""
+This Python module creates the boto3 clients that the programs in this directory share, with settings tuned for
+making many AWS API calls from a pool of threads (e.g., app.py with --max_concurrent_queries):
+    1. A connection pool of max_pool_connections connections per client, so that the threads do not wait for
+       (or discard) connections, which urllib3 reports with 'Connection pool is full' warnings.
+    2. The adaptive retry mode, which retries throttled calls with exponential backoff and additionally limits
+       the rate of calls of the client after throttling, so that the threads do not retry in lockstep.
+    3. TCP keepalive and explicit connect/read timeouts, so that a dropped connection fails (and is retried)
+       instead of blocking a thread.
+
+Each setting can be overridden with the environment variable listed in CLIENT_SETTINGS. Retry modes and TCP
+keepalive are only applied if the installed botocore supports them.
+
+boto3 clients are thread-safe, so get_client() creates a single client per service and hands it out to all
+callers. setup_default_session() applies the same settings to the clients that other libraries (e.g., ucop_util)
+create from the default boto3 session.
+"""
+# Setting name: (environment variable, default value)
+CLIENT_SETTINGS = {
+    'max_pool_connections': ('AWS_CLIENT_MAX_POOL_CONNECTIONS', 50),
+    'max_attempts': ('AWS_CLIENT_MAX_ATTEMPTS', 10),
+    'connect_timeout': ('AWS_CLIENT_CONNECT_TIMEOUT', 10),
+    'read_timeout': ('AWS_CLIENT_READ_TIMEOUT', 60)
+}
+RETRY_MODE = 'adaptive'
+
+clients_dict = dict()
+clients_lock = threading.Lock()
+
+
+def get_setting(setting_name):
+    """
+    Obtain the value of a client setting from its environment variable or else its default value.
+
+    Parameters
+    ----------
+        setting_name: str
+            Name of the setting (see CLIENT_SETTINGS).
+    Returns
+    -------
+        The value of the setting as int.
+    Exceptions
+    ----------
+        Raised if the value of the environment variable is not a positive integer.
+    """
+    env_var_name, default_value = CLIENT_SETTINGS[setting_name]
+    value = os.getenv(env_var_name)
+    if value is None or len(value) == 0:
+        return default_value
+    if not value.isdigit() or int(value) < 1:
+        raise Exception('The value of environment variable {}={} must be a positive integer'.
+                        format(env_var_name, value))
+    return int(value)
+
+
+def get_client_config():
+    """
+    Construct the botocore configuration of the shared clients.
+
+    Returns
+    -------
+        client_config: object
+            The botocore Config object.
+    Exceptions
+    ----------
+        Raised if the value of any environment variable in CLIENT_SETTINGS is not a positive integer.
+    """
+    config_kwargs = {
+        'max_pool_connections': get_setting('max_pool_connections'),
+        'connect_timeout': get_setting('connect_timeout'),
+        'read_timeout': get_setting('read_timeout'),
+        'retries': {'max_attempts': get_setting('max_attempts')}
+    }
+    # Older botocore versions reject the options they do not know.
+    if has_module('botocore.retries.adaptive'):
+        config_kwargs['retries']['mode'] = RETRY_MODE
+    if 'tcp_keepalive' in botocore.config.Config.OPTION_DEFAULTS:
+        config_kwargs['tcp_keepalive'] = True
+
+    return botocore.config.Config(**config_kwargs)
+
+
+def has_module(module_name):
+    """
+    Determine whether a module is installed without importing it.
+
+    Parameters
+    ----------
+        module_name: str
+            Fully qualified name of the module.
+    Returns
+    -------
+        True if the module is installed or else False.
+    Exceptions
+    ----------
+        None
+    """
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except ImportError:
+        # find_spec imports the parent packages, which raises when a parent package is not installed either.
+        return False
+
+
+def get_client(service_name):
+    """
+    Obtain the shared client of an AWS service, which is created from the default boto3 session on first use.
+
+    Parameters
+    ----------
+        service_name: str
+            Name of the AWS service (e.g., s3, athena or glue).
+    Returns
+    -------
+        client: object
+            The boto3 client.
+    Exceptions
+    ----------
+        Raised if the value of any environment variable in CLIENT_SETTINGS is not a positive integer.
+    """
+    # boto3 sessions, unlike clients, are not thread-safe, so clients are created one at a time.
+    with clients_lock:
+        client = clients_dict.get(service_name)
+        if client is None:
+            client = boto3.client(service_name, config=get_client_config())
+            clients_dict[service_name] = client
+
+    return client
+
+
+def setup_default_session(region_name):
+    """
+    Set up the default boto3 session for the specified region, such that all clients created from the session
+    without a configuration of their own use the settings of the shared clients. Shared clients that were created
+    before the call are discarded, so that get_client() creates them again in the new session; callers that hold
+    such clients must obtain them again with get_client().
+
+    Parameters
+    ----------
+        region_name: str
+            AWS region of the session.
+    Returns
+    -------
+        None
+    Exceptions
+    ----------
+        Raised if the value of any environment variable in CLIENT_SETTINGS is not a positive integer.
+    """
+    botocore_session = botocore.session.get_session()
+    botocore_session.set_default_client_config(get_client_config())
+    boto3.setup_default_session(botocore_session=botocore_session, region_name=region_name)
+    with clients_lock:
+        clients_dict.clear()
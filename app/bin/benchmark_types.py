@@ -0,0 +1,178 @@
+import os
+import re
+import glob
+import json
+import time
+import logging
+import argparse
+import datetime
+
+import ddl_lexer
+from table_spec import TableSpec
+from hive_types import normalize_type, canonicalize_type
+
+"""
+This Python program measures how many spurious table recreations the data type normalization (see hive_types.py)
+prevents on a corpus of DDL files (e.g., app/ddl), without connecting to AWS.
+
+The data types of the columns and partition keys in each DDL are compared against the data types that the Glue
+Data Catalog stores for the table. The stored data types are obtained from a JSON file with the output of
+'aws glue get-tables --database-name <database-name>', when one is provided, or otherwise derived from the DDL the
+way Athena stores them (i.e., lowercase without whitespace). The comparison is made for the DDL as is and for
+equivalent spellings of its data types (e.g., decimal(4, 1) instead of decimal(4,1), integer instead of int,
+upper-case type names), once comparing the data types as text and once comparing their canonical forms. A table is
+counted as a spurious recreation when the text comparison detects a change that the canonical comparison does not.
+
+Example:
+    python benchmark_types.py ../ddl --metadata_file get_tables.json
+"""
+PGM_NAME = 'benchmark_types.py'
+MSG_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+current_date = datetime.datetime.now()
+logging.basicConfig(format=MSG_FORMAT, datefmt=DATETIME_FORMAT)
+logger = logging.getLogger(PGM_NAME + '_' + current_date.strftime('%Y-%m-%d-%H-%M-%S'))
+
+# Equivalent spellings of data types that a DDL may use, applied to the lowercase data type.
+TYPE_SPELLINGS = {
+    'spaced': lambda data_type: re.sub(r'\s*([,:])\s*', r'\1 ', data_type),
+    'aliased': lambda data_type: re.sub(r'\bint\b', 'integer', re.sub(r'\bfloat\b', 'real', data_type)),
+    'uppercase': lambda data_type: data_type.upper()
+}
+
+
+def load_ddl_specs(ddl_dir):
+    """
+    Construct the spec of each table in the DDL files (*.ddl and *.sql) under the specified directory.
+
+    Parameters
+    ----------
+        ddl_dir: str
+            Directory that contains the DDL files.
+    Returns
+    -------
+        ddl_specs_dict: dictionary
+            TableSpec of each table keyed by lowercase table name.
+    Exceptions
+    ----------
+        None
+    """
+    ddl_specs_dict = dict()
+    for ddl_path in sorted(glob.glob(os.path.join(ddl_dir, '**', '*.ddl'), recursive=True) +
+                           glob.glob(os.path.join(ddl_dir, '**', '*.sql'), recursive=True)):
+        with open(ddl_path) as ddl_file:
+            ddl_text = ddl_file.read().replace('%%DATABASE%%', 'benchmark').replace('%%LOCATION%%', 's3://benchmark')
+        ddl_tokens = ddl_lexer.tokenize(ddl_text)
+        if not any(token.type == ddl_lexer.KEYWORD and token.value == 'table' for token in ddl_tokens[:4]):
+            logger.debug('Skipping: {}, which does not create a table'.format(ddl_path))
+            continue
+        table_name = os.path.splitext(os.path.basename(ddl_path))[0].lower()
+        ddl_specs_dict[table_name] = TableSpec.from_ddl(ddl_tokens)
+
+    return ddl_specs_dict
+
+
+def load_meta_types(metadata_file):
+    """
+    Obtain the data types of the columns and partition keys of each table from the output of the get-tables Glue
+    command.
+
+    Parameters
+    ----------
+        metadata_file: str
+            Path of the JSON file.
+    Returns
+    -------
+        meta_types_dict: dictionary
+            A list of the data types of each table keyed by lowercase table name.
+    Exceptions
+    ----------
+        None
+    """
+    with open(metadata_file) as f:
+        table_list = json.load(f)['TableList']
+
+    return dict((table_metadata['Name'].lower(),
+                 [column['Type'] for column in table_metadata['StorageDescriptor']['Columns'] +
+                  table_metadata.get('PartitionKeys', list())])
+                for table_metadata in table_list)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='A program to count the spurious table recreations that the data type normalization prevents '
+                    'on a corpus of DDL files.')
+    parser.add_argument(
+        'ddl_dir',
+        help='Directory that contains the DDL files (e.g., ../ddl).',
+        type=str)
+    parser.add_argument(
+        '-m',
+        '--metadata_file',
+        help="JSON file with the output of 'aws glue get-tables --database-name <database-name>'. By default, the "
+             'data types stored in the Glue Data Catalog are derived from the DDL files.',
+        type=str)
+    parser.add_argument(
+        '-n',
+        '--iterations',
+        help='Number of times to normalize the data types of the corpus for timing purposes. Default is 1000.',
+        type=int,
+        default=1000)
+    args = parser.parse_args()
+    logger.setLevel(logging.INFO)
+
+    ddl_specs_dict = load_ddl_specs(args.ddl_dir)
+    meta_types_dict = load_meta_types(args.metadata_file) if args.metadata_file is not None else dict()
+
+    results_dict = dict()
+    for spelling in ['as is'] + list(TYPE_SPELLINGS.keys()):
+        results_dict[spelling] = {'tables': 0, 'types': 0, 'text_changes': 0, 'canonical_changes': 0,
+                                  'text_recreations': 0, 'canonical_recreations': 0}
+        for table_name, ddl_spec in ddl_specs_dict.items():
+            ddl_types_list = [data_type.lower() for name, data_type, comment in
+                              ddl_spec.columns + ddl_spec.partition_keys]
+            meta_types_list = meta_types_dict.get(table_name, [''.join(data_type.split())
+                                                               for data_type in ddl_types_list])
+            if len(meta_types_list) != len(ddl_types_list):
+                logger.info('Skipping table: {}, whose columns in the metadata file are different from the DDL'.
+                            format(table_name))
+                continue
+            if spelling != 'as is':
+                ddl_types_list = [TYPE_SPELLINGS[spelling](data_type) for data_type in ddl_types_list]
+
+            text_changes = sum(1 for meta_type, ddl_type in zip(meta_types_list, ddl_types_list)
+                               if meta_type.lower() != ddl_type.lower())
+            canonical_changes = sum(1 for meta_type, ddl_type in zip(meta_types_list, ddl_types_list)
+                                    if normalize_type(meta_type) != normalize_type(ddl_type))
+            result_dict = results_dict[spelling]
+            result_dict['tables'] += 1
+            result_dict['types'] += len(ddl_types_list)
+            result_dict['text_changes'] += text_changes
+            result_dict['canonical_changes'] += canonical_changes
+            result_dict['text_recreations'] += 1 if text_changes > 0 else 0
+            result_dict['canonical_recreations'] += 1 if canonical_changes > 0 else 0
+
+    for spelling, result_dict in results_dict.items():
+        logger.info('Spelling: {} -- {} tables with {} data types: {} data type changes ({} canonical) and {} '
+                    'table recreations ({} canonical); {} spurious recreations prevented'.
+                    format(spelling, result_dict['tables'], result_dict['types'], result_dict['text_changes'],
+                           result_dict['canonical_changes'], result_dict['text_recreations'],
+                           result_dict['canonical_recreations'],
+                           result_dict['text_recreations'] - result_dict['canonical_recreations']))
+
+    # normalize_type() caches the canonical forms, so the parser itself is timed.
+    types_list = [data_type for ddl_spec in ddl_specs_dict.values()
+                  for name, data_type, comment in ddl_spec.columns + ddl_spec.partition_keys]
+    start_time = time.perf_counter()
+    for i in range(args.iterations):
+        for data_type in types_list:
+            canonicalize_type(data_type)
+    elapsed_time = time.perf_counter() - start_time
+    if len(types_list) > 0 and args.iterations > 0:
+        logger.info('Normalized {} data types {} times in {:.3f} seconds ({:.1f} microseconds per data type)'.
+                    format(len(types_list), args.iterations, elapsed_time,
+                           elapsed_time * 1000000 / (len(types_list) * args.iterations)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+import os
+import time
+import sqlite3
+import threading
+
+"""
+This Python module resolves the names of the S3 buckets of an application by their labels (e.g., app, output) once
+per execution, as opposed to once per use. Without it, app.py looks up the same bucket names with the
+get_bucket_name_by_label method of ucop_util's stack_info for every table/view (e.g., for its location and for
+the output location of each of its Athena queries), and each lookup may call CloudFormation.
+
+BucketResolver wraps a stack_info object and exposes the same get_bucket_name_by_label method, so it can be used
+wherever a stack_info object is expected. Each product/environment/label is resolved with stack_info at most once
+and the bucket name is memoized for the remainder of the execution. Optionally, the resolved bucket names are also
+kept across executions in a SQLite database (bucket_cache.db) under a configurable directory, keyed by AWS account,
+region, product, environment and label, and used without calling stack_info while they are younger than the
+time-to-live (TTL).
+"""
+CACHE_FILE_NAME = 'bucket_cache.db'
+
+
+class BucketResolver:
+    """
+    A memoizing resolver of bucket names by label that wraps a stack_info object.
+    """
+    def __init__(self, stack_info_obj, logger, cache_dir=None, account_id=None, region=None, ttl_seconds=None):
+        """
+        Parameters
+        ----------
+            stack_info_obj: object
+                Reference to the stack_info object with which the bucket names are resolved.
+            logger: object
+                Logger to which the resolver activity is logged.
+            cache_dir: str
+                Directory in which the resolved bucket names are cached across executions or None, in which case
+                they are only memoized for the current execution. The directory is created if it does not exist.
+            account_id: str
+                AWS account ID of the stack (only required with cache_dir).
+            region: str
+                AWS region of the stack (only required with cache_dir).
+            ttl_seconds: int
+                Number of seconds for which a cached bucket name is used without resolving it again (only required
+                with cache_dir).
+        """
+        self.stack_info_obj = stack_info_obj
+        self.logger = logger
+        self.account_id = account_id
+        self.region = region
+        self.ttl_seconds = ttl_seconds
+        self._bucket_names_dict = dict()
+        self._lock = threading.Lock()
+        self._connection = None
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._connection = sqlite3.connect(os.path.join(cache_dir, CACHE_FILE_NAME), check_same_thread=False)
+            with self._connection:
+                self._connection.execute(
+                    'CREATE TABLE IF NOT EXISTS bucket_names ('
+                    'account_id TEXT NOT NULL, region TEXT NOT NULL, product_name TEXT NOT NULL, '
+                    'environment_name TEXT NOT NULL, label TEXT NOT NULL, bucket_name TEXT NOT NULL, '
+                    'cached_at REAL NOT NULL, '
+                    'PRIMARY KEY (account_id, region, product_name, environment_name, label))')
+
+    def get_bucket_name_by_label(self, product_name, environment_name, bucket_label):
+        """
+        Obtain the name of the bucket with the specified label. Concurrent callers of the same label wait for a
+        single lookup.
+
+        Parameters
+        ----------
+            product_name: str
+                Name of the application.
+            environment_name: str
+                Name of the environment.
+            bucket_label: str
+                Label of the bucket (e.g., app or output).
+        Returns
+        -------
+            bucket_name: str
+                Name of the bucket.
+        Exceptions
+        ----------
+            Any exception raised by stack_info is propagated and the label is not memoized.
+        """
+        key = (product_name, environment_name, bucket_label)
+        with self._lock:
+            bucket_name = self._bucket_names_dict.get(key)
+            if bucket_name is None:
+                bucket_name = self._get_cached(key)
+                if bucket_name is None:
+                    bucket_name = self.stack_info_obj.get_bucket_name_by_label(product_name, environment_name,
+                                                                               bucket_label)
+                    self.logger.debug('Resolved bucket label: {} to bucket: {}'.format(bucket_label, bucket_name))
+                    self._put_cached(key, bucket_name)
+                self._bucket_names_dict[key] = bucket_name
+
+        return bucket_name
+
+    def resolve_labels(self, product_name, environment_name, bucket_labels):
+        """
+        Resolve the names of the buckets with the specified labels up front (see get_bucket_name_by_label()).
+
+        Parameters
+        ----------
+            product_name: str
+                Name of the application.
+            environment_name: str
+                Name of the environment.
+            bucket_labels: iterable
+                Labels of the buckets.
+        Returns
+        -------
+            bucket_names_dict: dictionary
+                Name of each bucket keyed by label.
+        Exceptions
+        ----------
+            Any exception raised by stack_info is propagated.
+        """
+        return dict((bucket_label, self.get_bucket_name_by_label(product_name, environment_name, bucket_label))
+                    for bucket_label in sorted(set(bucket_labels)))
+
+    def close(self):
+        if self._connection is not None:
+            with self._lock:
+                self._connection.close()
+
+    def _get_cached(self, key):
+        if self._connection is None:
+            return None
+        row = self._connection.execute(
+            'SELECT bucket_name FROM bucket_names WHERE account_id = ? AND region = ? AND product_name = ? AND '
+            'environment_name = ? AND label = ? AND cached_at >= ?',
+            (self.account_id, self.region) + key + (time.time() - self.ttl_seconds,)).fetchone()
+        if row is not None:
+            self.logger.debug('Using cached bucket: {} for bucket label: {}'.format(row[0], key[2]))
+            return row[0]
+        return None
+
+    def _put_cached(self, key, bucket_name):
+        if self._connection is None:
+            return
+        with self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO bucket_names (account_id, region, product_name, environment_name, label, '
+                'bucket_name, cached_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (self.account_id, self.region) + key + (bucket_name, time.time()))
@@ -0,0 +1,73 @@
+import os
+import json
+import logging
+import argparse
+import datetime
+
+from ddl_bundle import write_bundle
+
+"""
+This Python program builds a DDL bundle (see ddl_bundle.py) from a local copy of the app bucket, such as the app
+directory of this repository, so that a CI pipeline can publish a single artifact per deployment. The bundle holds
+the application configuration JSON file and the DDL script of every table/view in the configuration (i.e.,
+<sql_folder1>/<script_name>), each under its key in the app bucket.
+
+Example (from the app directory):
+    python bin/build_bundle.py config/config.json bundle.zip
+    aws s3 cp bundle.zip s3://<app-bucket>/bundles/bundle.zip
+    python bin/app.py --bundle bundles/bundle.zip rdms config/config.json
+"""
+PGM_NAME = 'build_bundle.py'
+MSG_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+current_date = datetime.datetime.now()
+logging.basicConfig(format=MSG_FORMAT, datefmt=DATETIME_FORMAT)
+logger = logging.getLogger(PGM_NAME + '_' + current_date.strftime('%Y-%m-%d-%H-%M-%S'))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='A program to build a single bundle of the application configuration JSON file and the DDL '
+                    'scripts of its tables/views for deployment with app.py --bundle.')
+    parser.add_argument(
+        'app_config_file',
+        help='Key of the application configuration JSON file in the app bucket, relative to the source directory '
+             '(e.g., config/config.json).',
+        type=str)
+    parser.add_argument(
+        'bundle_file',
+        help='Path of the bundle to build. The extension determines the format: .zip, .tar.gz, .tgz or .tar.',
+        type=str)
+    parser.add_argument(
+        '-s',
+        '--source_dir',
+        help='Local directory that mirrors the layout of the app bucket. Default is the current directory.',
+        type=str,
+        default='.')
+    parser.add_argument(
+        '-l',
+        '--logger_level',
+        help='Desired level of logging.',
+        choices=['debug', 'error', 'critical', 'info'],
+        default='info')
+    args = parser.parse_args()
+    logger.setLevel(args.logger_level.upper())
+
+    entries_dict = dict()
+    with open(os.path.join(args.source_dir, args.app_config_file), 'rb') as f:
+        entries_dict[args.app_config_file] = f.read()
+    config_dict = json.loads(entries_dict[args.app_config_file].decode('utf-8'))
+
+    for table_config in config_dict['athena_tables']:
+        script_key = table_config['sql_folder1'] + '/' + table_config['script_name']
+        logger.debug('Adding DDL script: {}'.format(script_key))
+        with open(os.path.join(args.source_dir, script_key), 'rb') as f:
+            entries_dict[script_key] = f.read()
+
+    write_bundle(entries_dict, args.bundle_file)
+    logger.info('Bundle: {} was built with the configuration file and {} DDL scripts'.
+                format(args.bundle_file, len(entries_dict) - 1))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+import os
+import json
+import zlib
+import sqlite3
+import datetime
+import threading
+
+"""
+This Python module implements a persistent local cache of the Glue Data Catalog metadata of tables/views, which
+allows repeated executions of app.py (e.g., development loops or retries after a failure) to skip obtaining the
+metadata of tables/views from the Glue Data Catalog.
+
+The cache is stored in a SQLite database (catalog_cache.db) under a configurable directory. Each entry is keyed by
+AWS account, region, database and table/view name, and holds the zlib-compressed JSON metadata of the table/view
+along with its Glue VersionId and UpdateTime (for troubleshooting). Tables/views that do not exist are not
+cached, so they are always looked up in the catalog.
+
+The cache is TTL-only: an entry is used as is while it is younger than the time-to-live (TTL) and discarded
+afterwards. The Glue Data Catalog does not offer a call that returns VersionId/UpdateTime without the rest of the
+metadata, so an expired entry cannot be revalidated more cheaply than by obtaining the metadata again. Entries of
+tables/views modified by app.py are invalidated before the modification, so changes made by the program itself
+are never masked by the cache; changes made by other means within the TTL (e.g., a table/view that is dropped or
+recreated in the Athena console) are.
+"""
+CACHE_FILE_NAME = 'catalog_cache.db'
+DATETIME_KEYS = ('CreateTime', 'UpdateTime')
+
+
+class CatalogCache:
+    """
+    A persistent cache of table/view metadata keyed by account, region, database and table/view name.
+    """
+    def __init__(self, cache_dir, account_id, region, ttl_seconds, logger):
+        """
+        Parameters
+        ----------
+            cache_dir: str
+                Directory in which the cache database is stored. The directory is created if it does not exist.
+            account_id: str
+                AWS account ID of the Glue Data Catalog.
+            region: str
+                AWS region of the Glue Data Catalog.
+            ttl_seconds: int
+                Number of seconds for which a cache entry is used without refreshing it from the catalog.
+            logger: object
+                Logger to which the cache activity is logged.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.account_id = account_id
+        self.region = region
+        self.ttl_seconds = ttl_seconds
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(os.path.join(cache_dir, CACHE_FILE_NAME), check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS catalog_tables ('
+                'account_id TEXT NOT NULL, region TEXT NOT NULL, database_name TEXT NOT NULL, '
+                'table_name TEXT NOT NULL, version_id TEXT, update_time TEXT, cached_at REAL NOT NULL, '
+                'metadata BLOB, PRIMARY KEY (account_id, region, database_name, table_name))')
+
+    def get(self, database_name, table_names):
+        """
+        Obtain the cache entries of the specified tables/views.
+
+        Parameters
+        ----------
+            database_name: str
+                Name of the database.
+            table_names: iterable
+                Lowercase names of the tables/views.
+        Returns
+        -------
+            fresh_entries_dict: dictionary
+                Metadata of the tables/views whose entries are within the TTL, keyed by table/view name.
+        """
+        table_names_list = sorted(table_names)
+        with self._lock:
+            rows_list = list()
+            # SQLite limits the number of parameters per statement.
+            for i in range(0, len(table_names_list), 500):
+                batch = table_names_list[i:i + 500]
+                rows_list.extend(self._connection.execute(
+                    'SELECT table_name, metadata FROM catalog_tables '
+                    'WHERE account_id = ? AND region = ? AND database_name = ? AND cached_at >= ? AND '
+                    'metadata IS NOT NULL AND table_name IN ({})'.
+                    format(', '.join('?' * len(batch))),
+                    [self.account_id, self.region, database_name,
+                     datetime.datetime.now().timestamp() - self.ttl_seconds] + batch).fetchall())
+
+        fresh_entries_dict = dict((table_name, self._decode(metadata)) for table_name, metadata in rows_list)
+        self.logger.debug('Catalog cache has {} fresh entries for the {} requested tables/views'.
+                          format(len(fresh_entries_dict), len(table_names_list)))
+        return fresh_entries_dict
+
+    def put(self, database_name, table_name, table_metadata):
+        """
+        Store the metadata of a table/view in the cache.
+
+        Parameters
+        ----------
+            database_name: str
+                Name of the database.
+            table_name: str
+                Lowercase name of the table/view.
+            table_metadata: Dictionary
+                Metadata of the table/view or None if the table/view does not exist, in which case any entry of
+                the table/view is removed instead.
+        """
+        if table_metadata is None:
+            self.invalidate(database_name, table_name)
+            return
+
+        version_id = table_metadata.get('VersionId')
+        update_time = get_update_time(table_metadata)
+        metadata = self._encode(table_metadata)
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO catalog_tables (account_id, region, database_name, table_name, version_id, '
+                'update_time, cached_at, metadata) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (self.account_id, self.region, database_name, table_name, version_id, update_time,
+                 datetime.datetime.now().timestamp(), metadata))
+
+    def invalidate(self, database_name, table_name):
+        """
+        Remove the entry of a table/view that is about to be modified.
+
+        Parameters
+        ----------
+            database_name: str
+                Name of the database.
+            table_name: str
+                Name of the table/view.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                'DELETE FROM catalog_tables WHERE account_id = ? AND region = ? AND database_name = ? AND '
+                'table_name = ?', (self.account_id, self.region, database_name, table_name.lower()))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def _encode(table_metadata):
+        return zlib.compress(json.dumps(table_metadata, default=lambda value: value.isoformat()).encode('utf-8'))
+
+    @staticmethod
+    def _decode(metadata):
+        table_metadata = json.loads(zlib.decompress(metadata).decode('utf-8'))
+        for key in DATETIME_KEYS:
+            if key in table_metadata:
+                table_metadata[key] = datetime.datetime.fromisoformat(table_metadata[key])
+        return table_metadata
+
+
+def get_update_time(table_metadata):
+    """
+    Obtain the UpdateTime of a table's/view's metadata as a string.
+
+    Parameters
+    ----------
+        table_metadata: Dictionary
+            Metadata of the table/view.
+    Returns
+    -------
+        The ISO format UpdateTime (or CreateTime when the table/view has never been updated) or None.
+    """
+    update_time = table_metadata.get('UpdateTime', table_metadata.get('CreateTime'))
+    return None if update_time is None else update_time.isoformat()
@@ -0,0 +1,88 @@
+import json
+import datetime
+import threading
+
+"""
+This Python module implements the change report of an app.py execution. The report lists every difference that
+app.py detects between the DDL of the configured tables/views and the Glue Data Catalog, along with the action
+that is taken (or, in plan mode, would be taken) for the table/view:
+    create: The table/view does not exist and is created.
+    patch: The table's metadata is updated in place without recreating the table.
+    recreate: The table/view is dropped (tables only) and created again.
+    none: A difference that does not require any action (e.g., the DDL spells a default differently).
+
+The report is written out as JSON, for example:
+    {
+      "generated_at": "2024-01-31T10:15:00",
+      "plan_only": true,
+      "changes": [
+        {"table": "student_reg_3wk", "segment": "tblproperties", "old": {"parquet.compress": "gzip"},
+         "new": {"parquet.compress": "snappy"}, "action": "patch"}
+      ]
+    }
+"""
+
+
+class ChangeReport:
+    """
+    A thread-safe collection of the changes detected during an execution of app.py.
+    """
+    def __init__(self, plan_only=False):
+        """
+        Parameters
+        ----------
+            plan_only: bool
+                True when app.py only plans the changes without applying them (see --plan command line option).
+        """
+        self.plan_only = plan_only
+        self.generated_at = datetime.datetime.now()
+        self._changes_list = list()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._changes_list)
+
+    def add(self, table_name, segment, old, new, action):
+        """
+        Add a change to the report.
+
+        Parameters
+        ----------
+            table_name: str
+                Name of the table/view.
+            segment: str
+                Name of the DDL segment that differs (e.g., columns or location; see table_spec.SEGMENTS) or None
+                when the change applies to the entire table/view.
+            old: object
+                JSON serializable value of the segment in the Glue Data Catalog or None.
+            new: object
+                JSON serializable value of the segment in the DDL or None.
+            action: str
+                One of create, patch, recreate or none.
+        """
+        with self._lock:
+            self._changes_list.append({'table': table_name, 'segment': segment, 'old': old, 'new': new,
+                                       'action': action})
+
+    def to_dict(self):
+        """
+        Obtain the report as a JSON serializable dictionary. The changes are sorted by table/view name, while the
+        changes of each table/view retain the order in which they were detected.
+        """
+        with self._lock:
+            changes_list = sorted(self._changes_list, key=lambda change: change['table'])
+        return {'generated_at': self.generated_at.isoformat(timespec='seconds'), 'plan_only': self.plan_only,
+                'changes': changes_list}
+
+    def write(self, report_path):
+        """
+        Write the report out to a local JSON file.
+
+        Parameters
+        ----------
+            report_path: str
+                Path of the JSON file.
+        """
+        with open(report_path, 'w') as report_file:
+            json.dump(self.to_dict(), report_file, indent=2, default=str)
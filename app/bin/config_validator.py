@@ -1,5 +1,4 @@
 import os
-import boto3
 import argparse
 import logging
 import datetime
@@ -9,6 +8,8 @@ import watchtower
 from botocore.exceptions import ClientError
 from jsonschema import validate
 from ucop_util import stack_info
+from template_cache import TemplateCache, get_object_content
+from aws_clients import get_client, setup_default_session
 
 """
 This Python program validates a JSON configuration file against its schema and
@@ -58,6 +59,12 @@ def main():
         help='Desired level of logging.',
         choices=['debug', 'error', 'critical', 'info'],
         default='debug')
+    parser.add_argument(
+        '--template_cache_dir',
+        help='Local directory in which to cache the schema and configuration JSON files obtained from S3 across '
+             'executions. Cached files are revalidated with S3 and only downloaded again when they have changed. '
+             'By default, the files are not cached.',
+        type=str)
     args = parser.parse_args()
     product = args.product.lower()
     environment = os.getenv('branchEnv')
@@ -73,7 +80,7 @@ def main():
         region = args.region.lower()
     else:
         region = 'us-west-2'
-    boto3.setup_default_session(region_name=region)
+    setup_default_session(region)
 
     if args.logger_level is None:
         logger_level = 'DEBUG'
@@ -100,10 +107,14 @@ def main():
         'Positional arguments set to: product={}, config_bucket_label={}, schema_file={}, config_file={}'
         .format(product, config_bucket_label, schema_file, config_file))
     logger.info(
-        'Optional/default arguments set to: region={}, and logger_level={}'
-        .format(region, logger_level))
+        'Optional/default arguments set to: region={}, logger_level={} and template_cache_dir={}'
+        .format(region, logger_level, args.template_cache_dir))
 
-    s3_resource = boto3.resource('s3')
+    s3 = get_client('s3')
+    if args.template_cache_dir is not None:
+        template_cache = TemplateCache(args.template_cache_dir, s3, logger)
+    else:
+        template_cache = None
 
     # Obtain the bucket name where config JSON file is located from
     # CloudFormation stack.
@@ -113,9 +124,7 @@ def main():
 
     # Load the schema file.
     try:
-        schema_obj = s3_resource.Object(bucket_name, schema_file)
-        schema_file_body = schema_obj.get()['Body']
-        json_schema = json.load(schema_file_body)
+        json_schema = json.loads(get_object_content(s3, bucket_name, schema_file, template_cache).decode('utf-8'))
 
     except ClientError as err2:
         if err2.response['Error']['Code'] == 'NoSuchKey':
@@ -129,9 +138,7 @@ def main():
 
     # Load the configuration JSON file.
     try:
-        data_obj = s3_resource.Object(bucket_name, config_file)
-        data_file_body = data_obj.get()['Body']
-        json_data = json.load(data_file_body)
+        json_data = json.loads(get_object_content(s3, bucket_name, config_file, template_cache).decode('utf-8'))
 
     except ClientError as err2:
         if err2.response['Error']['Code'] == 'NoSuchKey':
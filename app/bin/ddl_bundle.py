@@ -0,0 +1,97 @@
+import io
+import gzip
+import tarfile
+import zipfile
+
+"""
+This Python module reads and writes DDL bundles. A bundle is a single archive (zip or gzip-compressed tar) that
+holds the application configuration JSON file and the DDL scripts of every table/view in the configuration, each
+stored under the same key as in the app bucket (e.g., config/config.json or ddl/incoming/student_reg_3wk.ddl).
+Deploying a bundle lets app.py obtain all of the files with a single S3 request (see --bundle command line option
+of app.py), as opposed to one request per file. Bundles are built with build_bundle.py.
+"""
+ZIP_EXTENSIONS = ('.zip',)
+TAR_EXTENSIONS = ('.tar.gz', '.tgz', '.tar')
+
+
+def read_bundle(content, bundle_name):
+    """
+    Unpack a bundle in memory.
+
+    Parameters
+    ----------
+        content: bytes
+            Content of the bundle.
+        bundle_name: str
+            Name (or key) of the bundle, whose extension determines the archive format.
+    Returns
+    -------
+        entries_dict: dictionary
+            The content (bytes) of each file in the bundle keyed by its key in the app bucket.
+    Exceptions
+    ----------
+        Raised if the format of the bundle is not supported.
+    """
+    entries_dict = dict()
+    if bundle_name.lower().endswith(ZIP_EXTENSIONS):
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            for name in archive.namelist():
+                if not name.endswith('/'):
+                    entries_dict[name] = archive.read(name)
+    elif bundle_name.lower().endswith(TAR_EXTENSIONS):
+        with tarfile.open(fileobj=io.BytesIO(content), mode='r:*') as archive:
+            for member in archive.getmembers():
+                if member.isfile():
+                    entries_dict[member.name] = archive.extractfile(member).read()
+    else:
+        raise Exception('The format of bundle: {} is not supported -- The name of the bundle must end in one of: {}'.
+                        format(bundle_name, ', '.join(ZIP_EXTENSIONS + TAR_EXTENSIONS)))
+
+    return entries_dict
+
+
+def write_bundle(entries_dict, bundle_path):
+    """
+    Write out a bundle. The entries are written in the order of their keys with a fixed modification time, so that
+    bundles built from the same files are identical.
+
+    Parameters
+    ----------
+        entries_dict: dictionary
+            The content (bytes) of each file keyed by its key in the app bucket.
+        bundle_path: str
+            Path of the bundle, whose extension determines the archive format.
+    Returns
+    -------
+        None
+    Exceptions
+    ----------
+        Raised if the format of the bundle is not supported.
+    """
+    if bundle_path.lower().endswith(ZIP_EXTENSIONS):
+        with zipfile.ZipFile(bundle_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for key in sorted(entries_dict):
+                archive.writestr(zipfile.ZipInfo(key, date_time=(1980, 1, 1, 0, 0, 0)), entries_dict[key],
+                                 compress_type=zipfile.ZIP_DEFLATED)
+    elif bundle_path.lower().endswith(TAR_EXTENSIONS):
+        with open(bundle_path, 'wb') as bundle_file:
+            if bundle_path.lower().endswith('.tar'):
+                write_tar(entries_dict, bundle_file)
+            else:
+                # The gzip header includes a modification time and the file name as well.
+                with gzip.GzipFile(filename='', fileobj=bundle_file, mode='wb', mtime=0) as gzip_file:
+                    write_tar(entries_dict, gzip_file)
+    else:
+        raise Exception('The format of bundle: {} is not supported -- The name of the bundle must end in one of: {}'.
+                        format(bundle_path, ', '.join(ZIP_EXTENSIONS + TAR_EXTENSIONS)))
+
+
+def write_tar(entries_dict, file_obj):
+    """
+    Write out the entries of a bundle as a tar archive to a file object (see write_bundle()).
+    """
+    with tarfile.open(fileobj=file_obj, mode='w') as archive:
+        for key in sorted(entries_dict):
+            member = tarfile.TarInfo(key)
+            member.size = len(entries_dict[key])
+            archive.addfile(member, io.BytesIO(entries_dict[key]))
@@ -0,0 +1,259 @@
+import re
+import collections
+
+"""
+This Python module implements a single-pass tokenizer for the Athena/Hive DDL statements (e.g., CREATE EXTERNAL
+TABLE) that app.py compares against the metadata of existing tables.
+
+The tokenizer yields keywords, identifiers, numbers, quoted strings and punctuation. Whitespace, line-feeds,
+tabs and SQL comments (signified by --) are consumed while tokenizing; each token only records whether it was
+preceded by whitespace, so that the DDL can be rendered back into the normalized text that the change detection
+functions parse (see render()). Back tics that surround identifiers are dropped and the text inside quoted
+strings is kept as is, so normalizing the DDL never rewrites the contents of comments or property values.
+
+Strings may be enclosed in single or double quotes. When rendered, double-quoted strings are enclosed in single
+quotes instead, with any embedded single quotes escaped, so that the change detection functions only need to
+handle single-quoted values. For example:
+    fields terminated by "\"" escaped by "\""
+is rendered as:
+    fields terminated by '\"' escaped by '\"'
+"""
+KEYWORD = 'keyword'
+IDENTIFIER = 'identifier'
+NUMBER = 'number'
+STRING = 'string'
+PUNCTUATION = 'punctuation'
+
+KEYWORDS = frozenset([
+    'as', 'buckets', 'by', 'clustered', 'collection', 'comment', 'create', 'defined', 'delimited', 'escaped',
+    'exists', 'external', 'fields', 'format', 'if', 'inputformat', 'into', 'items', 'keys', 'lines', 'location',
+    'not', 'null', 'or', 'outputformat', 'partitioned', 'replace', 'row', 'serde', 'serdeproperties', 'sorted',
+    'stored', 'table', 'tblproperties', 'terminated', 'with'
+])
+
+TOKEN_PATTERN = re.compile(r"""
+    (?P<space>\s+)
+    | (?P<comment>--[^\n]*)
+    | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+    | (?P<quoted_identifier>`[^`]*`)
+    | (?P<number>\d+(?:\.\d+)?(?![A-Za-z_]))
+    | (?P<word>[A-Za-z0-9_$]+)
+    | (?P<unterminated>['"`])
+    | (?P<punctuation>.)
+    """, re.VERBOSE | re.DOTALL)
+
+# Hive escape sequences within quoted strings: unicode (e.g., \u0001), octal (e.g., \001) or single character.
+ESCAPE_PATTERN = re.compile(r'\\(?:u(?P<unicode>[0-9a-fA-F]{4})|(?P<octal>[0-3][0-7]{2})|(?P<character>.))',
+                            re.DOTALL)
+ESCAPED_CHARACTERS = {'0': '\u0000', 'b': '\b', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\u001a',
+                      '%': '\\%', '_': '\\_'}
+
+Token = collections.namedtuple('Token', ['type', 'value', 'quote', 'spaced'])
+Token.__doc__ = """
+A DDL token.
+
+    type: str
+        One of KEYWORD, IDENTIFIER, NUMBER, STRING or PUNCTUATION.
+    value: str
+        Text of the token. Keywords are lowercase; the text of quoted strings excludes the enclosing quotes and
+        retains any escape sequences as written in the DDL.
+    quote: str
+        The enclosing quote character of a string token (i.e., ' or ") or None for other tokens.
+    spaced: bool
+        True when the token is preceded by whitespace (or a comment) in the DDL.
+"""
+
+
+def tokenize(ddl_text):
+    """
+    Break the DDL text into tokens in a single pass.
+
+    Parameters
+    ----------
+        ddl_text: str
+            Full text of the DDL statement.
+    Returns
+    -------
+        tokens: list
+            A list of Token tuples in the order in which they appear in the DDL.
+    Exceptions
+    ----------
+        Raised if the DDL includes a quoted string or identifier that is not terminated.
+    """
+    tokens = list()
+    spaced = False
+    for match in TOKEN_PATTERN.finditer(ddl_text):
+        kind = match.lastgroup
+        text = match.group()
+        if kind == 'space' or kind == 'comment':
+            spaced = True
+            continue
+        elif kind == 'string':
+            tokens.append(Token(STRING, text[1:-1], text[0], spaced))
+        elif kind == 'quoted_identifier':
+            tokens.append(Token(IDENTIFIER, text[1:-1], None, spaced))
+        elif kind == 'number':
+            tokens.append(Token(NUMBER, text, None, spaced))
+        elif kind == 'word':
+            if text.lower() in KEYWORDS:
+                tokens.append(Token(KEYWORD, text.lower(), None, spaced))
+            else:
+                tokens.append(Token(IDENTIFIER, text, None, spaced))
+        elif kind == 'unterminated':
+            raise Exception('Encountered an unterminated {} at position {} while parsing the DDL -- '
+                            'Check the DDL for syntax errors!'.format(text, match.start()))
+        else:
+            tokens.append(Token(PUNCTUATION, text, None, spaced))
+        spaced = False
+
+    return tokens
+
+
+def render(tokens):
+    """
+    Render the tokens as normalized DDL text: lowercase, single spaces between tokens that were separated by
+    whitespace, no space before closing parenthesis and commas, no back tics or semicolons, and all strings
+    enclosed in single quotes.
+
+    Parameters
+    ----------
+        tokens: list
+            A list of Token tuples (see tokenize()).
+    Returns
+    -------
+        The normalized DDL text.
+    Exceptions
+    ----------
+        None
+    """
+    parts = list()
+    for token in tokens:
+        if token.type == PUNCTUATION and token.value == ';':
+            continue
+        if token.spaced and len(parts) > 0 and not (token.type == PUNCTUATION and token.value in (')', ',')):
+            parts.append(' ')
+        if token.type == STRING:
+            parts.append("'" + quote_string_text(token) + "'")
+        else:
+            parts.append(token.value)
+
+    return ''.join(parts).lower()
+
+
+def quote_string_text(token):
+    """
+    Obtain the text of a string token as it would be written between single quotes.
+
+    Parameters
+    ----------
+        token: Token
+            A STRING token.
+    Returns
+    -------
+        The text of the string with any embedded single quotes escaped.
+    Exceptions
+    ----------
+        None
+    """
+    if token.quote == "'":
+        return token.value
+    return re.sub(r"(\\.)|'", lambda match: match.group(1) or "\\'", token.value)
+
+
+def unquote(token):
+    """
+    Obtain the value of a string token with its escape sequences resolved the same way Hive resolves them (e.g.,
+    \\' becomes ', \\t becomes a tab and \\001 becomes the character with code 1), which is how the value is
+    stored in the Glue Data Catalog.
+
+    Parameters
+    ----------
+        token: Token
+            A STRING token.
+    Returns
+    -------
+        The value of the string.
+    Exceptions
+    ----------
+        None
+    """
+    return ESCAPE_PATTERN.sub(resolve_escape, token.value)
+
+
+def resolve_escape(match):
+    """
+    Resolve an escape sequence that is matched by ESCAPE_PATTERN.
+    """
+    if match.group('unicode') is not None:
+        return chr(int(match.group('unicode'), 16))
+    elif match.group('octal') is not None:
+        return chr(int(match.group('octal'), 8))
+    else:
+        return ESCAPED_CHARACTERS.get(match.group('character'), match.group('character'))
+
+
+def find_closing_parenthesis(tokens, start):
+    """
+    Find the closing parenthesis that matches the opening parenthesis at the specified position.
+
+    Parameters
+    ----------
+        tokens: list
+            A list of Token tuples.
+        start: int
+            Position of the opening parenthesis in the list.
+    Returns
+    -------
+        Position of the matching closing parenthesis in the list.
+    Exceptions
+    ----------
+        Raised if the parentheses are not balanced.
+    """
+    depth = 0
+    for i in range(start, len(tokens)):
+        if tokens[i].type == PUNCTUATION:
+            if tokens[i].value == '(':
+                depth += 1
+            elif tokens[i].value == ')':
+                depth -= 1
+                if depth == 0:
+                    return i
+                elif depth < 0:
+                    break
+
+    raise Exception('Encountered unbalanced parentheses while parsing the DDL -- Check the DDL for syntax errors!')
+
+
+def split_top_level(tokens, separator=','):
+    """
+    Split a list of tokens on the separator punctuation that is not nested within parenthesis or angle
+    brackets (e.g., decimal(10,2) or struct<a:int,b:string>).
+
+    Parameters
+    ----------
+        tokens: list
+            A list of Token tuples.
+        separator: str
+            The separator punctuation.
+    Returns
+    -------
+        groups: list
+            A list of lists of Token tuples between the separators.
+    Exceptions
+    ----------
+        None
+    """
+    groups = [list()]
+    depth = 0
+    for token in tokens:
+        if token.type == PUNCTUATION:
+            if token.value in ('(', '<'):
+                depth += 1
+            elif token.value in (')', '>'):
+                depth -= 1
+            elif token.value == separator and depth == 0:
+                groups.append(list())
+                continue
+        groups[-1].append(token)
+
+    return [group for group in groups if len(group) > 0]
@@ -0,0 +1,193 @@
+import re
+import functools
+
+"""
+This Python module normalizes Hive/Athena data type expressions, so that data types that are spelled differently
+in a DDL and in the Glue Data Catalog are not detected as changes (e.g., decimal(10, 2) and decimal(10,2),
+integer and int, or struct<a : int> and struct<a:int>).
+
+A data type is parsed into its canonical form, which is lowercase, excludes whitespace and resolves the following:
+    1. Aliases: integer is int, real is float, double precision is double, and dec and numeric are decimal.
+    2. Defaults: decimal is decimal(10,0) and decimal(p) is decimal(p,0).
+    3. Nested types: the element types of array, map, struct and uniontype types are normalized recursively and
+       the back tics that surround the field names of a struct are dropped.
+
+For example, STRUCT<`Id`: INTEGER, amounts: ARRAY<DECIMAL(8)>> is normalized to
+struct<id:int,amounts:array<decimal(8,0)>>.
+
+A data type that cannot be parsed (e.g., a struct field with a comment) is only converted to lowercase with its
+whitespace removed.
+"""
+TYPE_ALIASES = {'integer': 'int', 'real': 'float', 'dec': 'decimal', 'numeric': 'decimal'}
+DEFAULT_DECIMAL_PRECISION = 10
+DEFAULT_DECIMAL_SCALE = 0
+
+TYPE_TOKEN_PATTERN = re.compile(r'\s*(?:(?P<word>[A-Za-z_][A-Za-z0-9_]*)|`(?P<quoted_word>[^`]*)`|'
+                                r'(?P<number>\d+)|(?P<punctuation>[<>(),:]))')
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_type(type_text):
+    """
+    Obtain the canonical form of a data type. The outcome is cached, because the same data types recur across the
+    columns of the tables.
+
+    Parameters
+    ----------
+        type_text: str
+            The data type as it is written in a DDL or stored in the Glue Data Catalog.
+    Returns
+    -------
+        The canonical form of the data type.
+    Exceptions
+    ----------
+        None
+    """
+    return canonicalize_type(type_text)
+
+
+def canonicalize_type(type_text):
+    """
+    Parse a data type into its canonical form (see normalize_type(), which caches the outcome).
+
+    Parameters
+    ----------
+        type_text: str
+            The data type as it is written in a DDL or stored in the Glue Data Catalog.
+    Returns
+    -------
+        The canonical form of the data type or, if the data type cannot be parsed, the lowercase data type without
+        any whitespace.
+    Exceptions
+    ----------
+        None
+    """
+    try:
+        tokens = tokenize_type(type_text)
+        canonical_type, position = parse_type(tokens, 0)
+        if position == len(tokens):
+            return canonical_type
+    except ValueError:
+        pass
+
+    return ''.join(type_text.lower().split())
+
+
+def tokenize_type(type_text):
+    """
+    Break a data type into words, numbers and punctuation.
+
+    Parameters
+    ----------
+        type_text: str
+            The data type.
+    Returns
+    -------
+        tokens: list
+            A list of (kind, value) tuples, where kind is word, number or punctuation and words are lowercase.
+    Exceptions
+    ----------
+        ValueError is raised if the data type includes any other characters.
+    """
+    tokens = list()
+    position = 0
+    type_text = type_text.rstrip()
+    while position < len(type_text):
+        match = TYPE_TOKEN_PATTERN.match(type_text, position)
+        if match is None:
+            raise ValueError('Unexpected character at position {} of data type: {}'.format(position, type_text))
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind in ('word', 'quoted_word'):
+            tokens.append(('word', value.lower()))
+        else:
+            tokens.append((kind, value))
+        position = match.end()
+
+    return tokens
+
+
+def parse_type(tokens, position):
+    """
+    Parse the data type that starts at the specified position into its canonical form.
+
+    Parameters
+    ----------
+        tokens: list
+            Tokens of the data type (see tokenize_type()).
+        position: int
+            Position of the first token of the data type.
+    Returns
+    -------
+        canonical_type: str
+            The canonical form of the data type.
+        position: int
+            Position of the token that follows the data type.
+    Exceptions
+    ----------
+        ValueError is raised if the tokens are not a valid data type.
+    """
+    name = expect(tokens, position, 'word')
+    position += 1
+    if name == 'double' and position < len(tokens) and tokens[position] == ('word', 'precision'):
+        return 'double', position + 1
+    name = TYPE_ALIASES.get(name, name)
+
+    if name in ('array', 'map', 'uniontype'):
+        expect(tokens, position, 'punctuation', '<')
+        element_types_list = list()
+        while True:
+            element_type, position = parse_type(tokens, position + 1)
+            element_types_list.append(element_type)
+            if expect(tokens, position, 'punctuation') == '>':
+                break
+            expect(tokens, position, 'punctuation', ',')
+        if (name == 'array' and len(element_types_list) != 1) or (name == 'map' and len(element_types_list) != 2):
+            raise ValueError('Unexpected number of element types in {}'.format(name))
+        return '{}<{}>'.format(name, ','.join(element_types_list)), position + 1
+
+    if name == 'struct':
+        expect(tokens, position, 'punctuation', '<')
+        fields_list = list()
+        while True:
+            field_name = expect(tokens, position + 1, 'word')
+            expect(tokens, position + 2, 'punctuation', ':')
+            field_type, position = parse_type(tokens, position + 3)
+            fields_list.append(field_name + ':' + field_type)
+            if expect(tokens, position, 'punctuation') == '>':
+                break
+            expect(tokens, position, 'punctuation', ',')
+        return 'struct<{}>'.format(','.join(fields_list)), position + 1
+
+    parameters_list = list()
+    if position < len(tokens) and tokens[position] == ('punctuation', '('):
+        while True:
+            parameters_list.append(str(int(expect(tokens, position + 1, 'number'))))
+            position += 2
+            if expect(tokens, position, 'punctuation') == ')':
+                break
+            expect(tokens, position, 'punctuation', ',')
+        position += 1
+
+    if name == 'decimal':
+        if len(parameters_list) == 0:
+            parameters_list.append(str(DEFAULT_DECIMAL_PRECISION))
+        if len(parameters_list) == 1:
+            parameters_list.append(str(DEFAULT_DECIMAL_SCALE))
+
+    if len(parameters_list) == 0:
+        return name, position
+    return '{}({})'.format(name, ','.join(parameters_list)), position
+
+
+def expect(tokens, position, kind, value=None):
+    """
+    Obtain the value of the token at the specified position, which must be of the specified kind (and value).
+
+    Exceptions
+    ----------
+        ValueError is raised if the token does not exist or is not of the specified kind (and value).
+    """
+    if position >= len(tokens) or tokens[position][0] != kind or (value is not None and tokens[position][1] != value):
+        raise ValueError('Expected {} at position {} of the data type'.format(value or kind, position))
+    return tokens[position][1]
@@ -1,11 +1,11 @@
 import os
-import boto3
 import logging
 import argparse
 import watchtower
 import datetime
 
 from ucop_util.lf_perms_helper import lf_perms_helper
+from aws_clients import setup_default_session
 """
 This Python program grants Lake Formation permissions on Athena tables to a set of predefined
 IAM roles based on information in a JSON configuration file (e.g., config_perm.json).
@@ -101,7 +101,7 @@ def main():
         region = args.region.lower()
     else:
         region = 'us-west-2'
-    boto3.setup_default_session(region_name=region)
+    setup_default_session(region)
 
     if args.logger_level is None:
         logger_level = 'DEBUG'
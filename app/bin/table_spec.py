@@ -0,0 +1,434 @@
+import json
+import hashlib
+
+import ddl_lexer
+from hive_types import normalize_type
+
+"""
+This Python module implements TableSpec, a canonical model of an Athena table's structure that can be constructed
+from either the CREATE EXTERNAL TABLE statement in a DDL or the table's metadata in the Glue Data Catalog (i.e.,
+an element of the get_tables Glue boto3 API response).
+
+A spec covers the columns, table comment, partition keys, bucketing, SerDe and its parameters, file format,
+location and the tracked TBLPROPERTIES (see is_tracked_tblproperty()). When constructed from a DDL, the defaults
+that Athena applies upon creating the table are filled in, so that both specs are in the form Glue stores:
+    1. STORED AS <format> is expanded to the InputFormat/OutputFormat pair of the format and, unless the DDL
+       includes a ROW FORMAT clause, to the default SerDe of the format. A DDL without a STORED AS clause is
+       stored as TEXTFILE.
+    2. ROW FORMAT DELIMITED sub-clauses are converted to the SerDe parameters of LazySimpleSerDe (e.g., FIELDS
+       TERMINATED BY becomes field.delim).
+    3. The serialization.format SerDe parameter is dropped when it is the default (i.e., 1) or is the same as
+       field.delim, because Athena adds it to the SerDe parameters implicitly.
+    4. The data types of the columns and partition keys are compared in their canonical form (see hive_types.py),
+       e.g., decimal(10, 2) is the same as decimal(10,2) and integer is the same as int.
+The attributes of a spec retain the case of the names and values (e.g., so that a table comment can be applied to
+the table as is), whereas the segments that are hashed and compared are lowercase, as the change detection in
+app.py does not distinguish between upper- and lower-case letters.
+
+Each spec has a content hash that is stable across executions, so that determining whether an existing table has
+changed is a single comparison of the hashes of the two specs. The segments that differ are obtained by diff().
+"""
+LAZY_SIMPLE_SERDE = 'org.apache.hadoop.hive.serde2.lazy.lazysimpleserde'
+
+# InputFormat, OutputFormat and default SerDe of the file formats that may be specified by name in STORED AS clause.
+STORED_AS_FORMATS = {
+    'textfile': ('org.apache.hadoop.mapred.textinputformat',
+                 'org.apache.hadoop.hive.ql.io.hiveignorekeytextoutputformat',
+                 LAZY_SIMPLE_SERDE),
+    'sequencefile': ('org.apache.hadoop.mapred.sequencefileinputformat',
+                     'org.apache.hadoop.hive.ql.io.hivesequencefileoutputformat',
+                     LAZY_SIMPLE_SERDE),
+    'rcfile': ('org.apache.hadoop.hive.ql.io.rcfileinputformat',
+               'org.apache.hadoop.hive.ql.io.rcfileoutputformat',
+               'org.apache.hadoop.hive.serde2.columnar.lazybinarycolumnarserde'),
+    'orc': ('org.apache.hadoop.hive.ql.io.orc.orcinputformat',
+            'org.apache.hadoop.hive.ql.io.orc.orcoutputformat',
+            'org.apache.hadoop.hive.ql.io.orc.orcserde'),
+    'parquet': ('org.apache.hadoop.hive.ql.io.parquet.mapredparquetinputformat',
+                'org.apache.hadoop.hive.ql.io.parquet.mapredparquetoutputformat',
+                'org.apache.hadoop.hive.ql.io.parquet.serde.parquethiveserde'),
+    'avro': ('org.apache.hadoop.hive.ql.io.avro.avrocontainerinputformat',
+             'org.apache.hadoop.hive.ql.io.avro.avrocontaineroutputformat',
+             'org.apache.hadoop.hive.serde2.avro.avroserde')
+}
+
+# SerDe parameters that correspond to the ROW FORMAT DELIMITED sub-clauses. Note that Glue stores the
+# COLLECTION ITEMS TERMINATED BY character as colelction.delim (sic).
+ROW_FORMAT_DELIMITED_PARAMETERS = [
+    (('fields', 'terminated', 'by'), 'field.delim'),
+    (('escaped', 'by'), 'escape.delim'),
+    (('collection', 'items', 'terminated', 'by'), 'colelction.delim'),
+    (('map', 'keys', 'terminated', 'by'), 'mapkey.delim'),
+    (('lines', 'terminated', 'by'), 'line.delim'),
+    (('null', 'defined', 'as'), 'serialization.null.format')
+]
+
+# Segments of a spec in the order in which app.py checks them for changes.
+SEGMENTS = ['columns', 'table_comment', 'partition_keys', 'bucketing', 'serde', 'file_format', 'location',
+            'tblproperties']
+
+
+class TableSpec:
+    """
+    A canonical model of an Athena table's structure.
+    """
+    def __init__(self, columns, table_comment, partition_keys, bucket_columns, number_of_buckets, serde_library,
+                 serde_parameters, input_format, output_format, location, tblproperties):
+        """
+        Parameters
+        ----------
+            columns: list
+                (name, type, comment) tuples of the columns. Comment is None when the column has no comment.
+            table_comment: str
+                Comment of the table or None.
+            partition_keys: list
+                (name, type, comment) tuples of the partition keys.
+            bucket_columns: list
+                Names of the columns by which the table is clustered.
+            number_of_buckets: int
+                Number of buckets or None if the table is not clustered.
+            serde_library: str
+                Class name of the SerDe.
+            serde_parameters: dictionary
+                Parameters of the SerDe.
+            input_format: str
+                Class name of the InputFormat.
+            output_format: str
+                Class name of the OutputFormat.
+            location: str
+                S3 location of the table.
+            tblproperties: dictionary
+                The tracked table properties.
+        """
+        self.columns = list(columns)
+        self.table_comment = table_comment
+        self.partition_keys = list(partition_keys)
+        self.bucket_columns = list(bucket_columns)
+        self.number_of_buckets = int(number_of_buckets) if len(self.bucket_columns) > 0 else None
+        self.serde_library = serde_library
+        self.serde_parameters = canonicalize_serde_parameters(serde_parameters)
+        self.input_format = input_format
+        self.output_format = output_format
+        self.location = location
+        self.tblproperties = dict((key, value) for key, value in tblproperties.items() if is_tracked_tblproperty(key))
+
+    @classmethod
+    def from_glue(cls, table_metadata):
+        """
+        Construct the spec of an existing table.
+
+        Parameters
+        ----------
+            table_metadata: Dictionary
+                Athena table's metadata in the form of JSON that is obtained by calling get_tables Glue boto3 API.
+        Returns
+        -------
+            The TableSpec of the table.
+        """
+        def glue_columns(columns_list):
+            return [(column['Name'], column['Type'], column.get('Comment')) for column in columns_list]
+
+        storage_descriptor = table_metadata.get('StorageDescriptor', dict())
+        serde_info = storage_descriptor.get('SerdeInfo', dict())
+        parameters = table_metadata.get('Parameters', dict())
+        return cls(columns=glue_columns(storage_descriptor.get('Columns', list())),
+                   table_comment=parameters.get('comment'),
+                   partition_keys=glue_columns(table_metadata.get('PartitionKeys', list())),
+                   bucket_columns=storage_descriptor.get('BucketColumns', list()),
+                   number_of_buckets=storage_descriptor.get('NumberOfBuckets'),
+                   serde_library=serde_info.get('SerializationLibrary'),
+                   serde_parameters=serde_info.get('Parameters', dict()),
+                   input_format=storage_descriptor.get('InputFormat'),
+                   output_format=storage_descriptor.get('OutputFormat'),
+                   location=storage_descriptor.get('Location'),
+                   tblproperties=parameters)
+
+    @classmethod
+    def from_ddl(cls, ddl_tokens):
+        """
+        Construct the spec of the table that a CREATE EXTERNAL TABLE statement creates.
+
+        Parameters
+        ----------
+            ddl_tokens: list
+                Tokens of the CREATE EXTERNAL TABLE statement (see ddl_lexer.tokenize()).
+        Returns
+        -------
+            The TableSpec of the table.
+        Exceptions
+        ----------
+            Raised if the statement includes a clause that is not expected in a CREATE EXTERNAL TABLE statement.
+        """
+        start_pos = next((i for i, token in enumerate(ddl_tokens) if is_punctuation(token, '(')), None)
+        if start_pos is None:
+            raise Exception('Did not find the columns list in DDL -- Check the DDL for syntax errors!')
+        end_pos = ddl_lexer.find_closing_parenthesis(ddl_tokens, start_pos)
+        spec_dict = {'columns': parse_columns(ddl_tokens[start_pos + 1: end_pos]), 'table_comment': None,
+                     'partition_keys': list(), 'bucket_columns': list(), 'number_of_buckets': None,
+                     'serde_library': None, 'serde_parameters': dict(), 'input_format': None,
+                     'output_format': None, 'location': None, 'tblproperties': dict()}
+        stored_as = None
+
+        i = end_pos + 1
+        while i < len(ddl_tokens):
+            if is_punctuation(ddl_tokens[i], ';'):
+                i += 1
+            elif matches(ddl_tokens, i, ('comment',)):
+                spec_dict['table_comment'] = string_value(ddl_tokens, i + 1)
+                i += 2
+            elif matches(ddl_tokens, i, ('partitioned', 'by', '(')):
+                end_pos = ddl_lexer.find_closing_parenthesis(ddl_tokens, i + 2)
+                spec_dict['partition_keys'] = parse_columns(ddl_tokens[i + 3: end_pos])
+                i = end_pos + 1
+            elif matches(ddl_tokens, i, ('clustered', 'by', '(')):
+                end_pos = ddl_lexer.find_closing_parenthesis(ddl_tokens, i + 2)
+                spec_dict['bucket_columns'] = [token.value for token in ddl_tokens[i + 3: end_pos]
+                                               if not is_punctuation(token, ',')]
+                i = end_pos + 1
+                if matches(ddl_tokens, i, ('sorted', 'by', '(')):
+                    i = ddl_lexer.find_closing_parenthesis(ddl_tokens, i + 2) + 1
+                if not matches(ddl_tokens, i, ('into',)) or not matches(ddl_tokens, i + 2, ('buckets',)):
+                    raise Exception('Expected INTO <number> BUCKETS in the CLUSTERED BY clause of the DDL -- '
+                                    'Check the DDL for syntax errors!')
+                spec_dict['number_of_buckets'] = int(ddl_tokens[i + 1].value)
+                i += 3
+            elif matches(ddl_tokens, i, ('row', 'format', 'serde')):
+                spec_dict['serde_library'] = string_value(ddl_tokens, i + 3)
+                i += 4
+            elif matches(ddl_tokens, i, ('with', 'serdeproperties', '(')):
+                end_pos = ddl_lexer.find_closing_parenthesis(ddl_tokens, i + 2)
+                spec_dict['serde_parameters'].update(parse_properties(ddl_tokens[i + 3: end_pos]))
+                i = end_pos + 1
+            elif matches(ddl_tokens, i, ('row', 'format', 'delimited')):
+                spec_dict['serde_library'] = LAZY_SIMPLE_SERDE
+                i += 3
+                matched = True
+                while matched:
+                    matched = False
+                    for words, parameter in ROW_FORMAT_DELIMITED_PARAMETERS:
+                        if matches(ddl_tokens, i, words):
+                            spec_dict['serde_parameters'][parameter] = string_value(ddl_tokens, i + len(words))
+                            i += len(words) + 1
+                            matched = True
+            elif matches(ddl_tokens, i, ('stored', 'as', 'inputformat')):
+                spec_dict['input_format'] = string_value(ddl_tokens, i + 3)
+                i += 4
+                if matches(ddl_tokens, i, ('outputformat',)):
+                    spec_dict['output_format'] = string_value(ddl_tokens, i + 1)
+                    i += 2
+            elif matches(ddl_tokens, i, ('stored', 'as')) and i + 2 < len(ddl_tokens):
+                stored_as = ddl_tokens[i + 2].value.lower()
+                if stored_as not in STORED_AS_FORMATS:
+                    raise Exception("DDL's STORED AS sub-clause does not match any of the expected values: {}".
+                                    format(', '.join(sorted(STORED_AS_FORMATS))))
+                i += 3
+            elif matches(ddl_tokens, i, ('location',)):
+                spec_dict['location'] = string_value(ddl_tokens, i + 1)
+                i += 2
+            elif matches(ddl_tokens, i, ('tblproperties', '(')):
+                end_pos = ddl_lexer.find_closing_parenthesis(ddl_tokens, i + 1)
+                spec_dict['tblproperties'] = parse_properties(ddl_tokens[i + 2: end_pos])
+                i = end_pos + 1
+            else:
+                raise Exception('Encountered unexpected text: {} in the DDL -- Check the DDL for syntax errors!'.
+                                format(ddl_lexer.render(ddl_tokens[i: i + 5])))
+
+        # Fill in the defaults that Athena applies when the DDL does not specify the file format or the SerDe.
+        if spec_dict['input_format'] is None:
+            spec_dict['input_format'], spec_dict['output_format'], default_serde_library = \
+                STORED_AS_FORMATS[stored_as or 'textfile']
+        else:
+            default_serde_library = LAZY_SIMPLE_SERDE
+        if spec_dict['serde_library'] is None:
+            spec_dict['serde_library'] = default_serde_library
+
+        return cls(**spec_dict)
+
+    def to_dict(self):
+        """
+        Obtain the lowercase segments of the spec as a JSON serializable dictionary keyed by segment name (see
+        SEGMENTS).
+        """
+        return {
+            'columns': [lower_column(column) for column in self.columns],
+            'table_comment': lower(self.table_comment),
+            'partition_keys': [lower_column(column) for column in self.partition_keys],
+            'bucketing': {'columns': [name.lower() for name in self.bucket_columns],
+                          'number_of_buckets': self.number_of_buckets},
+            'serde': {'library': lower(self.serde_library), 'parameters': lower_dict(self.serde_parameters)},
+            'file_format': {'input_format': lower(self.input_format), 'output_format': lower(self.output_format)},
+            'location': lower(self.location),
+            'tblproperties': lower_dict(self.tblproperties)
+        }
+
+    def content_hash(self):
+        """
+        Obtain a hash of the spec's content that is stable across executions.
+
+        Returns
+        -------
+            The hexadecimal SHA-256 digest of the canonical JSON representation of the spec.
+        """
+        return hashlib.sha256(json.dumps(self.to_dict(), sort_keys=True).encode('utf-8')).hexdigest()
+
+    def diff(self, other):
+        """
+        Compare the spec against another spec segment by segment.
+
+        Parameters
+        ----------
+            other: TableSpec
+                The spec to compare against (e.g., the spec of the DDL when self is the spec of the existing table).
+        Returns
+        -------
+            differences_list: list
+                A dictionary for each segment that differs with the segment name ('segment'), the value in this
+                spec ('old') and the value in the other spec ('new'), in the order of SEGMENTS.
+        """
+        old_dict = self.to_dict()
+        new_dict = other.to_dict()
+        return [{'segment': segment, 'old': old_dict[segment], 'new': new_dict[segment]} for segment in SEGMENTS
+                if old_dict[segment] != new_dict[segment]]
+
+
+def parse_columns(columns_tokens):
+    """
+    Parse the tokens of a columns list (e.g., the columns list or the PARTITIONED BY clause of the DDL) into
+    the name, data type and optional comment of each column.
+
+    Parameters
+    ----------
+        columns_tokens: list
+            Tokens between the parenthesis that surround the columns list.
+    Returns
+    -------
+        columns_list: list
+            A list of (name, type, comment) tuples, where name and type are lowercase and comment is None when
+            the column does not have a comment.
+    Exceptions
+    ----------
+        Raised if a column definition does not include a data type.
+    """
+    columns_list = list()
+    for column_tokens in ddl_lexer.split_top_level(columns_tokens):
+        comment_pos = next((i for i, token in enumerate(column_tokens)
+                            if i > 1 and token.type == ddl_lexer.KEYWORD and token.value == 'comment'),
+                           len(column_tokens))
+        if comment_pos < 2:
+            raise Exception('Column: {} does not have a data type in DDL -- Check the DDL for syntax errors!'.
+                            format(ddl_lexer.render(column_tokens)))
+        if comment_pos < len(column_tokens) - 1 and column_tokens[comment_pos + 1].type == ddl_lexer.STRING:
+            comment = ddl_lexer.unquote(column_tokens[comment_pos + 1])
+        else:
+            comment = None
+        columns_list.append((column_tokens[0].value.lower(), ddl_lexer.render(column_tokens[1:comment_pos]), comment))
+
+    return columns_list
+
+
+def parse_properties(properties_tokens):
+    """
+    Parse the tokens of a list of 'key'='value' pairs (i.e., WITH SERDEPROPERTIES or TBLPROPERTIES).
+
+    Parameters
+    ----------
+        properties_tokens: list
+            Tokens between the parenthesis that surround the list.
+    Returns
+    -------
+        properties_dict: dictionary
+            The properties keyed by property name.
+    Exceptions
+    ----------
+        Raised if an element of the list is not a 'key'='value' pair.
+    """
+    properties_dict = dict()
+    for property_tokens in ddl_lexer.split_top_level(properties_tokens):
+        if len(property_tokens) != 3 or not is_punctuation(property_tokens[1], '=') or \
+                property_tokens[0].type != ddl_lexer.STRING or property_tokens[2].type != ddl_lexer.STRING:
+            raise Exception("Expected a 'key'='value' pair instead of: {} in the DDL -- "
+                            "Check the DDL for syntax errors!".format(ddl_lexer.render(property_tokens)))
+        properties_dict[ddl_lexer.unquote(property_tokens[0])] = ddl_lexer.unquote(property_tokens[2])
+
+    return properties_dict
+
+
+def canonicalize_serde_parameters(serde_parameters):
+    """
+    Convert SerDe parameters to the canonical form, which excludes the serialization.format parameter when it is
+    the default (i.e., 1) or is the same as field.delim.
+
+    Parameters
+    ----------
+        serde_parameters: dictionary
+            Parameters of the SerDe.
+    Returns
+    -------
+        The canonical SerDe parameters.
+    """
+    serde_parameters = dict(serde_parameters)
+    if 'serialization.format' in serde_parameters and \
+            serde_parameters['serialization.format'] in ('1', serde_parameters.get('field.delim')):
+        del serde_parameters['serialization.format']
+    return serde_parameters
+
+
+def is_tracked_tblproperty(key):
+    """
+    Determine if changes to a table property are detected (see Known Issues #2 at the top of app.py).
+
+    Parameters
+    ----------
+        key: str
+            Name of the table property.
+    Returns
+    -------
+        Boolean True when changes to the table property are detected or False otherwise.
+    Exceptions
+    ----------
+        None
+    """
+    key = key.lower()
+    return key in ('classification', 'has_encrypted_data', 'orc.compress', 'parquet.compress', 'write.compression',
+                   'skip.header.line.count', 'storage.location.template') or key.startswith('projection.')
+
+
+def matches(tokens, start, words):
+    """
+    Determine if the tokens starting at the specified position are the specified words or punctuation.
+    """
+    if start + len(words) > len(tokens):
+        return False
+    return all(tokens[start + i].type != ddl_lexer.STRING and tokens[start + i].value.lower() == word
+               for i, word in enumerate(words))
+
+
+def is_punctuation(token, value):
+    return token.type == ddl_lexer.PUNCTUATION and token.value == value
+
+
+def string_value(tokens, position):
+    """
+    Obtain the value of the string token at the specified position.
+
+    Exceptions
+    ----------
+        Raised if the token at the specified position is not a quoted string.
+    """
+    if position >= len(tokens) or tokens[position].type != ddl_lexer.STRING:
+        raise Exception('Expected a quoted value after: {} in the DDL -- Check the DDL for syntax errors!'.
+                        format(ddl_lexer.render(tokens[max(position - 3, 0): position])))
+    return ddl_lexer.unquote(tokens[position])
+
+
+def lower(value):
+    return None if value is None else value.lower()
+
+
+def lower_column(column):
+    name, data_type, comment = column
+    return [name.lower(), normalize_type(data_type), lower(comment)]
+
+
+def lower_dict(dictionary):
+    return dict((key.lower(), value.lower()) for key, value in dictionary.items())
@@ -0,0 +1,146 @@
+import os
+import sqlite3
+import hashlib
+import tempfile
+import threading
+
+from botocore.exceptions import ClientError
+
+"""
+This Python module implements a persistent local cache of S3 objects that rarely change, such as the DDL scripts
+in sql_folder1 and the configuration JSON files, so that repeated executions of app.py and config_validator.py do
+not download the objects again when they have not changed.
+
+The content of each object is stored once under the cache directory in a file named after the SHA-256 digest of
+the content (i.e., content-addressed), so objects with the same content share a file. An index in a SQLite
+database (template_cache.db) maps each bucket/key to the ETag and digest of the cached content. A cached object is
+revalidated on every use with a conditional get_object call (IfNoneMatch set to the cached ETag): S3 responds with
+304 Not Modified and no content when the object has not changed, or with the new content otherwise.
+"""
+CACHE_FILE_NAME = 'template_cache.db'
+OBJECTS_DIR_NAME = 'objects'
+
+
+class TemplateCache:
+    """
+    A persistent, content-addressed cache of S3 objects that are revalidated with conditional requests.
+    """
+    def __init__(self, cache_dir, s3_client, logger):
+        """
+        Parameters
+        ----------
+            cache_dir: str
+                Directory in which the cache is stored. The directory is created if it does not exist.
+            s3_client: object
+                S3 boto3 client with which the objects are obtained.
+            logger: object
+                Logger to which the cache activity is logged.
+        """
+        self.objects_dir = os.path.join(cache_dir, OBJECTS_DIR_NAME)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.s3_client = s3_client
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(os.path.join(cache_dir, CACHE_FILE_NAME), check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS cached_objects ('
+                'bucket_name TEXT NOT NULL, object_key TEXT NOT NULL, etag TEXT NOT NULL, digest TEXT NOT NULL, '
+                'PRIMARY KEY (bucket_name, object_key))')
+
+    def get(self, bucket_name, object_key):
+        """
+        Obtain the content of an S3 object, using the cached content when the object has not changed.
+
+        Parameters
+        ----------
+            bucket_name: str
+                Name of the bucket.
+            object_key: str
+                Key of the object.
+        Returns
+        -------
+            The content of the object as bytes.
+        Exceptions
+        ----------
+            ClientError is raised if the object cannot be obtained (e.g., NoSuchKey).
+        """
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT etag, digest FROM cached_objects WHERE bucket_name = ? AND object_key = ?',
+                (bucket_name, object_key)).fetchone()
+
+        cached_content = None
+        if row is not None:
+            cached_content = self._read(row[1])
+
+        if cached_content is None:
+            response = self.s3_client.get_object(Bucket=bucket_name, Key=object_key)
+        else:
+            try:
+                response = self.s3_client.get_object(Bucket=bucket_name, Key=object_key, IfNoneMatch=row[0])
+            except ClientError as ce:
+                if ce.response['Error']['Code'] in ('304', 'NotModified'):
+                    self.logger.debug('Object: s3://{}/{} has not changed -- using the cached content'.
+                                      format(bucket_name, object_key))
+                    return cached_content
+                raise
+
+        content = response['Body'].read()
+        digest = self._write(content)
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO cached_objects (bucket_name, object_key, etag, digest) VALUES (?, ?, ?, ?)',
+                (bucket_name, object_key, response['ETag'], digest))
+        self.logger.debug('Object: s3://{}/{} was downloaded and cached'.format(bucket_name, object_key))
+        return content
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _read(self, digest):
+        try:
+            with open(os.path.join(self.objects_dir, digest), 'rb') as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+        # A file that was modified outside of the cache is not used.
+        return content if hashlib.sha256(content).hexdigest() == digest else None
+
+    def _write(self, content):
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = os.path.join(self.objects_dir, digest)
+        if not os.path.exists(object_path):
+            # Write to a temporary file first, so that concurrent readers never see a partially written file.
+            file_descriptor, temp_path = tempfile.mkstemp(dir=self.objects_dir)
+            with os.fdopen(file_descriptor, 'wb') as f:
+                f.write(content)
+            os.replace(temp_path, object_path)
+        return digest
+
+
+def get_object_content(s3_client, bucket_name, object_key, template_cache=None):
+    """
+    Obtain the content of an S3 object through the cache, if the cache is enabled, or directly from S3 otherwise.
+
+    Parameters
+    ----------
+        s3_client: object
+            S3 boto3 client with which the object is obtained when the cache is not enabled.
+        bucket_name: str
+            Name of the bucket.
+        object_key: str
+            Key of the object.
+        template_cache: TemplateCache
+            The cache or None.
+    Returns
+    -------
+        The content of the object as bytes.
+    Exceptions
+    ----------
+        ClientError is raised if the object cannot be obtained (e.g., NoSuchKey).
+    """
+    if template_cache is not None:
+        return template_cache.get(bucket_name, object_key)
+    return s3_client.get_object(Bucket=bucket_name, Key=object_key)['Body'].read()
@@ -0,0 +1,168 @@
+import os
+import copy
+import unittest
+
+# The AWS clients of app.py are created on import, which requires a region.
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-west-2')
+import app
+from table_spec import TableSpec
+
+"""
+Unit tests of the functions in app.py that decide whether a changed table is altered in place or recreated.
+"""
+PARQUET_SERDE = 'org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe'
+ORC_SERDE = 'org.apache.hadoop.hive.ql.io.orc.OrcSerde'
+TEXT_SERDE = 'org.apache.hadoop.hive.serde2.lazy.LazySimpleSerDe'
+META_COLUMNS = [('id', 'int', None), ('name', 'varchar(10)', None), ('amount', 'decimal(8,2)', None)]
+
+
+def build_table_metadata(columns, serde_library=PARQUET_SERDE, partition_keys=()):
+    return {
+        'Name': 't',
+        'TableType': 'EXTERNAL_TABLE',
+        'StorageDescriptor': {
+            'Columns': [dict({'Name': name, 'Type': data_type}, **({'Comment': comment} if comment else {}))
+                        for name, data_type, comment in columns],
+            'Location': 's3://test-bucket/t',
+            'SerdeInfo': {'SerializationLibrary': serde_library, 'Parameters': dict()}
+        },
+        'PartitionKeys': [{'Name': name, 'Type': 'string'} for name in partition_keys],
+        'Parameters': {'EXTERNAL': 'TRUE'}
+    }
+
+
+def classify(ddl_columns, serde_library=PARQUET_SERDE):
+    return [(column_change['column'], column_change['change'])
+            for column_change in app.classify_column_changes(META_COLUMNS, ddl_columns, serde_library)]
+
+
+class ClassifyColumnChangesTest(unittest.TestCase):
+    def test_unchanged_columns(self):
+        self.assertEqual(classify([('ID', 'INTEGER', None), ('name', 'varchar(10)', None),
+                                   ('amount', 'decimal(8, 2)', None)]), list())
+
+    def test_appended_column(self):
+        self.assertEqual(classify(META_COLUMNS + [('note', 'string', None)]), [('note', 'add')])
+
+    def test_inserted_column(self):
+        self.assertEqual(classify(META_COLUMNS[:1] + [('note', 'string', None)] + META_COLUMNS[1:]),
+                         [('note', 'add'), (None, 'reorder')])
+
+    def test_reordered_columns(self):
+        self.assertEqual(classify([META_COLUMNS[1], META_COLUMNS[0], META_COLUMNS[2]]), [(None, 'reorder')])
+
+    def test_dropped_column(self):
+        self.assertEqual(classify(META_COLUMNS[:2]), [('amount', 'drop')])
+
+    def test_changed_comment(self):
+        self.assertEqual(classify([('id', 'int', 'The ID')] + META_COLUMNS[1:]), [('id', 'comment')])
+
+    def test_type_changes(self):
+        type_cases = [
+            (PARQUET_SERDE, 'id', 'bigint', 'type'),
+            (ORC_SERDE, 'id', 'bigint', 'incompatible_type'),
+            (TEXT_SERDE, 'id', 'bigint', 'type'),
+            (PARQUET_SERDE, 'name', 'string', 'incompatible_type'),
+            (TEXT_SERDE, 'name', 'string', 'type'),
+            (TEXT_SERDE, 'name', 'varchar(20)', 'type'),
+            (TEXT_SERDE, 'name', 'varchar(5)', 'incompatible_type'),
+            (TEXT_SERDE, 'amount', 'decimal(10,2)', 'type'),
+            (TEXT_SERDE, 'amount', 'decimal(8,3)', 'incompatible_type'),
+            (PARQUET_SERDE, 'amount', 'decimal(10,2)', 'incompatible_type'),
+            (TEXT_SERDE, 'id', 'smallint', 'incompatible_type')
+        ]
+        for serde_library, column_name, data_type, change in type_cases:
+            with self.subTest(serde=serde_library, column=column_name, type=data_type):
+                ddl_columns = [(name, data_type if name == column_name else meta_type, comment)
+                               for name, meta_type, comment in META_COLUMNS]
+                self.assertEqual(classify(ddl_columns, serde_library), [(column_name, change)])
+
+
+class IsWideningTypeChangeTest(unittest.TestCase):
+    def test_widening_type_changes(self):
+        type_cases = [
+            ('int', 'bigint', PARQUET_SERDE, True),
+            ('int', 'BIGINT', TEXT_SERDE, True),
+            ('tinyint', 'int', PARQUET_SERDE, True),
+            ('float', 'double', PARQUET_SERDE, True),
+            ('bigint', 'int', PARQUET_SERDE, False),
+            ('int', 'bigint', ORC_SERDE, False),
+            ('int', 'bigint', None, False),
+            ('varchar(10)', 'string', TEXT_SERDE, True),
+            ('char(1)', 'string', TEXT_SERDE, True),
+            ('varchar(10)', 'string', PARQUET_SERDE, False),
+            ('decimal(8,2)', 'decimal(12,4)', TEXT_SERDE, True),
+            ('decimal(8,2)', 'decimal(9,3)', TEXT_SERDE, True),
+            ('decimal(8,2)', 'decimal(9,1)', TEXT_SERDE, False),
+            ('string', 'varchar(10)', TEXT_SERDE, False)
+        ]
+        for old_type, new_type, serde_library, widening in type_cases:
+            with self.subTest(old=old_type, new=new_type, serde=serde_library):
+                self.assertEqual(app.is_widening_type_change(old_type, new_type, serde_library), widening)
+
+
+class CanPatchTableMetadataTest(unittest.TestCase):
+    def can_patch(self, table_metadata, change_table):
+        """
+        Determine if the changes that change_table makes to a copy of the table's metadata can be applied in place.
+        """
+        ddl_metadata = copy.deepcopy(table_metadata)
+        change_table(ddl_metadata)
+        meta_spec = TableSpec.from_glue(table_metadata)
+        ddl_spec = TableSpec.from_glue(ddl_metadata)
+        return app.can_patch_table_metadata('t', table_metadata, ddl_spec, meta_spec.diff(ddl_spec))
+
+    @staticmethod
+    def append_column(table_metadata):
+        table_metadata['StorageDescriptor']['Columns'].append({'Name': 'note', 'Type': 'string'})
+
+    @staticmethod
+    def widen_column(table_metadata):
+        table_metadata['StorageDescriptor']['Columns'][0]['Type'] = 'bigint'
+
+    @staticmethod
+    def comment_column(table_metadata):
+        table_metadata['StorageDescriptor']['Columns'][0]['Comment'] = 'the id'
+
+    @staticmethod
+    def move_table(table_metadata):
+        table_metadata['StorageDescriptor']['Location'] = 's3://test-bucket/t2'
+
+    @staticmethod
+    def insert_column(table_metadata):
+        table_metadata['StorageDescriptor']['Columns'].insert(0, {'Name': 'note', 'Type': 'string'})
+
+    def test_table_without_partitions(self):
+        table_metadata = build_table_metadata(META_COLUMNS)
+        self.assertTrue(self.can_patch(table_metadata, self.append_column))
+        self.assertTrue(self.can_patch(table_metadata, self.widen_column))
+        self.assertTrue(self.can_patch(table_metadata, self.comment_column))
+        self.assertTrue(self.can_patch(table_metadata, self.move_table))
+        self.assertFalse(self.can_patch(table_metadata, self.insert_column))
+
+    def test_partitioned_table(self):
+        table_metadata = build_table_metadata(META_COLUMNS, partition_keys=['year'])
+        # Existing partitions retain their columns list, so columns are only added or widened by recreating the table.
+        self.assertFalse(self.can_patch(table_metadata, self.append_column))
+        self.assertFalse(self.can_patch(table_metadata, self.widen_column))
+        self.assertFalse(self.can_patch(table_metadata, self.move_table))
+        self.assertTrue(self.can_patch(table_metadata, self.comment_column))
+
+    def test_type_change_of_orc_table(self):
+        self.assertFalse(self.can_patch(build_table_metadata(META_COLUMNS, ORC_SERDE), self.widen_column))
+
+    def test_changes_to_other_segments(self):
+        def change_serde(table_metadata):
+            table_metadata['StorageDescriptor']['SerdeInfo']['SerializationLibrary'] = ORC_SERDE
+
+        def change_partition_keys(table_metadata):
+            table_metadata['PartitionKeys'].append({'Name': 'month', 'Type': 'string'})
+
+        table_metadata = build_table_metadata(META_COLUMNS, partition_keys=['year'])
+        self.assertFalse(self.can_patch(table_metadata, change_serde))
+        self.assertFalse(self.can_patch(table_metadata, change_partition_keys))
+        self.assertFalse(self.can_patch(table_metadata, lambda unchanged_metadata: None))
+
+
+if __name__ == '__main__':
+    unittest.main()
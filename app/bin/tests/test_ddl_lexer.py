@@ -0,0 +1,120 @@
+import os
+import glob
+import unittest
+
+import ddl_lexer
+
+"""
+Unit tests of ddl_lexer.py, using the sample DDLs in app/ddl.
+"""
+DDL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, 'ddl')
+
+
+def read_sample_ddls():
+    """
+    Read the sample DDLs with their %%DATABASE%% and %%LOCATION%% parameters substituted, keyed by file name.
+    """
+    ddls_dict = dict()
+    for ddl_path in sorted(glob.glob(os.path.join(DDL_DIR, '**', '*.ddl'), recursive=True)):
+        with open(ddl_path) as ddl_file:
+            ddls_dict[os.path.basename(ddl_path)] = ddl_file.read().replace('%%DATABASE%%', 'test_db'). \
+                replace('%%LOCATION%%', 's3://test-bucket/' + os.path.basename(ddl_path))
+    return ddls_dict
+
+
+class TokenizeRenderTest(unittest.TestCase):
+    def test_sample_ddls_exist(self):
+        self.assertGreater(len(read_sample_ddls()), 0)
+
+    def test_render_round_trip(self):
+        for ddl_name, ddl_text in read_sample_ddls().items():
+            with self.subTest(ddl=ddl_name):
+                ddl_tokens = ddl_lexer.tokenize(ddl_text)
+                rendered_text = ddl_lexer.render(ddl_tokens)
+                # Rendering the normalized text again must not change it.
+                self.assertEqual(ddl_lexer.render(ddl_lexer.tokenize(rendered_text)), rendered_text)
+                # The normalized text has the same tokens, apart from case, back tics and semicolons.
+                self.assertEqual([(token.type, token.value.lower()) for token in ddl_lexer.tokenize(rendered_text)],
+                                 [(token.type, token.value.lower()) for token in ddl_tokens
+                                  if not (token.type == ddl_lexer.PUNCTUATION and token.value == ';')])
+                self.assertNotIn('`', rendered_text)
+                self.assertEqual(rendered_text, rendered_text.lower())
+
+    def test_render_normalizes_text(self):
+        ddl_tokens = ddl_lexer.tokenize('CREATE EXTERNAL TABLE `Db`.`T`(\n'
+                                        '  a INT ,\tb string COMMENT "it\'s" -- note\n);')
+        self.assertEqual(ddl_lexer.render(ddl_tokens), "create external table db.t( a int, b string comment 'it\\'s')")
+
+    def test_token_types(self):
+        ddl_tokens = ddl_lexer.tokenize("location 's3://b/t' `Name` 12 decimal(4,1)")
+        self.assertEqual([(token.type, token.value) for token in ddl_tokens],
+                         [(ddl_lexer.KEYWORD, 'location'), (ddl_lexer.STRING, 's3://b/t'),
+                          (ddl_lexer.IDENTIFIER, 'Name'), (ddl_lexer.NUMBER, '12'),
+                          (ddl_lexer.IDENTIFIER, 'decimal'), (ddl_lexer.PUNCTUATION, '('),
+                          (ddl_lexer.NUMBER, '4'), (ddl_lexer.PUNCTUATION, ','), (ddl_lexer.NUMBER, '1'),
+                          (ddl_lexer.PUNCTUATION, ')')])
+
+    def test_comments_are_dropped(self):
+        ddl_tokens = ddl_lexer.tokenize("a int, -- the 'second' column\nb string")
+        self.assertEqual(ddl_lexer.render(ddl_tokens), 'a int, b string')
+        self.assertTrue(ddl_tokens[3].spaced)
+
+    def test_comment_marker_within_string_is_kept(self):
+        ddl_tokens = ddl_lexer.tokenize("comment 'a -- b'")
+        self.assertEqual(ddl_tokens[1].value, 'a -- b')
+
+    def test_unterminated_string_raises(self):
+        for ddl_text in ("comment 'abc", 'comment "abc', 'a `abc'):
+            with self.subTest(ddl=ddl_text):
+                with self.assertRaises(Exception):
+                    ddl_lexer.tokenize(ddl_text)
+
+    def test_split_top_level(self):
+        groups = ddl_lexer.split_top_level(ddl_lexer.tokenize('a decimal(10,2), b struct<x:int,y:string>, c int'))
+        self.assertEqual([ddl_lexer.render(group) for group in groups],
+                         ['a decimal(10,2)', 'b struct<x:int,y:string>', 'c int'])
+
+    def test_find_closing_parenthesis(self):
+        ddl_tokens = ddl_lexer.tokenize('(a decimal(10,2), b int) x')
+        self.assertEqual(ddl_lexer.find_closing_parenthesis(ddl_tokens, 0), len(ddl_tokens) - 2)
+        with self.assertRaises(Exception):
+            ddl_lexer.find_closing_parenthesis(ddl_lexer.tokenize('(a int'), 0)
+
+
+class UnquoteTest(unittest.TestCase):
+    def unquote(self, ddl_text):
+        ddl_tokens = ddl_lexer.tokenize(ddl_text)
+        self.assertEqual(len(ddl_tokens), 1)
+        return ddl_lexer.unquote(ddl_tokens[0])
+
+    def test_escapes(self):
+        escape_cases = [
+            ("'a\\'b'", "a'b"),
+            ("'a\\\"b'", 'a"b'),
+            ("'a\\\\b'", 'a\\b'),
+            ("'\\t'", '\t'),
+            ("'\\n'", '\n'),
+            ("'\\r'", '\r'),
+            ("'\\b'", '\b'),
+            ("'\\0'", '\u0000'),
+            ("'\\Z'", '\u001a'),
+            ("'\\001'", '\u0001'),
+            ("'\\u0001'", '\u0001'),
+            ("'\\u00e9'", 'é'),
+            ("'\\%'", '\\%'),
+            ("'\\_'", '\\_'),
+            ("'\\|'", '|'),
+            ("'a|b'", 'a|b')
+        ]
+        for ddl_text, value in escape_cases:
+            with self.subTest(ddl=ddl_text):
+                self.assertEqual(self.unquote(ddl_text), value)
+
+    def test_double_quoted_string(self):
+        self.assertEqual(self.unquote('"it\'s"'), "it's")
+        self.assertEqual(ddl_lexer.quote_string_text(ddl_lexer.tokenize('"it\'s"')[0]), "it\\'s")
+        self.assertEqual(ddl_lexer.quote_string_text(ddl_lexer.tokenize('"\\""')[0]), '\\"')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from hive_types import normalize_type, canonicalize_type, tokenize_type
+
+"""
+Unit tests of hive_types.py.
+"""
+
+
+class NormalizeTypeTest(unittest.TestCase):
+    def test_canonical_forms(self):
+        type_cases = [
+            ('int', 'int'),
+            ('INT', 'int'),
+            ('integer', 'int'),
+            ('real', 'float'),
+            ('double precision', 'double'),
+            ('DOUBLE', 'double'),
+            ('string', 'string'),
+            ('varchar(10)', 'varchar(10)'),
+            ('varchar( 10 )', 'varchar(10)'),
+            ('decimal', 'decimal(10,0)'),
+            ('decimal(8)', 'decimal(8,0)'),
+            ('decimal(10, 2)', 'decimal(10,2)'),
+            ('DEC(4,1)', 'decimal(4,1)'),
+            ('numeric(4,1)', 'decimal(4,1)'),
+            ('decimal(010,02)', 'decimal(10,2)'),
+            ('array<integer>', 'array<int>'),
+            ('map<string, array<real>>', 'map<string,array<float>>'),
+            ('uniontype<int, string>', 'uniontype<int,string>'),
+            ('STRUCT<`Id`: INTEGER, amounts: ARRAY<DECIMAL(8)>>', 'struct<id:int,amounts:array<decimal(8,0)>>')
+        ]
+        for type_text, canonical_type in type_cases:
+            with self.subTest(type=type_text):
+                self.assertEqual(canonicalize_type(type_text), canonical_type)
+                self.assertEqual(normalize_type(type_text), canonical_type)
+
+    def test_unparsable_types_are_lowercased_without_whitespace(self):
+        type_cases = [
+            ("struct<a:int COMMENT 'x'>", "struct<a:intcomment'x'>"),
+            ('array<int', 'array<int'),
+            ('map<int>', 'map<int>'),
+            ('array<int,string>', 'array<int,string>'),
+            ('decimal(4,1', 'decimal(4,1')
+        ]
+        for type_text, canonical_type in type_cases:
+            with self.subTest(type=type_text):
+                self.assertEqual(canonicalize_type(type_text), canonical_type)
+
+    def test_canonical_forms_are_stable(self):
+        for type_text in ('decimal(10, 2)', 'map<string, array<real>>', 'STRUCT<`Id`: INTEGER>'):
+            with self.subTest(type=type_text):
+                self.assertEqual(canonicalize_type(canonicalize_type(type_text)), canonicalize_type(type_text))
+
+    def test_tokenize_type(self):
+        self.assertEqual(tokenize_type('Decimal( 4,1 )'),
+                         [('word', 'decimal'), ('punctuation', '('), ('number', '4'), ('punctuation', ','),
+                          ('number', '1'), ('punctuation', ')')])
+        with self.assertRaises(ValueError):
+            tokenize_type('int;')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import unittest
+from unittest import mock
+
+# The AWS clients of app.py are created on import, which requires a region.
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-west-2')
+import app
+
+"""
+Unit tests of replay_partition_snapshot() in app.py, using a stub of the Glue client.
+"""
+TABLE_LOCATION = 's3://test-bucket/t/'
+PARQUET_STORAGE_DESCRIPTOR = {
+    'Columns': [{'Name': 'a', 'Type': 'bigint'}],
+    'InputFormat': 'org.apache.hadoop.hive.ql.io.parquet.MapredParquetInputFormat',
+    'SerdeInfo': {'SerializationLibrary': 'org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe'}
+}
+
+
+class StubGlueClient:
+    """
+    A stub of the Glue client that returns a single table and records the partitions created in it.
+    """
+    def __init__(self, table):
+        self.table = table
+        self.partition_input_list = list()
+
+    def get_table(self, DatabaseName, Name):
+        return {'Table': self.table}
+
+    def batch_create_partition(self, DatabaseName, TableName, PartitionInputList):
+        self.partition_input_list.extend(PartitionInputList)
+        return {'Errors': list()}
+
+
+def build_table(partition_keys, location=TABLE_LOCATION):
+    storage_descriptor = dict(PARQUET_STORAGE_DESCRIPTOR, Location=location)
+    return {'Name': 't', 'StorageDescriptor': storage_descriptor,
+            'PartitionKeys': [{'Name': name, 'Type': 'string'} for name in partition_keys]}
+
+
+def build_snapshot(partition_keys, partition_values_list):
+    partitions_list = list()
+    for values in partition_values_list:
+        folder_name = '/'.join('{}={}'.format(key, value) for key, value in zip(partition_keys, values))
+        partitions_list.append({'Values': values,
+                                'StorageDescriptor': {'Columns': [{'Name': 'a', 'Type': 'int'}],
+                                                      'Location': TABLE_LOCATION + folder_name},
+                                'Parameters': {'p': '1'}})
+    return {'PartitionKeys': partition_keys, 'Location': TABLE_LOCATION, 'Partitions': partitions_list}
+
+
+class ReplayPartitionSnapshotTest(unittest.TestCase):
+    def replay(self, table, partition_snapshot):
+        glue_client = StubGlueClient(table)
+        with mock.patch.object(app, 'glue_client', glue_client):
+            replayed = app.replay_partition_snapshot('db', 't', partition_snapshot)
+        return replayed, glue_client.partition_input_list
+
+    def test_unchanged_partition_keys(self):
+        replayed, partition_input_list = self.replay(
+            build_table(['year', 'month']), build_snapshot(['year', 'month'], [['2023', '01'], ['2023', '02']]))
+        self.assertTrue(replayed)
+        self.assertEqual([partition_input['Values'] for partition_input in partition_input_list],
+                         [['2023', '01'], ['2023', '02']])
+        self.assertEqual(partition_input_list[0]['StorageDescriptor'],
+                         dict(PARQUET_STORAGE_DESCRIPTOR, Location=TABLE_LOCATION + 'year=2023/month=01'))
+        self.assertEqual(partition_input_list[0]['Parameters'], {'p': '1'})
+
+    def test_reordered_partition_keys(self):
+        replayed, partition_input_list = self.replay(
+            build_table(['Month', 'year']), build_snapshot(['year', 'month'], [['2023', '01']]))
+        self.assertTrue(replayed)
+        self.assertEqual(partition_input_list[0]['Values'], ['01', '2023'])
+        # The partition keeps its location.
+        self.assertEqual(partition_input_list[0]['StorageDescriptor']['Location'],
+                         TABLE_LOCATION + 'year=2023/month=01')
+
+    def test_renamed_partition_keys(self):
+        replayed, partition_input_list = self.replay(
+            build_table(['yr', 'month']), build_snapshot(['year', 'month'], [['2023', '01']]))
+        self.assertTrue(replayed)
+        self.assertEqual(partition_input_list[0]['Values'], ['2023', '01'])
+
+    def test_added_partition_key(self):
+        replayed, partition_input_list = self.replay(
+            build_table(['year', 'month', 'day']), build_snapshot(['year', 'month'], [['2023', '01']]))
+        self.assertFalse(replayed)
+        self.assertEqual(partition_input_list, list())
+
+    def test_changed_location(self):
+        # No data is moved to the new location, so its partitions must be loaded from its folders instead.
+        replayed, partition_input_list = self.replay(
+            build_table(['year'], 's3://test-bucket/t2'), build_snapshot(['year'], [['2023']]))
+        self.assertFalse(replayed)
+        self.assertEqual(partition_input_list, list())
+
+    def test_location_without_trailing_slash(self):
+        replayed, partition_input_list = self.replay(
+            build_table(['year'], TABLE_LOCATION.rstrip('/')), build_snapshot(['year'], [['2023']]))
+        self.assertTrue(replayed)
+        self.assertEqual(len(partition_input_list), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import re
+import unittest
+
+import ddl_lexer
+from table_spec import TableSpec, parse_columns, parse_properties
+from tests.test_ddl_lexer import read_sample_ddls
+
+"""
+Unit tests of table_spec.py, using the sample DDLs in app/ddl.
+"""
+COLUMN_PATTERN = re.compile(r'`(\w+)`\s+(\w+(?:\(\d+(?:,\s*\d+)?\))?)')
+
+
+def build_glue_metadata(ddl_text):
+    """
+    Build the metadata that the Glue Data Catalog stores for a sample DDL (i.e., lowercase column names, data types
+    without whitespace and the SerDe parameters that Athena adds), independently of the parser under test.
+    """
+    columns_text, partition_keys_text = re.split(r'PARTITIONED BY', ddl_text, flags=re.IGNORECASE)
+    partition_keys_text = partition_keys_text[:partition_keys_text.index(')')]
+    location = re.search(r"LOCATION\s+'([^']*)'", ddl_text, re.IGNORECASE).group(1)
+    storage_descriptor = {
+        'Columns': [{'Name': name.lower(), 'Type': ''.join(data_type.lower().split())}
+                    for name, data_type in COLUMN_PATTERN.findall(columns_text[columns_text.index('('):])],
+        'Location': location,
+        'NumberOfBuckets': -1,
+        'BucketColumns': list()
+    }
+    if 'ParquetHiveSerDe' in ddl_text:
+        storage_descriptor.update({
+            'InputFormat': 'org.apache.hadoop.hive.ql.io.parquet.MapredParquetInputFormat',
+            'OutputFormat': 'org.apache.hadoop.hive.ql.io.parquet.MapredParquetOutputFormat',
+            'SerdeInfo': {'SerializationLibrary': 'org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe',
+                          'Parameters': {'serialization.format': '1'}}})
+    else:
+        storage_descriptor.update({
+            'InputFormat': 'org.apache.hadoop.mapred.TextInputFormat',
+            'OutputFormat': 'org.apache.hadoop.hive.ql.io.HiveIgnoreKeyTextOutputFormat',
+            'SerdeInfo': {'SerializationLibrary': 'org.apache.hadoop.hive.serde2.lazy.LazySimpleSerDe',
+                          'Parameters': {'field.delim': '|', 'serialization.format': '|'}}})
+    parameters = dict(re.findall(r"'([^']*)'='([^']*)'", ddl_text))
+    parameters['EXTERNAL'] = 'TRUE'
+
+    return {
+        'Name': 'test_table',
+        'TableType': 'EXTERNAL_TABLE',
+        'StorageDescriptor': storage_descriptor,
+        'PartitionKeys': [{'Name': name.lower(), 'Type': data_type.lower()}
+                          for name, data_type in COLUMN_PATTERN.findall(partition_keys_text)],
+        'Parameters': parameters
+    }
+
+
+class TableSpecTest(unittest.TestCase):
+    def test_unchanged_tables_hash_equal(self):
+        for ddl_name, ddl_text in read_sample_ddls().items():
+            with self.subTest(ddl=ddl_name):
+                ddl_spec = TableSpec.from_ddl(ddl_lexer.tokenize(ddl_text))
+                meta_spec = TableSpec.from_glue(build_glue_metadata(ddl_text))
+                self.assertEqual(meta_spec.diff(ddl_spec), list())
+                self.assertEqual(ddl_spec.content_hash(), meta_spec.content_hash())
+
+    def test_hash_is_stable(self):
+        for ddl_name, ddl_text in read_sample_ddls().items():
+            with self.subTest(ddl=ddl_name):
+                self.assertEqual(TableSpec.from_ddl(ddl_lexer.tokenize(ddl_text)).content_hash(),
+                                 TableSpec.from_ddl(ddl_lexer.tokenize(ddl_text)).content_hash())
+
+    def test_type_spellings_hash_equal(self):
+        for ddl_name, ddl_text in read_sample_ddls().items():
+            with self.subTest(ddl=ddl_name):
+                respelled_text = re.sub(r'decimal\((\d+),(\d+)\)', r'DECIMAL(\1, \2)', ddl_text)
+                respelled_text = re.sub(r'\bint\b', 'INTEGER', respelled_text)
+                self.assertEqual(TableSpec.from_ddl(ddl_lexer.tokenize(respelled_text)).content_hash(),
+                                 TableSpec.from_glue(build_glue_metadata(ddl_text)).content_hash())
+
+    def test_changes_are_detected(self):
+        for ddl_name, ddl_text in read_sample_ddls().items():
+            meta_spec = TableSpec.from_glue(build_glue_metadata(ddl_text))
+            changes = [
+                (ddl_text.replace("'s3://test-bucket/", "'s3://other-bucket/"), ['location']),
+                (re.sub(r'(`\w+`) (\w+(?:\(\d+(?:,\d+)?\))?)\)\s*\nPARTITIONED', r'\1 \2, `new_column` string)\n'
+                        'PARTITIONED', ddl_text), ['columns']),
+                (re.sub(r'(`year_registered`) string', r'\1 int', ddl_text), ['partition_keys']),
+                (re.sub(r"(TBLPROPERTIES \()", r"\1\n  'classification'='test', ", ddl_text), ['tblproperties'])
+            ]
+            for changed_text, segments in changes:
+                with self.subTest(ddl=ddl_name, segments=segments):
+                    self.assertNotEqual(changed_text, ddl_text)
+                    ddl_spec = TableSpec.from_ddl(ddl_lexer.tokenize(changed_text))
+                    self.assertNotEqual(ddl_spec.content_hash(), meta_spec.content_hash())
+                    self.assertEqual([difference['segment'] for difference in meta_spec.diff(ddl_spec)], segments)
+
+    def test_untracked_tblproperties_are_ignored(self):
+        for ddl_name, ddl_text in read_sample_ddls().items():
+            with self.subTest(ddl=ddl_name):
+                changed_text = re.sub(r"'transient_lastDdlTime'='\d+'", "'transient_lastDdlTime'='1'", ddl_text)
+                self.assertEqual(TableSpec.from_ddl(ddl_lexer.tokenize(changed_text)).content_hash(),
+                                 TableSpec.from_glue(build_glue_metadata(ddl_text)).content_hash())
+
+    def test_stored_as_defaults(self):
+        ddl_spec = TableSpec.from_ddl(ddl_lexer.tokenize(
+            "CREATE EXTERNAL TABLE db.t (a int) STORED AS PARQUET LOCATION 's3://b/t'"))
+        self.assertEqual(ddl_spec.serde_library, 'org.apache.hadoop.hive.ql.io.parquet.serde.parquethiveserde')
+        self.assertEqual(ddl_spec.input_format, 'org.apache.hadoop.hive.ql.io.parquet.mapredparquetinputformat')
+
+    def test_row_format_delimited(self):
+        ddl_spec = TableSpec.from_ddl(ddl_lexer.tokenize(
+            "CREATE EXTERNAL TABLE db.t (a int) ROW FORMAT DELIMITED FIELDS TERMINATED BY '\\t' "
+            "COLLECTION ITEMS TERMINATED BY ',' LOCATION 's3://b/t'"))
+        self.assertEqual(ddl_spec.serde_parameters, {'field.delim': '\t', 'colelction.delim': ','})
+
+    def test_unexpected_text_raises(self):
+        with self.assertRaises(Exception):
+            TableSpec.from_ddl(ddl_lexer.tokenize("CREATE EXTERNAL TABLE db.t (a int) LOCATED 's3://b/t'"))
+
+
+class ParseTest(unittest.TestCase):
+    def test_parse_columns(self):
+        columns_tokens = ddl_lexer.tokenize("`Id` INT COMMENT 'the \\'id\\'', amounts array<decimal(8, 2)>, "
+                                            "s struct<a:int,b:string> comment \"x\"")
+        self.assertEqual(parse_columns(columns_tokens),
+                         [('id', 'int', "the 'id'"), ('amounts', 'array<decimal(8, 2)>', None),
+                          ('s', 'struct<a:int,b:string>', 'x')])
+
+    def test_parse_columns_without_type_raises(self):
+        with self.assertRaises(Exception):
+            parse_columns(ddl_lexer.tokenize('a, b int'))
+
+    def test_parse_properties(self):
+        self.assertEqual(parse_properties(ddl_lexer.tokenize("'field.delim'='\\001', 'a'=\"b\"")),
+                         {'field.delim': '\u0001', 'a': 'b'})
+        with self.assertRaises(Exception):
+            parse_properties(ddl_lexer.tokenize("'a'"))
+
+
+if __name__ == '__main__':
+    unittest.main()